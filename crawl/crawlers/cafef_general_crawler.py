@@ -40,6 +40,20 @@ def insert_article_to_database(db_manager, table_name, article_data, date_parser
     
     return db_manager.insert_article(table_name, article_data)
 
+def insert_articles_to_database(db_manager, table_name, articles, date_parser_func=None):
+    """Bulk insert articles using new database system"""
+    # Parse dates if parser provided
+    for article_data in articles:
+        if date_parser_func and article_data.get("date"):
+            try:
+                parsed_date = date_parser_func(article_data["date"])
+                if parsed_date:
+                    article_data["date"] = parsed_date
+            except Exception:
+                pass
+    
+    return db_manager.insert_articles(table_name, articles)
+
 def convert_date(date_str):
     formats = ["%d-%m-%Y - %H:%M %p", "%d-%m-%Y", "%d/%m/%Y"]
     for fmt in formats:
@@ -54,6 +68,10 @@ def insert_to_supabase(db_manager, table_name, data):
     """Wrapper function để tương thích với code cũ - sử dụng hàm chung"""
     return insert_article_to_database(db_manager, table_name, data, convert_date)
 
+def insert_many_to_supabase(db_manager, table_name, articles):
+    """Insert cả batch bài viết bằng multi-row upsert"""
+    return insert_articles_to_database(db_manager, table_name, articles, convert_date)
+
 def setup_driver():
     options = Options()
     options.add_argument("--disable-gpu")
@@ -97,35 +115,44 @@ def click_view_more(driver, max_clicks=5):
             break
 
 def crawl_cafef_chung(max_clicks=5):
+    db_manager = get_database_manager()
+    known_links = db_manager.get_link_index("General_News")
+
     driver = setup_driver()
-    driver.get("https://cafef.vn/thi-truong-chung-khoan.chn")
-    time.sleep(3)
+    all_data = []
+    try:
+        driver.get("https://cafef.vn/thi-truong-chung-khoan.chn")
+        time.sleep(3)
 
-    click_view_more(driver, max_clicks=max_clicks)
+        click_view_more(driver, max_clicks=max_clicks)
 
-    links = driver.find_elements(By.CSS_SELECTOR, "div.tlitem.box-category-item h3 a")
-    print(f"📄 Đã tìm thấy {len(links)} bài viết")
+        links = driver.find_elements(By.CSS_SELECTOR, "div.tlitem.box-category-item h3 a")
+        print(f"📄 Đã tìm thấy {len(links)} bài viết")
 
-    all_data = []
-    for i, link_el in enumerate(links):
-        url = link_el.get_attribute("href")
-        if not url: continue
-        print(f"🔗 {url}")
-        driver.execute_script("window.open(arguments[0]);", url)
-        driver.switch_to.window(driver.window_handles[-1])
-        time.sleep(1)
-        data = extract_article_data(driver)
-        if data: all_data.append(data)
-        driver.close()
-        driver.switch_to.window(driver.window_handles[0])
-        time.sleep(1)
-
-    driver.quit()
+        # Bỏ qua bài đã có trong DB trước khi mở trang
+        urls = known_links.filter_new([url for url in (el.get_attribute("href") for el in links) if url])
+        print(f"🆕 {len(urls)} bài mới cần crawl")
 
-    db_manager = get_database_manager()
-    for data in all_data:
-        insert_to_supabase(db_manager, "General_News", data)
-    db_manager.close_connections()
+        for url in urls:
+            print(f"🔗 {url}")
+            driver.execute_script("window.open(arguments[0]);", url)
+            driver.switch_to.window(driver.window_handles[-1])
+            time.sleep(1)
+            data = extract_article_data(driver)
+            if data: all_data.append(data)
+            driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+            time.sleep(1)
+
+            # Lưu từng đợt để lỗi giữa chừng không làm mất bài đã crawl
+            if len(all_data) >= DatabaseConfig.INSERT_CHUNK_SIZE:
+                insert_many_to_supabase(db_manager, "General_News", all_data)
+                all_data = []
+    finally:
+        driver.quit()
+        if all_data:
+            insert_many_to_supabase(db_manager, "General_News", all_data)
+        db_manager.close_connections()
     print("🎉 Hoàn tất lưu vào Supabase!")
 
 if __name__ == "__main__":
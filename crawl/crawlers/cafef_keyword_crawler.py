@@ -40,6 +40,20 @@ def insert_article_to_database(db_manager, table_name, article_data, date_parser
     
     return db_manager.insert_article(table_name, article_data)
 
+def insert_articles_to_database(db_manager, table_name, articles, date_parser_func=None):
+    """Bulk insert articles using new database system"""
+    # Parse dates if parser provided
+    for article_data in articles:
+        if date_parser_func and article_data.get("date"):
+            try:
+                parsed_date = date_parser_func(article_data["date"])
+                if parsed_date:
+                    article_data["date"] = parsed_date
+            except Exception:
+                pass
+    
+    return db_manager.insert_articles(table_name, articles)
+
 # ================== FORMAT NGÀY ==================
 def convert_date(date_str):
     if not date_str or date_str.strip() == "":
@@ -67,6 +81,10 @@ def insert_to_supabase(db_manager, table_name, data):
     """Wrapper function để tương thích với code cũ - sử dụng hàm chung"""
     return insert_article_to_database(db_manager, table_name, data, convert_date)
 
+def insert_many_to_supabase(db_manager, table_name, articles):
+    """Insert cả batch bài viết bằng multi-row upsert"""
+    return insert_articles_to_database(db_manager, table_name, articles, convert_date)
+
 # ================== HÀM SETUP SELENIUM ==================
 def setup_driver():
     options = Options()
@@ -99,46 +117,60 @@ def extract_article_data(driver):
         return None
 
 # ================== CRAWL THEO TỪ KHÓA ==================
-def crawl_articles_sequentially(keyword="FPT", max_pages=1):
+def crawl_articles_sequentially(db_manager, table_name, keyword="FPT", max_pages=1, known_links=None):
     driver = setup_driver()
     wait = WebDriverWait(driver, 10)
     results = []
+    crawled = 0
 
-    for page in range(1, max_pages + 1):
-        search_url = f"https://cafef.vn/tim-kiem/trang-{page}.chn?keywords={keyword.replace(' ', '%20')}"
-        print(f"\n🔎 Trang {page}: {search_url}")
-        driver.get(search_url)
-        time.sleep(2)
-
-        article_links = driver.find_elements(By.CSS_SELECTOR, "div.item h3.titlehidden a")
-        print(f"  👉 Tìm thấy {len(article_links)} bài viết")
-
-        for index in range(len(article_links)):
-            try:
-                article_links = driver.find_elements(By.CSS_SELECTOR, "div.item h3.titlehidden a")
-                link_el = article_links[index]
-                driver.execute_script("arguments[0].scrollIntoView();", link_el)
-                time.sleep(1)
-                driver.execute_script("arguments[0].click();", link_el)
-                time.sleep(2)
-
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "h1.title")))
-                data = extract_article_data(driver)
-                if data:
-                    results.append(data)
-                    print(f"✅ Lấy bài: {data['title'][:50]}...")
-
-                driver.get(search_url)
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.item")))
-                time.sleep(1)
-
-            except Exception as e:
-                print(f"❌ Lỗi tại bài {index+1}: {e}")
-                driver.get(search_url)
-                time.sleep(2)
-
-    driver.quit()
-    return results
+    try:
+        for page in range(1, max_pages + 1):
+            search_url = f"https://cafef.vn/tim-kiem/trang-{page}.chn?keywords={keyword.replace(' ', '%20')}"
+            print(f"\n🔎 Trang {page}: {search_url}")
+            driver.get(search_url)
+            time.sleep(2)
+
+            article_links = driver.find_elements(By.CSS_SELECTOR, "div.item h3.titlehidden a")
+            print(f"  👉 Tìm thấy {len(article_links)} bài viết")
+
+            for index in range(len(article_links)):
+                try:
+                    article_links = driver.find_elements(By.CSS_SELECTOR, "div.item h3.titlehidden a")
+                    link_el = article_links[index]
+                    # Bỏ qua bài đã có trong DB trước khi mở trang
+                    if known_links is not None and link_el.get_attribute("href") in known_links:
+                        print(f"⏩ Bỏ qua bài {index+1}: đã có trong DB")
+                        continue
+                    driver.execute_script("arguments[0].scrollIntoView();", link_el)
+                    time.sleep(1)
+                    driver.execute_script("arguments[0].click();", link_el)
+                    time.sleep(2)
+
+                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "h1.title")))
+                    data = extract_article_data(driver)
+                    if data:
+                        results.append(data)
+                        crawled += 1
+                        print(f"✅ Lấy bài: {data['title'][:50]}...")
+
+                        # Lưu từng đợt để lỗi giữa chừng không làm mất bài đã crawl
+                        if len(results) >= DatabaseConfig.INSERT_CHUNK_SIZE:
+                            insert_many_to_supabase(db_manager, table_name, results)
+                            results = []
+
+                    driver.get(search_url)
+                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.item")))
+                    time.sleep(1)
+
+                except Exception as e:
+                    print(f"❌ Lỗi tại bài {index+1}: {e}")
+                    driver.get(search_url)
+                    time.sleep(2)
+    finally:
+        driver.quit()
+        if results:
+            insert_many_to_supabase(db_manager, table_name, results)
+    return crawled
 
 # ================== MAIN ==================
 def main_cafef():
@@ -154,9 +186,9 @@ def main_cafef():
     
     for kw, table_name in keyword_table_map.items():
         print(f"\n🚀 Đang crawl keyword: {kw} -> Lưu vào {table_name}")
-        articles = crawl_articles_sequentially(keyword=kw, max_pages=1)
-        for article in articles:
-            insert_to_supabase(db_manager, table_name, article)
+        known_links = db_manager.get_link_index(table_name)
+        crawled = crawl_articles_sequentially(db_manager, table_name, keyword=kw, max_pages=1, known_links=known_links)
+        print(f"✅ Đã crawl {crawled} bài cho {table_name}")
 
     db_manager.close_connections()
     print("🎉 Hoàn tất lưu vào Supabase!")
@@ -42,6 +42,20 @@ def insert_article_to_database(db_manager, table_name, article_data, date_parser
     
     return db_manager.insert_article(table_name, article_data)
 
+def insert_articles_to_database(db_manager, table_name, articles, date_parser_func=None):
+    """Bulk insert articles using new database system"""
+    # Parse dates if parser provided
+    for article_data in articles:
+        if date_parser_func and article_data.get("date"):
+            try:
+                parsed_date = date_parser_func(article_data["date"])
+                if parsed_date:
+                    article_data["date"] = parsed_date
+            except Exception:
+                pass
+    
+    return db_manager.insert_articles(table_name, articles)
+
 def normalize_date_only(raw_text):
     if not raw_text or raw_text.strip() == "" or raw_text.strip().upper() == "EMPTY":
         return None
@@ -67,7 +81,7 @@ def normalize_date_only(raw_text):
     return None
 
 # 🔹 Crawl dữ liệu từ Chungta.vn
-def crawl_chungta(url):
+def crawl_chungta(db_manager, table_name, url, known_links=None):
     options = Options()
     options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
@@ -95,39 +109,54 @@ def crawl_chungta(url):
     print(f"Tìm thấy {len(articles)} bài viết.")
 
     results = []
+    crawled = 0
     headers = {"User-Agent": "Mozilla/5.0"}
 
-    for a in articles:
-        title_preview = a.get_text(strip=True)
-        link = "https://chungta.vn" + a.get("href")
+    try:
+        for a in articles:
+            title_preview = a.get_text(strip=True)
+            link = "https://chungta.vn" + a.get("href")
+
+            # Bỏ qua bài đã có trong DB trước khi tải trang
+            if known_links is not None and link in known_links:
+                continue
 
-        try:
-            res = requests.get(link, headers=headers, timeout=10)
-            article_soup = BeautifulSoup(res.text, "html.parser")
+            try:
+                res = requests.get(link, headers=headers, timeout=10)
+                article_soup = BeautifulSoup(res.text, "html.parser")
+
+                title = article_soup.select_one("h1.title-detail")
+                title = title.get_text(strip=True) if title else title_preview
 
-            title = article_soup.select_one("h1.title-detail")
-            title = title.get_text(strip=True) if title else title_preview
+                date = article_soup.select_one("span.time")
+                date = date.get_text(strip=True) if date else "Không rõ ngày"
 
-            date = article_soup.select_one("span.time")
-            date = date.get_text(strip=True) if date else "Không rõ ngày"
+                content = article_soup.select_one("article.fck_detail.width_common")
+                content = content.get_text(separator="\n", strip=True) if content else ""
 
-            content = article_soup.select_one("article.fck_detail.width_common")
-            content = content.get_text(separator="\n", strip=True) if content else ""
+                results.append({
+                    "title": title,
+                    "date": date,
+                    "link": link,
+                    "content": content,
+                    "ai_summary": "" 
+                })
 
-            results.append({
-                "title": title,
-                "date": date,
-                "link": link,
-                "content": content,
-                "ai_summary": "" 
-            })
+                crawled += 1
+                print(f"✅ Crawled: {title}")
 
-            print(f"✅ Crawled: {title}")
+                # Lưu từng đợt để lỗi giữa chừng không làm mất bài đã crawl
+                if len(results) >= DatabaseConfig.INSERT_CHUNK_SIZE:
+                    insert_articles_to_database(db_manager, table_name, results, normalize_date_only)
+                    results = []
 
-        except Exception as e:
-            print(f"❌ Lỗi lấy bài {link}: {e}")
+            except Exception as e:
+                print(f"❌ Lỗi lấy bài {link}: {e}")
+    finally:
+        if results:
+            insert_articles_to_database(db_manager, table_name, results, normalize_date_only)
 
-    return results
+    return crawled
 
 def main_chungta():
     urls = [
@@ -136,13 +165,12 @@ def main_chungta():
     ]
     table_name = "FPT_News"  # Chung Ta lưu vào FPT_News vì có nhiều tin về FPT
     db_manager = get_database_manager()
+    known_links = db_manager.get_link_index(table_name)
 
     for url in urls:
-        articles = crawl_chungta(url) 
-        for article in articles:
-            # Sử dụng hàm chung từ database_config
-            insert_article_to_database(db_manager, table_name, article, normalize_date_only)
-        print(f"🎉 Hoàn tất lưu vào {table_name} từ {url}")
+        # Bài được lưu từng đợt trong lúc crawl
+        crawled = crawl_chungta(db_manager, table_name, url, known_links)
+        print(f"🎉 Hoàn tất lưu {crawled} bài vào {table_name} từ {url}")
 
     db_manager.close_connections()
 
@@ -49,6 +49,20 @@ def insert_article_to_database(db_manager, table_name, article_data, date_parser
     
     return db_manager.insert_article(table_name, article_data)
 
+def insert_articles_to_database(db_manager, table_name, articles, date_parser_func=None):
+    """Bulk insert articles using new database system"""
+    # Parse dates if parser provided
+    for article_data in articles:
+        if date_parser_func and article_data.get("date"):
+            try:
+                parsed_date = date_parser_func(article_data["date"])
+                if parsed_date:
+                    article_data["date"] = parsed_date
+            except Exception:
+                pass
+    
+    return db_manager.insert_articles(table_name, articles)
+
 # Configuration constants
 MAX_SCROLLS = 5  # Số lần scroll 
 
@@ -235,25 +249,46 @@ def insert_to_supabase(db_manager, table_name, data):
     
     return insert_article_to_database(db_manager, table_name, data, fireant_date_parser_wrapper)
 
+def insert_many_to_supabase(db_manager, table_name, articles):
+    """Insert cả batch bài viết FireAnt bằng multi-row upsert"""
+    def fireant_date_parser_wrapper(date_str):
+        dt = parse_fuzzy_datetime(date_str, 2025)
+        return format_datetime_for_db(dt) if dt else None
+    
+    return insert_articles_to_database(db_manager, table_name, articles, fireant_date_parser_wrapper)
+
 def crawl_fireant(stock_code="FPT", table_name="FPT_News"):
     db_manager = get_database_manager()
 
     driver = setup_driver()
-    article_links = scroll_and_collect_links(driver, stock_code=stock_code)
+    articles = []
+    try:
+        article_links = scroll_and_collect_links(driver, stock_code=stock_code)
 
-    current_year = 2025
-    base_day_month = None
-    for idx, link in enumerate(article_links):
-        print(f"📄 ({idx+1}/{len(article_links)}) {link}")
-        raw_data = extract_article(driver, link)
+        # Bỏ qua bài đã có trong DB trước khi mở trang
+        article_links = db_manager.get_link_index(table_name).filter_new(article_links)
+        print(f"🆕 {len(article_links)} bài mới cần crawl")
 
-        dt = parse_fuzzy_datetime(raw_data.get("fuzzy_time", ""), current_year)
-        raw_data["date"] = format_datetime_obj(dt) if dt else ""
+        current_year = 2025
+        base_day_month = None
+        for idx, link in enumerate(article_links):
+            print(f"📄 ({idx+1}/{len(article_links)}) {link}")
+            raw_data = extract_article(driver, link)
 
-        insert_to_supabase(db_manager, table_name, raw_data)
-    
-    driver.quit()
-    db_manager.close_connections()
+            dt = parse_fuzzy_datetime(raw_data.get("fuzzy_time", ""), current_year)
+            raw_data["date"] = format_datetime_obj(dt) if dt else ""
+
+            articles.append(raw_data)
+
+            # Lưu từng đợt để lỗi giữa chừng không làm mất bài đã crawl
+            if len(articles) >= DatabaseConfig.INSERT_CHUNK_SIZE:
+                insert_many_to_supabase(db_manager, table_name, articles)
+                articles = []
+    finally:
+        driver.quit()
+        if articles:
+            insert_many_to_supabase(db_manager, table_name, articles)
+        db_manager.close_connections()
 
 def scroll_and_collect_general_articles(driver):
     url = FIREANT_ARTICLE_URL
@@ -291,35 +326,48 @@ def crawl_fireant_general(table_name="General_News"):
     db_manager = get_database_manager()
     
     driver = setup_driver()
-    article_links = scroll_and_collect_general_articles(driver)
-
-    current_year = datetime.now().year
-
-    for idx, link in enumerate(article_links):
-        print(f"📄 ({idx+1}/{len(article_links)}) {link}")
-        raw_data = extract_article(driver, link)
-
-        # Ưu tiên parse fuzzy time
-        dt = parse_fuzzy_datetime(raw_data.get("fuzzy_time", ""), current_year)
-
-        # Nếu vẫn không có dt, thử parse trực tiếp từ raw_iso (nếu extract_article lấy được)
-        if not dt:
-            try:
-                soup = BeautifulSoup(driver.page_source, "html.parser")
-                time_tag = soup.select_one("time[datetime]")
-                if time_tag:
-                    raw_iso = time_tag.get("datetime") or time_tag.get("title")
-                    if raw_iso:
-                        dt = parser.parse(raw_iso)
-            except:
-                dt = None
-
-        raw_data["date"] = format_datetime_obj(dt) if dt else datetime.now().strftime("%Y-%m-%d")
-
-        insert_to_supabase(db_manager, table_name, raw_data)
-
-    driver.quit()
-    db_manager.close_connections()
+    articles = []
+    try:
+        article_links = scroll_and_collect_general_articles(driver)
+
+        # Bỏ qua bài đã có trong DB trước khi mở trang
+        article_links = db_manager.get_link_index(table_name).filter_new(article_links)
+        print(f"🆕 {len(article_links)} bài mới cần crawl")
+
+        current_year = datetime.now().year
+
+        for idx, link in enumerate(article_links):
+            print(f"📄 ({idx+1}/{len(article_links)}) {link}")
+            raw_data = extract_article(driver, link)
+
+            # Ưu tiên parse fuzzy time
+            dt = parse_fuzzy_datetime(raw_data.get("fuzzy_time", ""), current_year)
+
+            # Nếu vẫn không có dt, thử parse trực tiếp từ raw_iso (nếu extract_article lấy được)
+            if not dt:
+                try:
+                    soup = BeautifulSoup(driver.page_source, "html.parser")
+                    time_tag = soup.select_one("time[datetime]")
+                    if time_tag:
+                        raw_iso = time_tag.get("datetime") or time_tag.get("title")
+                        if raw_iso:
+                            dt = parser.parse(raw_iso)
+                except:
+                    dt = None
+
+            raw_data["date"] = format_datetime_obj(dt) if dt else datetime.now().strftime("%Y-%m-%d")
+
+            articles.append(raw_data)
+
+            # Lưu từng đợt để lỗi giữa chừng không làm mất bài đã crawl
+            if len(articles) >= DatabaseConfig.INSERT_CHUNK_SIZE:
+                insert_many_to_supabase(db_manager, table_name, articles)
+                articles = []
+    finally:
+        driver.quit()
+        if articles:
+            insert_many_to_supabase(db_manager, table_name, articles)
+        db_manager.close_connections()
 
 def main_fireant():
     for code in STOCK_CODES:
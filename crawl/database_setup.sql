@@ -159,3 +159,73 @@ COMMENT ON TABLE public.FPT_Stock IS 'Bảng lưu lịch sử giá cổ phiếu
 COMMENT ON TABLE public.GAS_Stock IS 'Bảng lưu lịch sử giá cổ phiếu GAS';
 COMMENT ON TABLE public.IMP_Stock IS 'Bảng lưu lịch sử giá cổ phiếu IMP';
 COMMENT ON TABLE public.VCB_Stock IS 'Bảng lưu lịch sử giá cổ phiếu VCB';
+
+-- 6. Function cập nhật hàng loạt (dùng bởi SupabaseManager.update_many)
+-- p_rows: mảng JSON, mỗi phần tử chứa cột khóa p_key và các cột cần cập nhật
+-- Mỗi nhóm dòng có cùng tập cột được cập nhật bằng một câu UPDATE ... FROM,
+-- so sánh cột khóa theo đúng kiểu của nó để dùng được index
+-- Trả về danh sách khóa đã được cập nhật
+CREATE OR REPLACE FUNCTION public.bulk_update_rows(p_table text, p_key text, p_rows jsonb)
+RETURNS SETOF text
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    cols text[];
+    set_clause text;
+    group_rows jsonb;
+BEGIN
+    FOR cols IN
+        SELECT DISTINCT ARRAY(SELECT k FROM jsonb_object_keys(e) AS k WHERE k <> p_key ORDER BY k)
+          FROM jsonb_array_elements(p_rows) AS e
+    LOOP
+        IF cardinality(cols) = 0 THEN
+            CONTINUE;
+        END IF;
+
+        SELECT string_agg(format('%I = r.%I', c, c), ', ')
+          INTO set_clause
+          FROM unnest(cols) AS c;
+
+        SELECT jsonb_agg(e)
+          INTO group_rows
+          FROM jsonb_array_elements(p_rows) AS e
+         WHERE ARRAY(SELECT k FROM jsonb_object_keys(e) AS k WHERE k <> p_key ORDER BY k) = cols;
+
+        RETURN QUERY EXECUTE format(
+            'UPDATE public.%I t SET %s
+               FROM jsonb_populate_recordset(null::public.%I, $1) r
+              WHERE t.%I = r.%I
+             RETURNING t.%I::text',
+            p_table, set_clause, p_table, p_key, p_key, p_key
+        ) USING group_rows;
+    END LOOP;
+END;
+$$;
+
+-- 7. Function thống kê tất cả bảng tin tức trong một lần gọi (dùng bởi TableStatsService)
+-- Trả về total/summarized/classified cho từng bảng trong p_tables
+CREATE OR REPLACE FUNCTION public.news_table_stats(p_tables text[])
+RETURNS TABLE(table_name text, total bigint, summarized bigint, classified bigint)
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    t text;
+BEGIN
+    FOREACH t IN ARRAY p_tables LOOP
+        RETURN QUERY EXECUTE format(
+            'SELECT %L::text,
+                    count(*) FILTER (WHERE content <> %L),
+                    count(*) FILTER (WHERE ai_summary IS NOT NULL AND ai_summary <> %L AND content <> %L),
+                    %s
+               FROM public.%I',
+            t, '', '', '',
+            CASE WHEN t = 'General_News'
+                 THEN 'count(*) FILTER (WHERE industry IS NOT NULL AND industry <> '''' AND ai_summary IS NOT NULL AND ai_summary <> '''')'
+                 ELSE '0::bigint'
+            END,
+            t
+        );
+    END LOOP;
+END;
+$$;
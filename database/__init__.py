@@ -3,16 +3,35 @@ Database Package
 Centralized database management for SPA VIP system
 """
 
-from .supabase_manager import SupabaseManager, get_database_manager, get_supabase_client
+from .supabase_manager import SupabaseManager, get_database_manager, get_supabase_client, iter_batches, prefetch
+from .async_supabase_manager import AsyncSupabaseManager, get_table_stats_concurrently
 from .config import DatabaseConfig
+from .client_registry import get_shared_client
+from .instrumentation import query_metrics
+from .inference_cache import InferenceCache, get_inference_cache
+from .link_index import KnownLinkIndex
+from .local_backend import LocalClient, copy_tables_to_local
+from .write_behind import WriteBehindBuffer
 from .schemas import NewsSchema, StockSchema, format_datetime_for_db
 
 __all__ = [
     'SupabaseManager',
+    'AsyncSupabaseManager',
     'DatabaseConfig', 
+    'InferenceCache',
+    'KnownLinkIndex',
+    'LocalClient',
     'NewsSchema',
     'StockSchema',
+    'WriteBehindBuffer',
     'get_database_manager',
     'get_supabase_client',
+    'get_shared_client',
+    'get_table_stats_concurrently',
+    'get_inference_cache',
+    'copy_tables_to_local',
+    'iter_batches',
+    'prefetch',
+    'query_metrics',
     'format_datetime_for_db'
 ]
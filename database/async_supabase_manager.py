@@ -0,0 +1,205 @@
+"""
+Async Supabase Manager
+Concurrent multi-table reads for status checks and pending-work fetches
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+
+from .config import DatabaseConfig
+from .instrumentation import instrument_client
+from .supabase_manager import (
+    UNSUMMARIZED_FILTERS, UNCLASSIFIED_FILTERS, STATS_COUNT_FILTERS,
+    apply_filters, build_table_stats
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSupabaseManager:
+    """
+    Async counterpart of SupabaseManager for independent table queries
+
+    Per-table requests are issued together and bounded by a semaphore, so a
+    status check costs roughly the slowest round trip instead of the sum.
+    """
+
+    def __init__(self, client: AsyncClient, max_concurrency: Optional[int] = None):
+        """Use SupabaseManager-style configuration via AsyncSupabaseManager.create()"""
+        self.config = DatabaseConfig()
+        self.client = instrument_client(client)
+        self._semaphore = asyncio.Semaphore(max_concurrency or self.config.MAX_CONCURRENT_QUERIES)
+
+    @classmethod
+    async def create(cls, max_concurrency: Optional[int] = None) -> "AsyncSupabaseManager":
+        """Create a manager with a fresh async client for the running event loop (close() when done)"""
+        config = DatabaseConfig()
+        config.validate_config()
+        if config.DATABASE_BACKEND != "supabase":
+            raise RuntimeError(f"AsyncSupabaseManager requires the supabase backend, not {config.DATABASE_BACKEND}")
+
+        client = await acreate_client(
+            config.SUPABASE_URL,
+            config.SUPABASE_KEY,
+            options=AsyncClientOptions(postgrest_client_timeout=config.REQUEST_TIMEOUT)
+        )
+        return cls(client, max_concurrency)
+
+    async def close(self):
+        """Close the client's HTTP session before its event loop shuts down"""
+        await self.client.postgrest.aclose()
+
+    async def _execute(self, query):
+        """Run one request under the concurrency limit"""
+        async with self._semaphore:
+            return await query.execute()
+
+    async def _count(self, table_name: str, filters: List[tuple] = None) -> int:
+        """Exact row count without transferring rows"""
+        query = self.client.table(table_name).select("id", count="exact", head=True)
+        result = await self._execute(apply_filters(query, filters))
+        return result.count or 0
+
+    # ============ NEWS OPERATIONS ============
+
+    async def article_exists(self, table_name: str, link: str) -> bool:
+        """Check if article already exists"""
+        try:
+            result = await self._execute(
+                self.client.table(table_name).select("link").eq("link", link).limit(1)
+            )
+            return len(result.data) > 0
+        except Exception as e:
+            logger.error(f"Error checking article existence: {e}")
+            return False
+
+    async def _fetch_pending(self, table: str, filters: List[tuple], columns: str,
+                             limit: int, min_length_field: str, min_length: int) -> List[Dict]:
+        """Fetch one page of pending rows from a table, newest first"""
+        query = apply_filters(self.client.table(table).select(columns), filters)
+        result = await self._execute(query.order("id", desc=True).limit(limit))
+
+        articles = []
+        for article in result.data or []:
+            if article.get(min_length_field) and len(article.get(min_length_field, "").strip()) > min_length:
+                article["table_name"] = table
+                articles.append(article)
+        return articles
+
+    async def fetch_unsummarized_articles(self, table_name: str = None, limit: int = 100) -> List[Dict]:
+        """
+        Fetch articles without AI summary, querying all tables concurrently
+
+        Args:
+            table_name: Specific table or None for all tables
+            limit: Maximum number of articles
+
+        Returns:
+            List of articles in table order, as SupabaseManager returns them
+        """
+        tables_to_query = [table_name] if table_name else self.config.get_all_news_tables()
+
+        try:
+            pages = await asyncio.gather(*[
+                self._fetch_pending(table, UNSUMMARIZED_FILTERS, "id, title, content", limit, "content", 50)
+                for table in tables_to_query
+            ])
+            all_articles = [article for page in pages for article in page][:limit]
+
+            logger.info(f"Total unsummarized articles found: {len(all_articles)}")
+            return all_articles
+
+        except Exception as e:
+            logger.error(f"Error fetching unsummarized articles: {e}")
+            return []
+
+    async def fetch_unclassified_articles(self, table_name: str = None, limit: int = 100) -> List[Dict]:
+        """
+        Fetch articles with summaries but without industry classification (General_News only)
+
+        Args:
+            table_name: Should be General_News or None (defaults to General_News)
+            limit: Maximum number of articles
+
+        Returns:
+            List of articles needing industry classification
+        """
+        if table_name and table_name != 'General_News':
+            logger.warning("⚠️ Industry classification only works on General_News table")
+            return []
+
+        try:
+            all_articles = await self._fetch_pending(
+                'General_News', UNCLASSIFIED_FILTERS, "id, title, content, ai_summary", limit, "ai_summary", 10
+            )
+            logger.info(f"Total unclassified articles found: {len(all_articles)}")
+            return all_articles
+
+        except Exception as e:
+            logger.error(f"Error fetching unclassified articles: {e}")
+            return []
+
+    # ============ STATISTICS ============
+
+    async def _table_stats(self, table: str) -> Dict[str, Any]:
+        """Run the count queries of one table concurrently"""
+        names = [name for name in STATS_COUNT_FILTERS if name != "classified" or table == 'General_News']
+
+        try:
+            counts = await asyncio.gather(*[self._count(table, STATS_COUNT_FILTERS[name]) for name in names])
+            counts = dict(zip(names, counts))
+            return build_table_stats(table, counts["total"], counts["summarized"], counts.get("classified", 0))
+
+        except Exception as e:
+            logger.error(f"Error getting stats for {table}: {e}")
+            stats = build_table_stats(table)
+            stats["completion_rate"] = 0
+            return stats
+
+    async def get_table_stats(self) -> Dict[str, Dict]:
+        """Get comprehensive statistics for all news tables"""
+        tables = self.config.get_all_news_tables()
+        results = await asyncio.gather(*[self._table_stats(table) for table in tables])
+        return dict(zip(tables, results))
+
+    async def get_table_count(self, table_name: str) -> int:
+        """Get total count for a table"""
+        try:
+            return await self._count(table_name)
+        except Exception as e:
+            logger.error(f"Error counting table {table_name}: {e}")
+            return 0
+
+    # ============ UTILITY METHODS ============
+
+    async def test_connection(self) -> bool:
+        """Test database connection against every news table at once"""
+        async def probe(table):
+            await self._execute(self.client.table(table).select("id").limit(1))
+            logger.info(f"✅ Connection test passed for {table}")
+
+        try:
+            await asyncio.gather(*[probe(table) for table in self.config.get_all_news_tables()])
+            logger.info("✅ All database connections working properly")
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Database connection test failed: {e}")
+            return False
+
+
+# ============ SYNC ENTRY POINTS ============
+
+def get_table_stats_concurrently() -> Dict[str, Dict]:
+    """Run AsyncSupabaseManager.get_table_stats from synchronous code"""
+    async def run():
+        manager = await AsyncSupabaseManager.create()
+        try:
+            return await manager.get_table_stats()
+        finally:
+            await manager.close()
+
+    return asyncio.run(run())
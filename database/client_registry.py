@@ -0,0 +1,92 @@
+"""
+Client Registry
+Process-wide shared Supabase clients and cached health probes
+"""
+
+import time
+import threading
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+from supabase import create_client, Client, ClientOptions
+
+from .config import DatabaseConfig
+from .instrumentation import instrument_client
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_clients: Dict[Tuple[str, str], Client] = {}
+_health: Dict[Tuple[str, str], Tuple[bool, float]] = {}
+
+
+def get_shared_client(url: Optional[str] = None, key: Optional[str] = None) -> Client:
+    """
+    Get the shared client for a Supabase project, creating it on first use
+
+    A client keeps one keep-alive HTTP session for PostgREST, so reusing it
+    across modules avoids a new TCP/TLS handshake per manager. With
+    DATABASE_BACKEND=sqlite a LocalClient on LOCAL_DATABASE_PATH is returned.
+    With QUERY_METRICS enabled the client records every query in query_metrics.
+
+    Args:
+        url: Supabase URL (default: DatabaseConfig.SUPABASE_URL)
+        key: Supabase key (default: DatabaseConfig.SUPABASE_KEY)
+
+    Returns:
+        Client shared by every caller with the same configuration
+    """
+    if DatabaseConfig.DATABASE_BACKEND == "sqlite":
+        config_key = ("sqlite", DatabaseConfig.LOCAL_DATABASE_PATH)
+    else:
+        config_key = (url or DatabaseConfig.SUPABASE_URL, key or DatabaseConfig.SUPABASE_KEY)
+
+    client = _clients.get(config_key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(config_key)
+        if client is None and config_key[0] == "sqlite":
+            from .local_backend import LocalClient
+            client = instrument_client(LocalClient(config_key[1]))
+            _clients[config_key] = client
+        elif client is None:
+            options = ClientOptions(postgrest_client_timeout=DatabaseConfig.REQUEST_TIMEOUT)
+            client = instrument_client(create_client(config_key[0], config_key[1], options=options))
+            _clients[config_key] = client
+            logger.info(f"🔌 Created shared Supabase client for {config_key[0]}")
+        return client
+
+
+def check_health(probe: Callable[[], bool], url: Optional[str] = None, key: Optional[str] = None,
+                 force: bool = False) -> bool:
+    """
+    Run a connection probe at most once per HEALTH_CHECK_TTL seconds
+
+    Args:
+        probe: Function performing the real check
+        url: Supabase URL the probe targets
+        key: Supabase key the probe uses
+        force: Ignore the cached result
+
+    Returns:
+        bool: Cached or fresh probe result
+    """
+    config_key = (url or DatabaseConfig.SUPABASE_URL, key or DatabaseConfig.SUPABASE_KEY)
+
+    if not force:
+        cached = _health.get(config_key)
+        if cached and cached[0] and time.monotonic() - cached[1] < DatabaseConfig.HEALTH_CHECK_TTL:
+            return True
+
+    healthy = probe()
+    _health[config_key] = (healthy, time.monotonic())
+    return healthy
+
+
+def reset_shared_clients():
+    """Drop all shared clients and cached health results"""
+    with _lock:
+        _clients.clear()
+        _health.clear()
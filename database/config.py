@@ -16,6 +16,10 @@ class DatabaseConfig:
     SUPABASE_URL = os.getenv("SUPABASE_URL", "https://baenxyqklayjtlbmubxe.supabase.co")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY", "sb_secret_4Mj3OwBW9VlbhVU6bVrfLA_1olLCYpp")
     
+    # Backend: "supabase" (hosted project) or "sqlite" (local file for offline runs and benchmarks)
+    DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "supabase").lower()
+    LOCAL_DATABASE_PATH = os.getenv("LOCAL_DATABASE_PATH", "data/spa_vip_local.db")
+    
     # Table Names - News Tables
     NEWS_TABLES = {
         "general_news": "General_News",
@@ -36,6 +40,39 @@ class DatabaseConfig:
     # Stock Codes
     STOCK_CODES = ["FPT", "GAS", "IMP", "VCB"]
     
+    # Bulk write settings
+    INSERT_CHUNK_SIZE = int(os.getenv("INSERT_CHUNK_SIZE", 100))  # Rows per multi-row upsert
+    UPDATE_CHUNK_SIZE = int(os.getenv("UPDATE_CHUNK_SIZE", 200))  # Rows per bulk update call
+    BULK_UPDATE_FUNCTION = "bulk_update_rows"  # Server-side function from database_setup.sql
+    STATS_FUNCTION = "news_table_stats"  # Server-side aggregate from database_setup.sql
+    
+    # Write-behind settings (model outputs are spooled to disk until written)
+    WRITE_BEHIND_DIR = os.getenv("WRITE_BEHIND_DIR", "logs/write_behind")  # Spool files; "" disables spooling
+    WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", 2.0))  # Seconds between background flushes
+    WRITE_BEHIND_MAX_RETRIES = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", 5))  # Failed flushes before a row is dropped
+    WRITE_BEHIND_BACKOFF = float(os.getenv("WRITE_BEHIND_BACKOFF", 1.0))  # First retry delay in seconds, doubled per failure
+    
+    # Read settings
+    PAGE_SIZE = int(os.getenv("PAGE_SIZE", 500))  # Rows per keyset page (keep below PostgREST max-rows)
+    STATS_CACHE_TTL = int(os.getenv("STATS_CACHE_TTL", 60))  # Seconds table stats are reused between writes
+    STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", 4))  # Chunks buffered between streaming pipeline stages
+    
+    # Connection settings
+    REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", 120))  # Seconds per PostgREST request
+    HEALTH_CHECK_TTL = int(os.getenv("HEALTH_CHECK_TTL", 300))  # Seconds a passed connection test is reused
+    QUERY_METRICS = os.getenv("QUERY_METRICS", "0").lower() in ("1", "true", "yes")  # Time and tag every query (profiling, off by default)
+    MAX_CONCURRENT_QUERIES = int(os.getenv("MAX_CONCURRENT_QUERIES", 8))  # In-flight requests for AsyncSupabaseManager
+    
+    # Crawler dedup settings
+    LINK_INDEX_DIR = os.getenv("LINK_INDEX_DIR")  # Persist known-link indexes here between runs (unset = memory only)
+    
+    # Inference cache settings
+    INFERENCE_CACHE_PATH = os.getenv("INFERENCE_CACHE_PATH", "data/inference_cache.db")  # Model outputs by text hash ("" = disabled)
+    INFERENCE_CACHE_MAX_ENTRIES = int(os.getenv("INFERENCE_CACHE_MAX_ENTRIES", 200000))  # LRU bound
+    
+    # Sentiment-to-stock settings
+    TRADING_CALENDAR_DIR = os.getenv("TRADING_CALENDAR_DIR", "data/trading_calendar")  # Cached trading days per database and stock table ("" = memory only)
+    
     # API URLs
     FIREANT_BASE_URL = "https://fireant.vn"
     FIREANT_STOCK_URL = "https://fireant.vn/ma-chung-khoan"
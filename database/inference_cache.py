@@ -0,0 +1,208 @@
+"""
+Inference Cache
+Persistent model-output cache keyed by normalized-text hash and model version
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+import logging
+from typing import Any, Dict, Optional, Sequence
+
+from .config import DatabaseConfig
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def text_key(text: str) -> str:
+    """Hash of the text after Unicode NFC and whitespace normalization"""
+    normalized = _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class InferenceCache:
+    """
+    SQLite store of model outputs shared by all pipeline stages
+
+    The same article often lands in several news tables, so outputs are keyed
+    by (kind, model version, text hash) rather than by row. Stored values are
+    JSON: sentiment logits, industry probabilities, generated summaries. The
+    cache is bounded to max_entries; the least recently used entries are
+    evicted first.
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = None):
+        """
+        Args:
+            path: SQLite file
+            max_entries: Entries kept before LRU eviction (default: DatabaseConfig.INFERENCE_CACHE_MAX_ENTRIES)
+        """
+        self.path = path
+        self.max_entries = max_entries or DatabaseConfig.INFERENCE_CACHE_MAX_ENTRIES
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS inference_cache (
+                kind TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                value TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (kind, model_version, text_hash)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_inference_cache_lru ON inference_cache(last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT count(*) FROM inference_cache").fetchone()[0]
+
+    def _record(self, kind: str, hits: int, misses: int):
+        counters = self.stats.setdefault(kind, {"hits": 0, "misses": 0, "stored": 0, "evicted": 0})
+        counters["hits"] += hits
+        counters["misses"] += misses
+
+    # ============ LOOKUP ============
+
+    def get_many(self, kind: str, model_version: str, texts: Sequence[str]) -> Dict[int, Any]:
+        """
+        Look up cached outputs
+
+        Args:
+            kind: Output type, e.g. "sentiment", "industry", "summary"
+            model_version: Version string of the producing model
+            texts: Model inputs
+
+        Returns:
+            Dict mapping index in texts -> cached value (misses are absent)
+        """
+        keys = [text_key(text) for text in texts]
+        found = {}
+        try:
+            with self._lock:
+                unique = list(set(keys))
+                for start in range(0, len(unique), 500):
+                    chunk = unique[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT text_hash, value FROM inference_cache "
+                        f"WHERE kind = ? AND model_version = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                        [kind, model_version, *chunk]
+                    ).fetchall()
+                    found.update(rows)
+
+                if found:
+                    now = time.time()
+                    self._conn.executemany(
+                        "UPDATE inference_cache SET last_used = ? WHERE kind = ? AND model_version = ? AND text_hash = ?",
+                        [(now, kind, model_version, key) for key in found]
+                    )
+                    self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"❌ Inference cache lookup failed: {e}")
+            found = {}
+
+        results = {index: json.loads(found[key]) for index, key in enumerate(keys) if key in found}
+        self._record(kind, len(results), len(texts) - len(results))
+        return results
+
+    def get(self, kind: str, model_version: str, text: str) -> Optional[Any]:
+        """Cached output for one text, None on a miss"""
+        return self.get_many(kind, model_version, [text]).get(0)
+
+    # ============ STORE ============
+
+    def put_many(self, kind: str, model_version: str, texts: Sequence[str], values: Sequence[Any]):
+        """Store outputs for texts (values must be JSON-serializable)"""
+        if not texts:
+            return
+
+        now = time.time()
+        rows = [(kind, model_version, text_key(text), json.dumps(value, ensure_ascii=False), now)
+                for text, value in zip(texts, values) if value is not None]
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO inference_cache (kind, model_version, text_hash, value, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+                self._size += len(rows)
+                self.stats.setdefault(kind, {"hits": 0, "misses": 0, "stored": 0, "evicted": 0})["stored"] += len(rows)
+
+                if self._size > self.max_entries:
+                    self._evict(kind)
+        except sqlite3.Error as e:
+            logger.error(f"❌ Inference cache store failed: {e}")
+
+    def put(self, kind: str, model_version: str, text: str, value: Any):
+        """Store the output for one text"""
+        self.put_many(kind, model_version, [text], [value])
+
+    def _evict(self, kind: str):
+        """Drop least recently used entries down to 90% of max_entries"""
+        self._size = self._conn.execute("SELECT count(*) FROM inference_cache").fetchone()[0]
+        excess = self._size - int(self.max_entries * 0.9)
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM inference_cache WHERE rowid IN "
+            "(SELECT rowid FROM inference_cache ORDER BY last_used LIMIT ?)",
+            (excess,)
+        )
+        self._conn.commit()
+        self._size -= excess
+        self.stats[kind]["evicted"] += excess
+        logger.info(f"🧹 Inference cache evicted {excess} least recently used entries")
+
+    # ============ METRICS ============
+
+    def hit_rate(self, kind: Optional[str] = None) -> float:
+        """Fraction of lookups served from the cache (all kinds if kind is None)"""
+        counters = [self.stats[kind]] if kind else list(self.stats.values())
+        hits = sum(c["hits"] for c in counters if c)
+        lookups = hits + sum(c["misses"] for c in counters if c)
+        return hits / lookups if lookups else 0.0
+
+    def log_summary(self):
+        """Log hits, misses and hit rate per output kind"""
+        if not self.stats:
+            return
+        logger.info(f"🗃️ Inference cache ({self._size} entries, max {self.max_entries}):")
+        for kind, c in sorted(self.stats.items()):
+            lookups = c["hits"] + c["misses"]
+            logger.info(f"   {kind}: {c['hits']}/{lookups} hits ({self.hit_rate(kind):.1%}), "
+                        f"{c['stored']} stored, {c['evicted']} evicted")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[InferenceCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_inference_cache() -> Optional[InferenceCache]:
+    """Process-wide inference cache, None if INFERENCE_CACHE_PATH is empty"""
+    global _cache
+    if not DatabaseConfig.INFERENCE_CACHE_PATH:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = InferenceCache(DatabaseConfig.INFERENCE_CACHE_PATH)
+            except Exception as e:
+                logger.error(f"❌ Could not open inference cache {DatabaseConfig.INFERENCE_CACHE_PATH}: {e}")
+                return None
+        return _cache
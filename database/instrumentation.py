@@ -0,0 +1,329 @@
+"""
+Query Instrumentation
+Per-query-shape timing, row and payload metrics for database calls
+
+A profiling tool, off by default (QUERY_METRICS=1 to enable). Response sizes
+come from the HTTP transport (a response hook on the PostgREST session reads
+Content-Length), never from re-encoding parsed rows.
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import inspect
+import contextvars
+import threading
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from .config import DatabaseConfig
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# Builder methods whose first argument is a column name; values are never part of a shape
+_COLUMN_METHODS = {"eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "is_", "in_", "order", "contains"}
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Response bytes of the query executing in this thread / task, None outside execute()
+_bytes_received = contextvars.ContextVar("query_bytes_received", default=None)
+
+
+def _payload_size(data: Any) -> int:
+    """Approximate JSON size in bytes"""
+    if data is None:
+        return 0
+    try:
+        return len(json.dumps(data, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _content_length(response) -> Optional[int]:
+    length = response.headers.get("content-length")
+    return int(length) if length and length.isdigit() else None
+
+
+def _on_response(response):
+    """httpx response hook adding the body size to the executing query"""
+    counter = _bytes_received.get()
+    if counter is not None:
+        size = _content_length(response)
+        counter[0] += size if size is not None else len(response.read())
+
+
+async def _on_response_async(response):
+    """Async httpx response hook adding the body size to the executing query"""
+    counter = _bytes_received.get()
+    if counter is not None:
+        size = _content_length(response)
+        counter[0] += size if size is not None else len(await response.aread())
+
+
+def _hook_session(client):
+    """Register the response hook on the client's PostgREST HTTP session once"""
+    try:
+        session = client.postgrest.session
+        hooks = session.event_hooks["response"]
+    except (AttributeError, KeyError, TypeError):
+        return  # No HTTP session (local backend)
+    hook = _on_response_async if inspect.iscoroutinefunction(session.send) else _on_response
+    if hook not in hooks:
+        hooks.append(hook)
+
+
+def _caller_site() -> str:
+    """First stack frame outside the database package, as file:function:line"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if not filename.startswith(_PACKAGE_DIR) and "site-packages" not in filename:
+            return f"{os.path.relpath(filename)}:{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class ShapeStats:
+    """Aggregated metrics of one query shape"""
+
+    def __init__(self, shape: str):
+        self.shape = shape
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.callers = Counter()
+
+    def record(self, elapsed_ms: float, rows: int, bytes_sent: int, bytes_received: int, caller: str, error: bool):
+        self.calls += 1
+        self.errors += error
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+        self.bytes_sent += bytes_sent
+        self.bytes_received += bytes_received
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.callers[caller] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of calls"""
+        target = fraction * self.calls
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target and count:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "shape": self.shape,
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 1),
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max_ms, 1),
+            "rows": self.rows,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency_histogram": dict(zip([f"<={b}ms" for b in LATENCY_BUCKETS_MS] + ["more"], self.buckets)),
+            "callers": dict(self.callers.most_common()),
+        }
+
+
+class QueryMetrics:
+    """Process-wide registry of query metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._shapes: Dict[str, ShapeStats] = {}
+        self.started_at = time.time()
+
+    def record(self, shape: str, elapsed_ms: float, rows: int = 0, bytes_sent: int = 0,
+               bytes_received: int = 0, caller: str = "unknown", error: bool = False):
+        with self._lock:
+            stats = self._shapes.get(shape)
+            if stats is None:
+                stats = self._shapes[shape] = ShapeStats(shape)
+            stats.record(elapsed_ms, rows, bytes_sent, bytes_received, caller, error)
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """All shapes, most total time first"""
+        with self._lock:
+            shapes = [stats.to_dict() for stats in self._shapes.values()]
+        return sorted(shapes, key=lambda s: s["total_ms"], reverse=True)
+
+    def log_summary(self, top: int = 15):
+        """Log the query shapes that cost the most time"""
+        shapes = self.snapshot()
+        if not shapes:
+            return
+
+        logger.info("\n" + "=" * 80)
+        logger.info("🔬 DATABASE QUERY METRICS")
+        logger.info("=" * 80)
+        logger.info(f"{'Calls':>6} {'Total s':>8} {'Avg ms':>8} {'p95 ms':>8} {'Rows':>8} {'Sent KB':>8} {'Recv KB':>8}  "
+                    f"Shape / top caller")
+        logger.info("-" * 80)
+        for s in shapes[:top]:
+            top_caller = next(iter(s["callers"]), "")
+            logger.info(
+                f"{s['calls']:>6} {s['total_ms'] / 1000:>8.1f} {s['avg_ms']:>8.1f} {s['p95_ms']:>8.0f} "
+                f"{s['rows']:>8} {s['bytes_sent'] / 1024:>8.0f} {s['bytes_received'] / 1024:>8.0f}  {s['shape']}"
+            )
+            logger.info(f"{'':>58}  ↳ {top_caller}")
+        logger.info("=" * 80)
+
+    def export_json(self, path: str) -> Optional[str]:
+        """Write all metrics to a JSON file"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "started_at": self.started_at,
+                    "exported_at": time.time(),
+                    "shapes": self.snapshot()
+                }, f, ensure_ascii=False, indent=2)
+            logger.info(f"🔬 Query metrics exported to {path}")
+            return path
+        except Exception as e:
+            logger.error(f"❌ Error exporting query metrics: {e}")
+            return None
+
+
+query_metrics = QueryMetrics()
+
+
+class InstrumentedQuery:
+    """Wraps a query builder, recording its shape and timing execute()"""
+
+    def __init__(self, builder, shape: List[str], bytes_sent: int = 0):
+        self._builder = builder
+        self._shape = shape
+        self._bytes_sent = bytes_sent
+
+    @property
+    def not_(self):
+        return InstrumentedQuery(self._builder.not_, self._shape + ["not"], self._bytes_sent)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if not hasattr(result, "execute"):
+                return result
+
+            if name == "select":
+                part = f"select({','.join(a.strip() for a in ','.join(args).split(','))})"
+                if kwargs.get("head"):
+                    part += "[head]"
+            elif name in _COLUMN_METHODS and args:
+                part = f"{name}({args[0]})"
+            elif name == "filter" and len(args) >= 2:
+                part = f"filter({args[0]} {args[1]})"
+            elif name == "or_" and args:
+                part = f"or({args[0]})"
+            elif name in ("upsert", "update", "insert") and kwargs.get("on_conflict"):
+                part = f"{name}(on_conflict={kwargs['on_conflict']})"
+            else:
+                part = name
+
+            bytes_sent = self._bytes_sent
+            if name in ("insert", "upsert", "update") and args:
+                bytes_sent += _payload_size(args[0])
+            return InstrumentedQuery(result, self._shape + [part], bytes_sent)
+
+        return call
+
+    def execute(self):
+        shape = ".".join(self._shape)
+        caller = _caller_site()
+        start = time.perf_counter()
+        received = [0]
+        token = _bytes_received.set(received)
+        try:
+            response = self._builder.execute()
+        except Exception:
+            self._record(shape, start, caller, received[0], error=True)
+            raise
+        finally:
+            _bytes_received.reset(token)
+
+        if inspect.isawaitable(response):
+            # Async builders (AsyncSupabaseManager): time the awaited request
+            return self._execute_async(response, shape, caller, start)
+        self._record(shape, start, caller, received[0], response=response)
+        return response
+
+    async def _execute_async(self, pending, shape: str, caller: str, start: float):
+        received = [0]
+        token = _bytes_received.set(received)
+        try:
+            response = await pending
+        except Exception:
+            self._record(shape, start, caller, received[0], error=True)
+            raise
+        finally:
+            _bytes_received.reset(token)
+        self._record(shape, start, caller, received[0], response=response)
+        return response
+
+    def _record(self, shape: str, start: float, caller: str, bytes_received: int, response=None,
+                error: bool = False):
+        data = getattr(response, "data", None)
+        query_metrics.record(
+            shape,
+            (time.perf_counter() - start) * 1000,
+            rows=len(data) if isinstance(data, list) else int(data is not None),
+            bytes_sent=self._bytes_sent,
+            bytes_received=bytes_received,
+            caller=caller,
+            error=error
+        )
+
+
+class InstrumentedClient:
+    """Client proxy routing table() and rpc() through InstrumentedQuery"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, table_name: str):
+        _hook_session(self._client)
+        return InstrumentedQuery(self._client.table(table_name), [table_name])
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None, *args, **kwargs):
+        _hook_session(self._client)
+        builder = self._client.rpc(name, params or {}, *args, **kwargs)
+        return InstrumentedQuery(builder, [f"rpc:{name}"], _payload_size(params))
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+def instrument_client(client):
+    """Wrap a client when QUERY_METRICS is enabled"""
+    if not DatabaseConfig.QUERY_METRICS or isinstance(client, InstrumentedClient):
+        return client
+    return InstrumentedClient(client)
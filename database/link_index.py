@@ -0,0 +1,170 @@
+"""
+Known Link Index
+Compact per-table set of stored article links for crawler deduplication
+"""
+
+import os
+import struct
+import bisect
+import hashlib
+import logging
+from array import array
+from itertools import chain
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# File layout: magic, last loaded id, then one unsigned 64-bit hash per link
+_FILE_MAGIC = b"SPALNK1\0"
+_HEADER = struct.Struct("<8sq")
+
+# New hashes wait in a set until it holds this many and 1/8 of the sorted array
+_MIN_PENDING = 4096
+
+
+def hash_link(link: str) -> int:
+    """64-bit fingerprint of a normalized link"""
+    digest = hashlib.blake2b(link.strip().encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class KnownLinkIndex:
+    """
+    Set of 64-bit link hashes for one news table
+
+    Hashes live in a sorted array("Q") searched with bisect, 8 bytes per
+    stored article, so a table with hundreds of thousands of rows stays in a
+    few MB. New hashes go to a small set that is merged into the array once
+    it grows past 1/8 of it (and on save). The index loads with one paged
+    projection of (id, link) and afterwards only reads rows whose id is
+    greater than the last one seen.
+    """
+
+    def __init__(self, table_name: str, storage_dir: Optional[str] = None):
+        self.table_name = table_name
+        self.storage_dir = storage_dir
+        self.last_id = 0
+        self._sorted = array("Q")
+        self._pending = set()
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._pending)
+
+    def __contains__(self, link: str) -> bool:
+        return bool(link) and self._contains_hash(hash_link(link))
+
+    def _contains_hash(self, value: int) -> bool:
+        if value in self._pending:
+            return True
+        index = bisect.bisect_left(self._sorted, value)
+        return index < len(self._sorted) and self._sorted[index] == value
+
+    def _add_hash(self, value: int):
+        if not self._contains_hash(value):
+            self._pending.add(value)
+            if len(self._pending) >= max(_MIN_PENDING, len(self._sorted) // 8):
+                self._merge()
+
+    def _merge(self):
+        """Fold pending hashes into the sorted array"""
+        if self._pending:
+            self._sorted = array("Q", sorted(chain(self._sorted, self._pending)))
+            self._pending = set()
+
+    def add(self, link: str):
+        """Record a link as stored"""
+        if link:
+            self._add_hash(hash_link(link))
+
+    def add_many(self, links: Iterable[str]):
+        """Record several links as stored"""
+        for link in links:
+            self.add(link)
+
+    def filter_new(self, links: Iterable[str]) -> List[str]:
+        """
+        Keep only links not yet stored, preserving order
+
+        Args:
+            links: Candidate links collected from a listing page
+
+        Returns:
+            Links worth opening
+        """
+        return [link for link in links if link not in self]
+
+    # ============ LOADING ============
+
+    def refresh(self, db_manager) -> int:
+        """
+        Pull links inserted since the last refresh
+
+        Args:
+            db_manager: SupabaseManager used for the paged read
+
+        Returns:
+            int: Number of rows read
+        """
+        count = 0
+        try:
+            for row in db_manager.iter_rows(self.table_name, None, "id, link", start_after=self.last_id or None):
+                self.add(row.get("link"))
+                self.last_id = max(self.last_id, row["id"])
+                count += 1
+        except Exception as e:
+            logger.error(f"❌ Error loading known links for {self.table_name}: {e}")
+
+        logger.info(f"🔎 Known-link index {self.table_name}: +{count} rows, {len(self)} links")
+        return count
+
+    # ============ PERSISTENCE ============
+
+    @property
+    def path(self) -> Optional[str]:
+        if not self.storage_dir:
+            return None
+        return os.path.join(self.storage_dir, f"{self.table_name}.links")
+
+    def load(self) -> bool:
+        """Load hashes saved by a previous run, if persistence is enabled"""
+        path = self.path
+        if not path or not os.path.exists(path):
+            return False
+
+        try:
+            with open(path, "rb") as f:
+                magic, last_id = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _FILE_MAGIC:
+                    logger.warning(f"⚠️ Ignoring unknown link index file: {path}")
+                    return False
+                hashes = array("Q")
+                hashes.frombytes(f.read())
+
+            for value in hashes:
+                self._add_hash(value)
+            self.last_id = max(self.last_id, last_id)
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Error reading link index {path}: {e}")
+            return False
+
+    def save(self) -> bool:
+        """Write hashes to disk, if persistence is enabled"""
+        path = self.path
+        if not path:
+            return False
+
+        try:
+            os.makedirs(self.storage_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(_FILE_MAGIC, self.last_id))
+                self._merge()
+                self._sorted.tofile(f)
+            os.replace(tmp_path, path)
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Error saving link index {path}: {e}")
+            return False
@@ -0,0 +1,469 @@
+"""
+Local Database Backend
+SQLite stand-in for the Supabase client, for offline runs and benchmarks
+
+Implements the part of the supabase-py / postgrest query builder used by this
+project (select/insert/upsert/update/delete, eq/neq/gt/gte/lt/lte/like/ilike,
+in_, is_, not_, filter, or_, order, limit, range, exact counts, head requests)
+plus the server-side functions from database_setup.sql. SupabaseManager and the
+pipeline modules run on it unchanged when DATABASE_BACKEND=sqlite.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .config import DatabaseConfig
+
+logger = logging.getLogger(__name__)
+
+NEWS_COLUMNS = ["title", "content", "date", "link", "ai_summary", "sentiment"]
+STOCK_COLUMNS = [
+    "date", "open_price", "high_price", "low_price", "close_price", "change",
+    "change_pct", "volume", "Positive", "Neutral", "Negative", "predict_price"
+]
+
+
+class LocalBackendError(Exception):
+    """Error shaped like postgrest APIError (message + code)"""
+
+    def __init__(self, message: str, code: Optional[str] = None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+class LocalResponse:
+    """Response shaped like postgrest APIResponse"""
+
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _parse_value(value: Any) -> Any:
+    """Convert PostgREST literal strings to SQL parameters"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _split_top_level(expression: str) -> List[str]:
+    """Split an or_() expression on commas outside parentheses"""
+    parts, depth, current = [], 0, ""
+    for char in expression:
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current += char
+    parts.append(current)
+    return [part.strip() for part in parts if part.strip()]
+
+
+class LocalQuery:
+    """Chainable query builder over one SQLite table"""
+
+    def __init__(self, client: "LocalClient", table_name: str):
+        self._client = client
+        self._table = table_name
+        self._action = "select"
+        self._columns = "*"
+        self._count = None
+        self._head = False
+        self._payload = None
+        self._on_conflict = None
+        self._ignore_duplicates = False
+        self._where: List[Tuple[str, list]] = []
+        self._order: List[str] = []
+        self._limit = None
+        self._offset = None
+        self._negate_next = False
+
+    # ============ ACTIONS ============
+
+    def select(self, *columns, count: Optional[str] = None, head: Optional[bool] = None):
+        self._action = "select"
+        self._columns = ",".join(columns) if columns else "*"
+        self._count = count
+        self._head = bool(head)
+        return self
+
+    def insert(self, json_data, *, count=None, returning=None, upsert=False, **kwargs):
+        self._action = "upsert" if upsert else "insert"
+        self._payload = json_data
+        return self
+
+    def upsert(self, json_data, *, count=None, returning=None, ignore_duplicates=False,
+               on_conflict="", **kwargs):
+        self._action = "upsert"
+        self._payload = json_data
+        self._ignore_duplicates = ignore_duplicates
+        self._on_conflict = on_conflict or None
+        return self
+
+    def update(self, json_data, *, count=None, returning=None):
+        self._action = "update"
+        self._payload = json_data
+        return self
+
+    def delete(self, *, count=None, returning=None):
+        self._action = "delete"
+        return self
+
+    # ============ FILTERS ============
+
+    @property
+    def not_(self):
+        self._negate_next = True
+        return self
+
+    def _add(self, sql: str, params: list):
+        if self._negate_next:
+            sql = f"NOT ({sql})"
+            self._negate_next = False
+        self._where.append((sql, params))
+        return self
+
+    def _condition(self, column: str, operator: str, value: Any) -> Tuple[str, list]:
+        """Build the SQL for one PostgREST operator"""
+        col = _quote(column)
+        if value is None:
+            value = "None"  # postgrest formats filter values with str()
+        negate = operator.startswith("not.")
+        if negate:
+            operator = operator[4:]
+
+        if operator in ("eq", "neq", "gt", "gte", "lt", "lte"):
+            symbol = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}[operator]
+            sql, params = f"{col} {symbol} ?", [_parse_value(value)]
+        elif operator in ("like", "ilike"):
+            pattern = str(value).replace("*", "%")
+            sql = f"{col} LIKE ?" if operator == "ilike" else f"{col} GLOB ?"
+            params = [pattern if operator == "ilike" else pattern.replace("%", "*")]
+        elif operator == "is":
+            literal = str(value).lower()
+            if literal in ("null", "none"):
+                sql, params = f"{col} IS NULL", []
+            else:
+                sql, params = f"{col} IS ?", [1 if literal == "true" else 0]
+        elif operator == "in":
+            values = value
+            if isinstance(value, str):
+                values = [v.strip().strip('"') for v in value.strip("()").split(",") if v.strip()]
+            values = list(values)
+            if not values:
+                sql, params = "0", []
+            else:
+                sql, params = f"{col} IN ({', '.join('?' * len(values))})", [_parse_value(v) for v in values]
+        else:
+            raise LocalBackendError(f"Unsupported filter operator: {operator}", "PGRST100")
+
+        return (f"NOT ({sql})" if negate else sql), params
+
+    def eq(self, column: str, value: Any):
+        return self._add(*self._condition(column, "eq", value))
+
+    def neq(self, column: str, value: Any):
+        return self._add(*self._condition(column, "neq", value))
+
+    def gt(self, column: str, value: Any):
+        return self._add(*self._condition(column, "gt", value))
+
+    def gte(self, column: str, value: Any):
+        return self._add(*self._condition(column, "gte", value))
+
+    def lt(self, column: str, value: Any):
+        return self._add(*self._condition(column, "lt", value))
+
+    def lte(self, column: str, value: Any):
+        return self._add(*self._condition(column, "lte", value))
+
+    def like(self, column: str, pattern: str):
+        return self._add(*self._condition(column, "like", pattern))
+
+    def ilike(self, column: str, pattern: str):
+        return self._add(*self._condition(column, "ilike", pattern))
+
+    def is_(self, column: str, value: Any):
+        return self._add(*self._condition(column, "is", value))
+
+    def in_(self, column: str, values: Iterable[Any]):
+        return self._add(*self._condition(column, "in", values))
+
+    def filter(self, column: str, operator: str, criteria: Any):
+        return self._add(*self._condition(column, operator, criteria))
+
+    def or_(self, filters: str, reference_table: Optional[str] = None):
+        """PostgREST logic tree: "col.op.value,col.op.value" """
+        conditions, params = [], []
+        for part in _split_top_level(filters):
+            column, rest = part.split(".", 1)
+            prefix = ""
+            if rest.startswith("not."):
+                prefix, rest = "not.", rest[4:]
+            operator, value = rest.split(".", 1) if "." in rest else (rest, "")
+            sql, sql_params = self._condition(column, prefix + operator, value)
+            conditions.append(sql)
+            params.extend(sql_params)
+        return self._add("(" + " OR ".join(conditions) + ")", params)
+
+    # ============ MODIFIERS ============
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None,
+              foreign_table: Optional[str] = None):
+        nulls = "" if nullsfirst is None else (" NULLS FIRST" if nullsfirst else " NULLS LAST")
+        self._order.append(f"{_quote(column)} {'DESC' if desc else 'ASC'}{nulls}")
+        return self
+
+    def limit(self, size: int, *, foreign_table: Optional[str] = None):
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, foreign_table: Optional[str] = None):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    # ============ EXECUTION ============
+
+    def _where_sql(self) -> Tuple[str, list]:
+        if not self._where:
+            return "", []
+        clauses = " AND ".join(sql for sql, _ in self._where)
+        params = [param for _, sql_params in self._where for param in sql_params]
+        return f" WHERE {clauses}", params
+
+    def _select_columns(self) -> str:
+        columns = [c.strip() for c in self._columns.split(",") if c.strip()]
+        if not columns or "*" in columns:
+            return "*"
+        return ", ".join(_quote(c) for c in columns)
+
+    def execute(self) -> LocalResponse:
+        with self._client.lock:
+            self._client.ensure_table(self._table)
+            return getattr(self, f"_execute_{self._action}")()
+
+    def _execute_select(self) -> LocalResponse:
+        conn = self._client.connection
+        where, params = self._where_sql()
+        table = _quote(self._table)
+
+        count = None
+        if self._count:
+            count = conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+        if self._head:
+            return LocalResponse([], count)
+
+        sql = f"SELECT {self._select_columns()} FROM {table}{where}"
+        if self._order:
+            sql += " ORDER BY " + ", ".join(self._order)
+        if self._limit is not None or self._offset is not None:
+            sql += f" LIMIT {self._limit if self._limit is not None else -1}"
+            if self._offset:
+                sql += f" OFFSET {self._offset}"
+
+        return LocalResponse([dict(row) for row in conn.execute(sql, params)], count)
+
+    def _rows(self) -> List[Dict[str, Any]]:
+        return self._payload if isinstance(self._payload, list) else [self._payload]
+
+    def _execute_insert(self) -> LocalResponse:
+        return self._write_rows(conflict_clause="")
+
+    def _execute_upsert(self) -> LocalResponse:
+        target = _quote(self._on_conflict) if self._on_conflict else '"id"'
+        return self._write_rows(conflict_clause=f" ON CONFLICT({target}) DO " + ("NOTHING" if self._ignore_duplicates else "UPDATE SET {updates}"))
+
+    def _write_rows(self, conflict_clause: str) -> LocalResponse:
+        conn = self._client.connection
+        inserted = []
+        for row in self._rows():
+            if not row:
+                continue
+            columns = list(row.keys())
+            self._client.ensure_columns(self._table, columns)
+            updates = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in columns if c != self._on_conflict)
+            clause = conflict_clause.format(updates=updates or '"id" = "id"')
+            sql = (
+                f"INSERT INTO {_quote(self._table)} ({', '.join(_quote(c) for c in columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))}){clause} RETURNING *"
+            )
+            try:
+                inserted.extend(dict(r) for r in conn.execute(sql, [_parse_value(row[c]) for c in columns]))
+            except sqlite3.IntegrityError as e:
+                conn.rollback()
+                raise LocalBackendError(str(e), "23505")
+        conn.commit()
+        return LocalResponse(inserted, len(inserted) if self._count else None)
+
+    def _execute_update(self) -> LocalResponse:
+        conn = self._client.connection
+        values = dict(self._payload or {})
+        if not values:
+            return LocalResponse([])
+        self._client.ensure_columns(self._table, list(values.keys()))
+
+        where, params = self._where_sql()
+        assignments = ", ".join(f"{_quote(c)} = ?" for c in values)
+        sql = f"UPDATE {_quote(self._table)} SET {assignments}{where} RETURNING *"
+        rows = [dict(r) for r in conn.execute(sql, [_parse_value(v) for v in values.values()] + params)]
+        conn.commit()
+        return LocalResponse(rows, len(rows) if self._count else None)
+
+    def _execute_delete(self) -> LocalResponse:
+        conn = self._client.connection
+        where, params = self._where_sql()
+        rows = [dict(r) for r in conn.execute(f"DELETE FROM {_quote(self._table)}{where} RETURNING *", params)]
+        conn.commit()
+        return LocalResponse(rows, len(rows) if self._count else None)
+
+
+class LocalRPC:
+    """Deferred call of a server-side function"""
+
+    def __init__(self, client: "LocalClient", name: str, params: Dict[str, Any]):
+        self._client = client
+        self._name = name
+        self._params = params or {}
+
+    def execute(self) -> LocalResponse:
+        handler = getattr(self._client, f"_rpc_{self._name}", None)
+        if handler is None:
+            raise LocalBackendError(f"Could not find the function public.{self._name}", "PGRST202")
+        return LocalResponse(handler(**self._params))
+
+
+class LocalClient:
+    """SQLite-backed object with the supabase Client surface used by SupabaseManager"""
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._columns: Dict[str, set] = {}
+
+        for table in DatabaseConfig.get_all_news_tables() + DatabaseConfig.get_all_stock_tables():
+            self.ensure_table(table)
+
+        logger.info(f"🗄️ Using local SQLite backend: {path}")
+
+    def table(self, table_name: str) -> LocalQuery:
+        return LocalQuery(self, table_name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> LocalRPC:
+        return LocalRPC(self, name, params)
+
+    # ============ SCHEMA ============
+
+    def ensure_table(self, table_name: str):
+        """Create a table mirroring database_setup.sql on first use"""
+        if table_name in self._columns:
+            return
+
+        if table_name in DatabaseConfig.get_all_stock_tables():
+            columns = STOCK_COLUMNS
+            unique = "date"
+        else:
+            columns = NEWS_COLUMNS + (["industry"] if table_name == "General_News" else [])
+            unique = "link"
+
+        definitions = ", ".join(
+            f"{_quote(c)} TEXT" + (" UNIQUE" if c == unique else "") for c in columns
+        )
+        with self.lock:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {_quote(table_name)} (id INTEGER PRIMARY KEY AUTOINCREMENT, {definitions})"
+            )
+            self.connection.commit()
+            existing = self.connection.execute(f"PRAGMA table_info({_quote(table_name)})").fetchall()
+        self._columns[table_name] = {row["name"].lower() for row in existing}
+
+    def ensure_columns(self, table_name: str, columns: List[str]):
+        """Add columns written by callers that the local schema does not have yet"""
+        known = self._columns[table_name]
+        for column in columns:
+            if column.lower() not in known:
+                self.connection.execute(f"ALTER TABLE {_quote(table_name)} ADD COLUMN {_quote(column)} TEXT")
+                known.add(column.lower())
+
+    # ============ SERVER-SIDE FUNCTIONS ============
+
+    def _rpc_bulk_update_rows(self, p_table: str, p_key: str, p_rows: List[Dict[str, Any]]) -> List[str]:
+        updated = []
+        for row in p_rows:
+            values = {k: v for k, v in row.items() if k != p_key}
+            if not values:
+                continue
+            result = self.table(p_table).update(values).eq(p_key, row.get(p_key)).execute()
+            if result.data:
+                updated.append(str(row.get(p_key)))
+        return updated
+
+    def _rpc_news_table_stats(self, p_tables: List[str]) -> List[Dict[str, Any]]:
+        rows = []
+        for table in p_tables:
+            self.ensure_table(table)
+            classified = (
+                "SUM(industry IS NOT NULL AND industry != '' AND ai_summary IS NOT NULL AND ai_summary != '')"
+                if table == "General_News" else "0"
+            )
+            with self.lock:
+                total, summarized, classified_count = self.connection.execute(
+                    f"SELECT SUM(content != ''), "
+                    f"SUM(ai_summary IS NOT NULL AND ai_summary != '' AND content != ''), "
+                    f"{classified} FROM {_quote(table)}"
+                ).fetchone()
+            rows.append({
+                "table_name": table,
+                "total": total or 0,
+                "summarized": summarized or 0,
+                "classified": classified_count or 0
+            })
+        return rows
+
+
+def copy_tables_to_local(source_manager, path: Optional[str] = None, tables: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Snapshot tables from a live SupabaseManager into a local SQLite file
+
+    Args:
+        source_manager: SupabaseManager connected to the hosted project
+        path: SQLite file (default: DatabaseConfig.LOCAL_DATABASE_PATH)
+        tables: Tables to copy (default: all news and stock tables)
+
+    Returns:
+        Dictionary of table name -> rows copied
+    """
+    local = LocalClient(path or DatabaseConfig.LOCAL_DATABASE_PATH)
+    tables = tables or DatabaseConfig.get_all_news_tables() + DatabaseConfig.get_all_stock_tables()
+    copied = {}
+
+    for table in tables:
+        rows = list(source_manager.iter_rows(table))
+        for start in range(0, len(rows), DatabaseConfig.INSERT_CHUNK_SIZE):
+            local.table(table).upsert(rows[start:start + DatabaseConfig.INSERT_CHUNK_SIZE], on_conflict="id").execute()
+        copied[table] = len(rows)
+        logger.info(f"📥 Copied {len(rows)} rows into local {table}")
+
+    return copied
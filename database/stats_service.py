@@ -0,0 +1,107 @@
+"""
+Table Stats Service
+Process-wide cached news table statistics
+"""
+
+import time
+import threading
+import logging
+from typing import Dict, Optional
+
+from .config import DatabaseConfig
+
+logger = logging.getLogger(__name__)
+
+
+class TableStatsService:
+    """
+    Cached total/summarized/classified counts for all news tables
+
+    A refresh is one call to the server-side aggregate function from
+    database_setup.sql. Without it, the service falls back to concurrent
+    head-only counts. Results are reused for STATS_CACHE_TTL seconds, and
+    writes through SupabaseManager invalidate them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Optional[Dict[str, Dict]] = None
+        self._fetched_at = 0.0
+        self._generation = 0  # Bumped by invalidate(); a fetch that overlaps one is not cached
+        self._rpc_available = True
+
+    def get_stats(self, db_manager, force: bool = False) -> Dict[str, Dict]:
+        """
+        Get statistics for all news tables
+
+        Args:
+            db_manager: SupabaseManager used when the cache is stale
+            force: Skip the cache
+
+        Returns:
+            Dictionary of table name -> stats (see build_table_stats)
+        """
+        with self._lock:
+            fresh = time.monotonic() - self._fetched_at < DatabaseConfig.STATS_CACHE_TTL
+            if not force and self._stats is not None and fresh:
+                return {table: dict(stats) for table, stats in self._stats.items()}
+            generation = self._generation
+
+        stats = self._fetch(db_manager)
+
+        with self._lock:
+            if generation == self._generation:
+                self._stats = stats
+                self._fetched_at = time.monotonic()
+        return {table: dict(table_stats) for table, table_stats in stats.items()}
+
+    def invalidate(self, table_name: Optional[str] = None):
+        """Drop cached stats after a write to a news table (or any table if None)"""
+        if table_name is not None and table_name not in DatabaseConfig.get_all_news_tables():
+            return
+        with self._lock:
+            self._stats = None
+            self._generation += 1
+
+    def _fetch(self, db_manager) -> Dict[str, Dict]:
+        """Compute fresh stats with the cheapest available method"""
+        if self._rpc_available:
+            stats = self._fetch_rpc(db_manager)
+            if stats is not None:
+                return stats
+
+        try:
+            from .async_supabase_manager import get_table_stats_concurrently
+            return get_table_stats_concurrently()
+        except Exception as e:
+            logger.warning(f"⚠️ Concurrent stats failed, counting tables sequentially: {e}")
+            return db_manager.count_table_stats()
+
+    def _fetch_rpc(self, db_manager) -> Optional[Dict[str, Dict]]:
+        """One round trip for every table via the stats function"""
+        from .supabase_manager import build_table_stats
+
+        tables = DatabaseConfig.get_all_news_tables()
+        try:
+            result = db_manager.client.rpc(DatabaseConfig.STATS_FUNCTION, {"p_tables": tables}).execute()
+            rows = {row["table_name"]: row for row in (result.data or [])}
+            return {
+                table: build_table_stats(
+                    table,
+                    rows.get(table, {}).get("total") or 0,
+                    rows.get(table, {}).get("summarized") or 0,
+                    rows.get(table, {}).get("classified") or 0
+                )
+                for table in tables
+            }
+        except Exception as e:
+            if getattr(e, "code", None) == "PGRST202":
+                # Function not found - stop trying it for this process
+                logger.warning(f"⚠️ {DatabaseConfig.STATS_FUNCTION} not installed, using head-only counts")
+                self._rpc_available = False
+            else:
+                logger.warning(f"⚠️ Stats function call failed, using head-only counts: {e}")
+            return None
+
+
+stats_service = TableStatsService()
@@ -4,16 +4,138 @@ Centralized database operations for SPA VIP system
 """
 
 import sys
-from supabase import create_client, Client
+import json
+import queue
+import threading
+from supabase import Client
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from itertools import islice
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
 import logging
 
 from .config import DatabaseConfig
+from .client_registry import get_shared_client, check_health
+from .link_index import KnownLinkIndex
+from .stats_service import stats_service
 from .schemas import NewsSchema, StockSchema, validate_article_data, validate_stock_data
 
 logger = logging.getLogger(__name__)
 
+# Per-row outcomes returned by SupabaseManager.insert_articles
+ARTICLE_INSERTED = "inserted"
+ARTICLE_DUPLICATE = "duplicate"
+ARTICLE_INVALID = "invalid"
+ARTICLE_FAILED = "failed"
+
+# Filters (method, *args) for pending-work queries, applied by SupabaseManager.iter_rows
+UNSUMMARIZED_FILTERS = [
+    ("or_", "ai_summary.is.null,ai_summary.eq."),
+    ("neq", "content", ""),
+]
+UNCLASSIFIED_FILTERS = [
+    ("filter", "ai_summary", "not.is", "null"),
+    ("neq", "ai_summary", ""),
+    ("or_", "industry.is.null,industry.eq."),
+]
+
+# Count queries behind get_table_stats; "classified" only applies to General_News
+STATS_COUNT_FILTERS = {
+    "total": [
+        ("neq", "content", ""),
+    ],
+    "summarized": [
+        ("filter", "ai_summary", "not.is", "null"),
+        ("neq", "ai_summary", ""),
+        ("neq", "content", ""),
+    ],
+    "classified": [
+        ("filter", "industry", "not.is", "null"),
+        ("neq", "industry", ""),
+        ("filter", "ai_summary", "not.is", "null"),
+        ("neq", "ai_summary", ""),
+    ],
+}
+
+def apply_filters(query, filters: List[tuple] = None):
+    """Apply (method, *args) filter tuples to a query builder"""
+    for method, *args in filters or []:
+        query = getattr(query, method)(*args)
+    return query
+
+def build_table_stats(table: str, total_count: int = 0, summarized_count: int = 0,
+                      classified_count: int = 0) -> Dict[str, Any]:
+    """Derive the per-table stats dictionary from raw counts"""
+    is_general = table == 'General_News'
+    if not is_general:
+        classified_count = 0  # Other tables don't have industry classification
+    
+    return {
+        "total": total_count,
+        "summarized": summarized_count,
+        "unsummarized": max(0, total_count - summarized_count),
+        "completion_rate": (summarized_count / total_count * 100) if total_count > 0 else 100,
+        "classified": classified_count,
+        "unclassified": max(0, summarized_count - classified_count) if is_general else 0,
+        "classification_rate": (classified_count / summarized_count * 100) if summarized_count > 0 and is_general else 0
+    }
+
+def iter_batches(rows: Iterable, batch_size: int) -> Iterator[List]:
+    """Group any row iterator into lists of at most batch_size items"""
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+_PREFETCH_DONE = object()
+
+def prefetch(items: Iterable, depth: int = 2) -> Iterator:
+    """
+    Iterate items produced ahead of time on a background thread
+    
+    At most depth items wait in the queue, so a slow consumer holds the
+    producer back (e.g. batches are fetched while the previous one is being
+    processed). Errors of the producer are raised in the consumer.
+    
+    Args:
+        items: Any iterable, typically iter_batches over a keyset-paged query
+        depth: Items produced ahead of the consumer
+    """
+    buffer = queue.Queue(maxsize=max(1, depth))
+    stopped = threading.Event()
+    
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_PREFETCH_DONE)
+        except Exception as e:
+            put(e)
+    
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _PREFETCH_DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+
 class SupabaseManager:
     """Centralized Supabase database manager"""
     
@@ -22,11 +144,18 @@ class SupabaseManager:
         self.config = DatabaseConfig()
         self.config.validate_config()
         
-        self.client = create_client(
+        # One pooled client per configuration, shared by every manager in the process
+        self.client = get_shared_client(
             self.config.SUPABASE_URL, 
             self.config.SUPABASE_KEY
         )
         
+        # Flipped off once if the bulk update function is not installed on the server
+        self._bulk_update_rpc_available = True
+        
+        # Known-link indexes per news table, loaded on first use by crawlers
+        self._link_indexes: Dict[str, KnownLinkIndex] = {}
+        
         logger.info("✅ Supabase client initialized successfully")
     
     def get_client(self) -> Client:
@@ -77,6 +206,7 @@ class SupabaseManager:
             
             if result.data:
                 logger.info(f"✅ Inserted article: {article.title[:50]}...")
+                stats_service.invalidate(table_name)
                 return True
             else:
                 logger.error(f"❌ Failed to insert article: {article.title[:50]}...")
@@ -86,6 +216,105 @@ class SupabaseManager:
             logger.error(f"❌ Database error inserting article: {e}")
             return False
     
+    def get_link_index(self, table_name: str) -> KnownLinkIndex:
+        """
+        Known-link index for a news table
+        
+        The first call restores the saved index (if LINK_INDEX_DIR is set) and
+        pulls only newer rows; later calls reuse the in-memory index, which
+        insert_articles keeps current.
+        
+        Args:
+            table_name: News table name
+            
+        Returns:
+            KnownLinkIndex for crawlers to filter candidate links
+        """
+        index = self._link_indexes.get(table_name)
+        if index is None:
+            index = KnownLinkIndex(table_name, self.config.LINK_INDEX_DIR)
+            index.load()
+            index.refresh(self)
+            self._link_indexes[table_name] = index
+        return index
+    
+    def insert_articles(self, table_name: str, articles: List[Dict[str, Any]]) -> List[str]:
+        """
+        Bulk insert articles with validation and duplicate check
+        
+        Rows are validated through NewsSchema, de-duplicated on link inside the
+        batch and sent as chunked multi-row upserts that skip links already stored,
+        so a batch costs one request per INSERT_CHUNK_SIZE rows.
+        
+        Args:
+            table_name: Target table name
+            articles: List of article data dictionaries
+            
+        Returns:
+            List of outcomes aligned with articles: "inserted", "duplicate",
+            "invalid" or "failed" (request error)
+        """
+        outcomes = [ARTICLE_INVALID] * len(articles)
+        pending = {}  # link -> (index, row)
+        is_general_news = table_name.lower() == "general_news"
+        
+        for index, article_data in enumerate(articles):
+            if not validate_article_data(article_data):
+                logger.warning(f"Invalid article data: {article_data.get('title', '')[:50]}...")
+                continue
+            
+            article = NewsSchema.from_crawler_data(article_data)
+            if not article.validate():
+                logger.warning(f"Article validation failed: {article.title[:50]}...")
+                continue
+            
+            if article.link in pending:
+                outcomes[index] = ARTICLE_DUPLICATE
+                continue
+            
+            pending[article.link] = (index, article.to_dict(include_industry=is_general_news))
+        
+        items = list(pending.values())
+        chunk_size = self.config.INSERT_CHUNK_SIZE
+        
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            try:
+                # ignore_duplicates -> ON CONFLICT DO NOTHING, only new rows come back
+                result = self.client.table(table_name).upsert(
+                    [row for _, row in chunk],
+                    on_conflict="link",
+                    ignore_duplicates=True
+                ).execute()
+                
+                inserted_links = {row.get("link") for row in (result.data or [])}
+                for index, row in chunk:
+                    outcomes[index] = ARTICLE_INSERTED if row["link"] in inserted_links else ARTICLE_DUPLICATE
+                    
+            except Exception as e:
+                logger.error(f"❌ Database error inserting {len(chunk)} articles into {table_name}: {e}")
+                for index, _ in chunk:
+                    outcomes[index] = ARTICLE_FAILED
+        
+        if ARTICLE_INSERTED in outcomes:
+            stats_service.invalidate(table_name)
+        
+        link_index = self._link_indexes.get(table_name)
+        if link_index is not None:
+            link_index.add_many(
+                link for link, (index, _) in pending.items()
+                if outcomes[index] in (ARTICLE_INSERTED, ARTICLE_DUPLICATE)
+            )
+        
+        logger.info(
+            f"✅ Bulk insert into {table_name}: "
+            f"{outcomes.count(ARTICLE_INSERTED)} inserted, "
+            f"{outcomes.count(ARTICLE_DUPLICATE)} duplicate, "
+            f"{outcomes.count(ARTICLE_INVALID)} invalid, "
+            f"{outcomes.count(ARTICLE_FAILED)} failed"
+        )
+        return outcomes
+    
     def article_exists(self, table_name: str, link: str) -> bool:
         """Check if article already exists"""
         try:
@@ -98,6 +327,68 @@ class SupabaseManager:
             logger.error(f"Error checking article existence: {e}")
             return False
     
+    def iter_rows(self, table_name: str, filters: List[tuple] = None, columns: str = "*",
+                  page_size: int = None, descending: bool = False, start_after: Any = None) -> Iterator[Dict]:
+        """
+        Stream rows with keyset pagination on id
+        
+        Each page is one bounded request that continues after the last id handed
+        out, so rows are never re-scanned and results are not capped at the
+        PostgREST page limit.
+        
+        Args:
+            table_name: Table to read
+            filters: List of (method, *args) tuples applied to the query builder,
+                     e.g. [("neq", "content", ""), ("or_", "sentiment.is.null")]
+            columns: Columns to select (id is always included)
+            page_size: Rows per request (default: DatabaseConfig.PAGE_SIZE)
+            descending: Walk from the newest id to the oldest
+            start_after: Resume after this id
+            
+        Yields:
+            Row dictionaries
+        """
+        page_size = page_size or self.config.PAGE_SIZE
+        if columns != "*" and "id" not in [c.strip() for c in columns.split(",")]:
+            columns = f"id, {columns}"
+        
+        cursor = start_after
+        while True:
+            query = apply_filters(self.client.table(table_name).select(columns), filters)
+            if cursor is not None:
+                query = query.lt("id", cursor) if descending else query.gt("id", cursor)
+            
+            result = query.order("id", desc=descending).limit(page_size).execute()
+            rows = result.data or []
+            
+            yield from rows
+            
+            if len(rows) < page_size:
+                return
+            cursor = rows[-1]["id"]
+    
+    def iter_unsummarized_articles(self, table_name: str = None, page_size: int = None) -> Iterator[Dict]:
+        """
+        Stream articles without AI summary, newest first
+        
+        Args:
+            table_name: Specific table or None for all tables
+            page_size: Rows per request
+            
+        Yields:
+            Articles with id, title, content and table_name
+        """
+        tables_to_query = [table_name] if table_name else self.config.get_all_news_tables()
+        
+        for table in tables_to_query:
+            logger.info(f"Querying table: {table}")
+            
+            for article in self.iter_rows(table, UNSUMMARIZED_FILTERS, "id, title, content",
+                                          page_size=page_size, descending=True):
+                if article.get("content") and len(article.get("content", "").strip()) > 50:
+                    article["table_name"] = table
+                    yield article
+    
     def fetch_unsummarized_articles(self, table_name: str = None, limit: int = 100) -> List[Dict]:
         """
         Fetch articles without AI summary
@@ -110,30 +401,11 @@ class SupabaseManager:
             List of articles
         """
         try:
-            all_articles = []
-            tables_to_query = [table_name] if table_name else self.config.get_all_news_tables()
-            
-            for table in tables_to_query:
-                logger.info(f"Querying table: {table}")
-                
-                query = self.client.table(table)\
-                    .select("id, title, content")\
-                    .or_("ai_summary.is.null,ai_summary.eq.")\
-                    .neq("content", "")\
-                    .order("id", desc=True)\
-                    .limit(limit)
-                
-                result = query.execute()
-                
-                for article in result.data:
-                    if article.get("content") and len(article.get("content", "").strip()) > 50:
-                        article["table_name"] = table
-                        all_articles.append(article)
-                
-                logger.info(f"Found {len(result.data)} unsummarized articles in {table}")
+            page_size = min(limit, self.config.PAGE_SIZE)
+            all_articles = list(islice(self.iter_unsummarized_articles(table_name, page_size), limit))
             
             logger.info(f"Total unsummarized articles found: {len(all_articles)}")
-            return all_articles[:limit]
+            return all_articles
             
         except Exception as e:
             logger.error(f"Error fetching unsummarized articles: {e}")
@@ -148,6 +420,7 @@ class SupabaseManager:
                 .execute()
             
             if response.data:
+                stats_service.invalidate(table_name)
                 logger.info(f"✅ Updated summary for article {article_id} in {table_name}")
                 return True
             else:
@@ -167,6 +440,7 @@ class SupabaseManager:
                 .execute()
             
             if response.data:
+                stats_service.invalidate(table_name)
                 logger.info(f"✅ Updated industry for article {article_id} in {table_name}: {industry}")
                 return True
             else:
@@ -177,6 +451,33 @@ class SupabaseManager:
             logger.error(f"❌ Error updating industry for article {article_id}: {e}")
             return False
     
+    def iter_unclassified_articles(self, table_name: str = None, page_size: int = None) -> Iterator[Dict]:
+        """
+        Stream articles with summaries but without industry classification (General_News only)
+        
+        Args:
+            table_name: Should be General_News or None (defaults to General_News)
+            page_size: Rows per request
+            
+        Yields:
+            Articles with id, title, content, ai_summary and table_name
+        """
+        # Industry classification only works on General_News
+        tables_to_query = ['General_News'] if not table_name else [table_name] if table_name == 'General_News' else []
+        
+        if not tables_to_query:
+            logger.warning("⚠️ Industry classification only works on General_News table")
+            return
+        
+        for table in tables_to_query:
+            logger.info(f"Querying table for industry classification: {table}")
+            
+            for article in self.iter_rows(table, UNCLASSIFIED_FILTERS, "id, title, content, ai_summary",
+                                          page_size=page_size, descending=True):
+                if article.get("ai_summary") and len(article.get("ai_summary", "").strip()) > 10:
+                    article["table_name"] = table
+                    yield article
+    
     def fetch_unclassified_articles(self, table_name: str = None, limit: int = 100) -> List[Dict]:
         """
         Fetch articles with summaries but without industry classification (General_News only)
@@ -189,41 +490,110 @@ class SupabaseManager:
             List of articles needing industry classification
         """
         try:
-            all_articles = []
-            # Industry classification only works on General_News
-            tables_to_query = ['General_News'] if not table_name else [table_name] if table_name == 'General_News' else []
-            
-            if not tables_to_query:
-                logger.warning("⚠️ Industry classification only works on General_News table")
-                return []
-            
-            for table in tables_to_query:
-                logger.info(f"Querying table for industry classification: {table}")
-                
-                query = self.client.table(table)\
-                    .select("id, title, content, ai_summary")\
-                    .filter("ai_summary", "not.is", "null")\
-                    .neq("ai_summary", "")\
-                    .or_("industry.is.null,industry.eq.")\
-                    .order("id", desc=True)\
-                    .limit(limit)
-                
-                result = query.execute()
-                
-                for article in result.data:
-                    if article.get("ai_summary") and len(article.get("ai_summary", "").strip()) > 10:
-                        article["table_name"] = table
-                        all_articles.append(article)
-                
-                logger.info(f"Found {len(result.data)} unclassified articles in {table}")
+            page_size = min(limit, self.config.PAGE_SIZE)
+            all_articles = list(islice(self.iter_unclassified_articles(table_name, page_size), limit))
             
             logger.info(f"Total unclassified articles found: {len(all_articles)}")
-            return all_articles[:limit]
+            return all_articles
             
         except Exception as e:
             logger.error(f"Error fetching unclassified articles: {e}")
             return []
     
+    # ============ BULK UPDATES ============
+    
+    def update_many(self, table_name: str, key_column: str, rows: List[Dict[str, Any]]) -> Dict[Any, bool]:
+        """
+        Bulk update rows matched on key_column
+        
+        Each row holds key_column plus the columns to set. Updates for the same key
+        are merged, then sent in chunks of UPDATE_CHUNK_SIZE to the bulk_update_rows
+        server-side function (one request per chunk). If the function is not
+        installed, rows carrying identical values are coalesced into a single
+        PATCH filtered with in_(key_column, keys).
+        
+        Args:
+            table_name: Target table name
+            key_column: Column used to match rows (e.g. "id", "link", "date")
+            rows: List of dictionaries with key_column and the columns to update
+            
+        Returns:
+            Dict mapping each key to True if a row was updated, False if no row
+            matched and None if the request carrying it failed (e.g. network error)
+        """
+        merged = {}
+        for row in rows:
+            key = row.get(key_column)
+            if key is None:
+                logger.warning(f"⚠️ Skipping update without {key_column} for {table_name}")
+                continue
+            merged.setdefault(key, {}).update({k: v for k, v in row.items() if k != key_column})
+        
+        results = {key: False for key in merged}
+        keys = list(merged)
+        chunk_size = self.config.UPDATE_CHUNK_SIZE
+        
+        for start in range(0, len(keys), chunk_size):
+            chunk_keys = keys[start:start + chunk_size]
+            
+            updated_keys, failed_keys = None, set()
+            if self._bulk_update_rpc_available:
+                updated_keys = self._update_chunk_rpc(table_name, key_column, chunk_keys, merged)
+            if updated_keys is None:
+                updated_keys, failed_keys = self._update_chunk_grouped(table_name, key_column, chunk_keys, merged)
+            
+            for key in chunk_keys:
+                results[key] = None if str(key) in failed_keys else str(key) in updated_keys
+        
+        updated_count = sum(1 for updated in results.values() if updated)
+        if updated_count:
+            stats_service.invalidate(table_name)
+        if updated_count == len(results):
+            logger.info(f"✅ Bulk updated {updated_count} rows in {table_name}")
+        else:
+            logger.warning(f"⚠️ Bulk updated {updated_count}/{len(results)} rows in {table_name}")
+        return results
+    
+    def _update_chunk_rpc(self, table_name: str, key_column: str, keys: List[Any], values: Dict[Any, Dict]) -> Optional[set]:
+        """Apply one chunk through the server-side function, None if it could not be used"""
+        payload = [{key_column: key, **values[key]} for key in keys]
+        try:
+            result = self.client.rpc(self.config.BULK_UPDATE_FUNCTION, {
+                "p_table": table_name,
+                "p_key": key_column,
+                "p_rows": payload
+            }).execute()
+            return {str(key) for key in (result.data or [])}
+        except Exception as e:
+            if getattr(e, "code", None) == "PGRST202":
+                # Function not found - stop trying it for this manager
+                logger.warning(f"⚠️ {self.config.BULK_UPDATE_FUNCTION} not installed, using grouped updates")
+                self._bulk_update_rpc_available = False
+            else:
+                logger.warning(f"⚠️ Bulk update call failed for {table_name}, using grouped updates: {e}")
+            return None
+    
+    def _update_chunk_grouped(self, table_name: str, key_column: str, keys: List[Any], values: Dict[Any, Dict]) -> Tuple[set, set]:
+        """Apply one chunk as one PATCH per distinct set of values; returns (updated keys, keys whose PATCH failed)"""
+        groups = {}
+        for key in keys:
+            signature = json.dumps(values[key], sort_keys=True, default=str)
+            groups.setdefault(signature, []).append(key)
+        
+        updated_keys, failed_keys = set(), set()
+        for group_keys in groups.values():
+            try:
+                result = self.client.table(table_name)\
+                    .update(values[group_keys[0]])\
+                    .in_(key_column, group_keys)\
+                    .execute()
+                updated_keys.update(str(row.get(key_column)) for row in (result.data or []))
+            except Exception as e:
+                logger.error(f"❌ Error updating {len(group_keys)} rows in {table_name}: {e}")
+                failed_keys.update(str(key) for key in group_keys)
+        
+        return updated_keys, failed_keys
+    
     # ============ STOCK OPERATIONS ============
     
     def insert_stock_data(self, table_name: str, stock_data: Dict[str, Any]) -> bool:
@@ -259,63 +629,44 @@ class SupabaseManager:
     
     # ============ STATISTICS ============
     
-    def get_table_stats(self) -> Dict[str, Dict]:
-        """Get comprehensive statistics for all news tables"""
+    def get_table_stats(self, force: bool = False) -> Dict[str, Dict]:
+        """
+        Get comprehensive statistics for all news tables
+        
+        Served from the process-wide stats cache; a refresh is one aggregate
+        call and local writes invalidate it.
+        
+        Args:
+            force: Recompute even if the cached stats are fresh
+        """
+        return stats_service.get_stats(self, force=force)
+    
+    def count_table_stats(self) -> Dict[str, Dict]:
+        """Compute table statistics with sequential head-only count queries"""
         stats = {}
         
         for table in self.config.get_all_news_tables():
             try:
-                # Count total articles with valid content
-                total_result = self.client.table(table)\
-                    .select("*", count="exact")\
-                    .neq("content", "")\
-                    .execute()
+                counts = {}
+                for name, filters in STATS_COUNT_FILTERS.items():
+                    # Count articles with industry classification (only for General_News)
+                    if name == "classified" and table != 'General_News':
+                        continue
+                    query = self.client.table(table).select("id", count="exact", head=True)
+                    result = apply_filters(query, filters).execute()
+                    counts[name] = result.count or 0
                 
-                # Count articles with summaries
-                summarized_result = self.client.table(table)\
-                    .select("*", count="exact")\
-                    .filter("ai_summary", "not.is", "null")\
-                    .neq("ai_summary", "")\
-                    .neq("content", "")\
-                    .execute()
-                
-                # Count articles with industry classification (only for General_News)
-                if table == 'General_News':
-                    classified_result = self.client.table(table)\
-                        .select("*", count="exact")\
-                        .filter("industry", "not.is", "null")\
-                        .neq("industry", "")\
-                        .filter("ai_summary", "not.is", "null")\
-                        .neq("ai_summary", "")\
-                        .execute()
-                    classified_count = classified_result.count or 0
-                else:
-                    classified_count = 0  # Other tables don't have industry classification
-                
-                total_count = total_result.count or 0
-                summarized_count = summarized_result.count or 0
-                
-                stats[table] = {
-                    "total": total_count,
-                    "summarized": summarized_count,
-                    "unsummarized": max(0, total_count - summarized_count),
-                    "completion_rate": (summarized_count / total_count * 100) if total_count > 0 else 100,
-                    "classified": classified_count,
-                    "unclassified": max(0, summarized_count - classified_count) if table == 'General_News' else 0,
-                    "classification_rate": (classified_count / summarized_count * 100) if summarized_count > 0 and table == 'General_News' else 0
-                }
+                stats[table] = build_table_stats(
+                    table,
+                    counts["total"],
+                    counts["summarized"],
+                    counts.get("classified", 0)
+                )
                 
             except Exception as e:
                 logger.error(f"Error getting stats for {table}: {e}")
-                stats[table] = {
-                    "total": 0, 
-                    "summarized": 0, 
-                    "unsummarized": 0, 
-                    "completion_rate": 0,
-                    "classified": 0,
-                    "unclassified": 0,
-                    "classification_rate": 0
-                }
+                stats[table] = build_table_stats(table)
+                stats[table]["completion_rate"] = 0
         
         return stats
     
@@ -323,7 +674,7 @@ class SupabaseManager:
         """Get total count for a table"""
         try:
             result = self.client.table(table_name)\
-                .select("*", count="exact")\
+                .select("id", count="exact", head=True)\
                 .execute()
             return result.count or 0
         except Exception as e:
@@ -332,8 +683,22 @@ class SupabaseManager:
     
     # ============ UTILITY METHODS ============
     
-    def test_connection(self) -> bool:
-        """Test database connection"""
+    def test_connection(self, force: bool = False) -> bool:
+        """
+        Test database connection
+        
+        A passed test is reused for HEALTH_CHECK_TTL seconds across all managers
+        sharing the client; pass force=True to probe every table again.
+        """
+        return check_health(
+            self._probe_connection,
+            self.config.SUPABASE_URL,
+            self.config.SUPABASE_KEY,
+            force=force
+        )
+    
+    def _probe_connection(self) -> bool:
+        """Query a small sample from each news table"""
         try:
             # Try to query a small sample from each news table
             for table in self.config.get_all_news_tables():
@@ -351,7 +716,9 @@ class SupabaseManager:
             return False
     
     def close_connection(self):
-        """Close database connections (placeholder for compatibility)"""
+        """Close database connections and persist known-link indexes"""
+        for index in self._link_indexes.values():
+            index.save()
         logger.info("🔒 Supabase connections are managed automatically")
     
     def close_connections(self):
@@ -0,0 +1,333 @@
+"""
+Write-Behind Buffer
+Non-blocking, crash-safe write-back of model outputs
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import DatabaseConfig
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    Queue of row updates flushed to the database from a background thread
+
+    Updates are coalesced per (table, key column, key), so the last value for a
+    row wins and each row is written once per flush. A flush runs when
+    batch_size rows are pending or flush_interval seconds have passed, using
+    SupabaseManager.update_many. Failed rows are retried with exponential
+    backoff; only rows the database reports as unmatched count towards
+    max_retries, network errors keep them queued. Every update is also
+    appended to a JSONL spool file; the spool is replayed on start-up, so
+    results survive a failed flush, a crash or a restart without being
+    recomputed.
+    """
+
+    def __init__(self, db_manager, name: str = "default", spool_dir: Optional[str] = None,
+                 batch_size: Optional[int] = None, flush_interval: Optional[float] = None,
+                 max_retries: Optional[int] = None, start: bool = True):
+        """
+        Args:
+            db_manager: SupabaseManager used for update_many
+            name: Spool file name, one per pipeline stage
+            spool_dir: Spool directory (default: DatabaseConfig.WRITE_BEHIND_DIR, "" disables spooling)
+            batch_size: Pending rows that trigger a flush
+            flush_interval: Seconds between time-based flushes
+            max_retries: Failed writes that matched no row before it is dropped
+            start: Start the background flush thread
+        """
+        self.db_manager = db_manager
+        self.batch_size = batch_size or DatabaseConfig.UPDATE_CHUNK_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else DatabaseConfig.WRITE_BEHIND_FLUSH_INTERVAL
+        self.max_retries = max_retries if max_retries is not None else DatabaseConfig.WRITE_BEHIND_MAX_RETRIES
+
+        spool_dir = DatabaseConfig.WRITE_BEHIND_DIR if spool_dir is None else spool_dir
+        self.spool_path = os.path.join(spool_dir, f"{name}.jsonl") if spool_dir else None
+
+        self._lock = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], Dict[Any, Dict[str, Any]]] = {}
+        self._in_flight = 0  # Rows taken by the flush that is running
+        self._attempts: Dict[Tuple[str, str, Any], int] = {}
+        self._failures = 0
+        self._retry_at = 0.0
+        self._stopped = False
+        self._spool = None
+        self._thread = None
+
+        self.dropped = set()  # (table, key) pairs given up after max_retries
+        self.stats = {"queued": 0, "written": 0, "retried": 0, "dropped": 0, "replayed": 0}
+
+        self._replay_spool()
+        if start:
+            self.start()
+
+    # ============ QUEUEING ============
+
+    def put(self, table_name: str, key_column: str, key: Any, values: Dict[str, Any]):
+        """Queue an update of one row; later values for the same row win"""
+        with self._lock:
+            self._merge(table_name, key_column, key, values)
+            self._append_spool(table_name, key_column, key, values)
+            self.stats["queued"] += 1
+            if self.pending_count() >= self.batch_size:
+                self._lock.notify()
+
+    def put_many(self, table_name: str, key_column: str, rows: List[Dict[str, Any]]):
+        """Queue updates given as rows containing key_column and the new values"""
+        for row in rows:
+            values = {column: value for column, value in row.items() if column != key_column}
+            self.put(table_name, key_column, row[key_column], values)
+
+    def pending_count(self) -> int:
+        """Rows waiting to be written"""
+        return sum(len(rows) for rows in self._pending.values())
+
+    def count_stored(self, table_name: str, key_column: str, keys: List[Any]) -> int:
+        """
+        How many of the queued rows are stored: neither pending nor dropped
+
+        Only meaningful after flush(), when nothing is in flight.
+        """
+        with self._lock:
+            pending = self._pending.get((table_name, key_column), {})
+            return sum(1 for key in keys if key not in pending and (table_name, key) not in self.dropped)
+
+    def _merge(self, table_name: str, key_column: str, key: Any, values: Dict[str, Any]):
+        rows = self._pending.setdefault((table_name, key_column), {})
+        rows[key] = {**rows.get(key, {}), **values}
+
+    # ============ FLUSHING ============
+
+    def start(self):
+        """Start the background flush thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._stopped and self.pending_count() < self.batch_size:
+                    self._lock.wait(self.flush_interval)
+                if self._stopped:
+                    return
+
+            wait = self._retry_at - time.monotonic()
+            if wait > 0:
+                time.sleep(min(wait, self.flush_interval))
+                continue
+            self._flush_once()
+
+    def _flush_once(self) -> bool:
+        """Write everything pending once; failed rows are requeued. Returns True if all succeeded"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._in_flight = sum(len(rows) for rows in batch.values())
+            if not batch:
+                return True
+
+            failed = 0
+            for (table_name, key_column), rows in batch.items():
+                payload = [{key_column: key, **values} for key, values in rows.items()]
+                try:
+                    results = self.db_manager.update_many(table_name, key_column, payload)
+                except Exception as e:
+                    logger.error(f"❌ Write-behind flush to {table_name} failed: {e}")
+                    results = {}
+
+                for key, values in rows.items():
+                    attempt_key = (table_name, key_column, key)
+                    updated = results.get(key)
+                    if updated:
+                        self._attempts.pop(attempt_key, None)
+                        self.stats["written"] += 1
+                        continue
+
+                    if updated is False:
+                        # The database answered but matched no row: counts towards max_retries.
+                        # Transport errors (None / exception) only back off, the row stays spooled.
+                        attempts = self._attempts.get(attempt_key, 0) + 1
+                        if attempts > self.max_retries:
+                            logger.error(f"❌ Dropping write to {table_name} {key_column}={key} after {self.max_retries} retries")
+                            self._attempts.pop(attempt_key, None)
+                            self.dropped.add((table_name, key))
+                            self.stats["dropped"] += 1
+                            continue
+                        self._attempts[attempt_key] = attempts
+
+                    self.stats["retried"] += 1
+                    failed += 1
+                    with self._lock:
+                        # Newer values queued meanwhile take precedence
+                        pending = self._pending.setdefault((table_name, key_column), {})
+                        pending[key] = {**values, **pending.get(key, {})}
+
+            if failed:
+                self._failures += 1
+                backoff = min(DatabaseConfig.WRITE_BEHIND_BACKOFF * 2 ** (self._failures - 1), 60)
+                self._retry_at = time.monotonic() + backoff
+                logger.warning(f"⚠️ {failed} writes failed, retrying in {backoff:.1f}s")
+            else:
+                self._failures = 0
+                self._retry_at = 0.0
+
+            with self._lock:
+                self._in_flight = 0
+                self._compact_spool()
+            return failed == 0
+
+    def wait_for_capacity(self, max_rows: int, timeout: Optional[float] = None) -> bool:
+        """
+        Block while more than max_rows rows are queued or being written
+        
+        Backpressure for producers that generate faster than the database
+        accepts writes; the background thread is asked to flush right away.
+        
+        Returns:
+            bool: True if the backlog is at most max_rows
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if self.pending_count() + self._in_flight <= max_rows:
+                    return True
+                if self._thread is None:
+                    break
+                self._lock.notify()
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        # No background thread: write inline
+        self._flush_once()
+        return self.pending_count() <= max_rows
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every queued row is written or dropped
+
+        Waits for a flush already running on the background thread. Gives up
+        after max_retries failed rounds in a row (e.g. the database is
+        unreachable); the rows stay spooled for the next run.
+
+        Args:
+            timeout: Give up waiting after this many seconds (rows stay spooled)
+
+        Returns:
+            bool: True if every row was written (nothing left pending, nothing dropped)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        failed_rounds = 0
+        while True:
+            # Holding the flush lock waits out a batch the background thread is writing
+            with self._flush_lock, self._lock:
+                remaining = self.pending_count() + self._in_flight
+            if not remaining:
+                break
+            if failed_rounds > self.max_retries:
+                logger.warning(f"⚠️ Write-behind flush giving up after {failed_rounds} failed rounds, "
+                               f"{remaining} rows left in spool")
+                break
+            wait = self._retry_at - time.monotonic()
+            if deadline is not None and time.monotonic() + max(wait, 0) > deadline:
+                break
+            if wait > 0:
+                time.sleep(wait)
+            if not self._flush_once():
+                failed_rounds += 1
+
+        with self._lock:
+            remaining = self.pending_count() + self._in_flight
+        return remaining == 0 and not self.dropped
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Stop the background thread after a final flush; False if rows are left pending or were dropped"""
+        flushed = self.flush(timeout)
+        with self._lock:
+            self._stopped = True
+            self._lock.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+        logger.info(
+            f"💾 Write-behind closed: {self.stats['written']} written, "
+            f"{self.stats['retried']} retried, {self.stats['dropped']} dropped, "
+            f"{self.pending_count()} left in spool"
+        )
+        return flushed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ============ SPOOL ============
+
+    def _append_spool(self, table_name: str, key_column: str, key: Any, values: Dict[str, Any]):
+        if not self.spool_path:
+            return
+        try:
+            if self._spool is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.spool_path)), exist_ok=True)
+                self._spool = open(self.spool_path, "a", encoding="utf-8")
+            record = {"table": table_name, "key_column": key_column, "key": key, "values": values}
+            self._spool.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            self._spool.flush()
+        except Exception as e:
+            logger.error(f"❌ Error writing write-behind spool {self.spool_path}: {e}")
+
+    def _compact_spool(self):
+        """Rewrite the spool so it holds only rows still pending"""
+        if not self.spool_path:
+            return
+        try:
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+            if not self._pending:
+                if os.path.exists(self.spool_path):
+                    os.remove(self.spool_path)
+                return
+
+            tmp_path = f"{self.spool_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for (table_name, key_column), rows in self._pending.items():
+                    for key, values in rows.items():
+                        record = {"table": table_name, "key_column": key_column, "key": key, "values": values}
+                        f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            os.replace(tmp_path, self.spool_path)
+        except Exception as e:
+            logger.error(f"❌ Error compacting write-behind spool {self.spool_path}: {e}")
+
+    def _replay_spool(self):
+        """Load writes left over from a previous run"""
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return
+
+        replayed = 0
+        with open(self.spool_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self._merge(record["table"], record["key_column"], record["key"], record["values"])
+                    replayed += 1
+                except (ValueError, KeyError):
+                    continue  # Torn last line from a crash mid-write
+
+        self.stats["replayed"] = replayed
+        self._compact_spool()
+        if replayed:
+            logger.info(f"♻️ Replaying {self.pending_count()} pending writes from {self.spool_path}")
@@ -1,9 +1,12 @@
 import torch
 import torch.nn as nn
 import logging
+import numpy as np
 from transformers import AutoModel, AutoTokenizer
 import os
 
+from database import get_inference_cache
+
 class IndustryClassifier(nn.Module):
     def __init__(self, n_classes=5):
         super(IndustryClassifier, self).__init__()
@@ -28,12 +31,47 @@ class PhoBERTClassifier:
             manager = get_model_manager()
             self.model, self.tokenizer, self.labels = manager.load_industry_model()
             self.model = self.model.to(self.device)
+            self.model_version = manager.model_version('industry')
             logging.info("Model loaded successfully via ModelManager from HuggingFace")
         except Exception as e:
             logging.error(f"Failed to load industry model from HuggingFace: {str(e)}")
             raise RuntimeError("Unable to load industry model. Please ensure HuggingFace models are available.")
 
     def predict(self, text):
+        """Industry label and class probabilities (numpy array) for one text"""
+        return self.predict_many([text])[0]
+
+    def predict_many(self, texts):
+        """
+        Industry labels and class probabilities for several texts
+
+        Summaries already classified (e.g. stored in another table) are served
+        from the inference cache with one lookup; the rest are classified and
+        stored with one write.
+
+        Returns:
+            List of (label, probabilities as numpy array) aligned with texts
+        """
+        results = [None] * len(texts)
+        cache = get_inference_cache()
+        if cache is not None:
+            for index, cached in cache.get_many("industry", self.model_version, texts).items():
+                probs = np.asarray(cached, dtype=np.float32)
+                results[index] = (self.labels[int(probs.argmax())], probs)
+
+        missing = [index for index, result in enumerate(results) if result is None]
+        predicted = []
+        for index in missing:
+            results[index] = self._predict_uncached(texts[index])
+            predicted.append(results[index])
+
+        if cache is not None and missing:
+            # Failed predictions (None) are not cached so they are retried next time
+            cache.put_many("industry", self.model_version, [texts[index] for index in missing],
+                           [probs.tolist() if label != "Unknown" else None for label, probs in predicted])
+        return results
+
+    def _predict_uncached(self, text):
         try:
             inputs = self.tokenizer(
                 text,
@@ -50,4 +88,4 @@ class PhoBERTClassifier:
             return self.labels[pred_idx], probs[0].cpu().numpy()
         except Exception as e:
             logging.error(f"Prediction error: {str(e)}")
-            return "Unknown", [0]*len(self.labels)
+            return "Unknown", np.zeros(len(self.labels), dtype=np.float32)
@@ -2,6 +2,7 @@ import logging
 import time
 from typing import Dict, Any, List, Optional
 
+from database import iter_batches
 from industry.models.phobert_classifier import PhoBERTClassifier
 from industry.utils.database import PostgresConnector
 from industry.config import Config
@@ -45,7 +46,7 @@ class IndustryClassificationPipeline:
             table_name: Specific table to process (optional)
             
         Returns:
-            int: Number of articles successfully processed
+            int: Number of articles whose classification was stored
         """
         try:
             # Fetch unprocessed articles
@@ -55,23 +56,45 @@ class IndustryClassificationPipeline:
                 logging.info("📭 No unprocessed articles found for industry classification")
                 return 0
             
+            queued = self._classify_articles(articles)
+            stored = self.db.flush_writes()
+            logging.info(f"💾 Stored {stored}/{queued} classifications")
+            return stored
+            
+        except Exception as e:
+            logging.error(f"❌ Batch processing failed: {str(e)}")
+            return 0
+
+    def _classify_articles(self, articles: List[Dict[str, Any]]) -> int:
+        """
+        Classify a list of fetched articles and write the results back
+        
+        Args:
+            articles: Articles with id, ai_summary and table_name
+            
+        Returns:
+            int: Number of classifications queued for write-behind (stored on flush_writes)
+        """
+        try:
             processed_count = 0
+            pending_updates = {}  # table_name -> [(article_id, industry, confidence)]
             
+            # Articles with a usable summary, classified together so the
+            # inference cache is read and written once per batch
+            classifiable = []
             for article in articles:
+                # Only use ai_summary for industry classification
+                text_to_classify = article.get(Config.SUMMARY_COLUMN, '')
+                
+                if not text_to_classify or len(text_to_classify.strip()) < 10:
+                    logging.warning(f"⚠️ No ai_summary available for classification in article {article.get('id')}")
+                    continue
+                classifiable.append((article, text_to_classify))
+            
+            predictions = self.industry_classifier.predict_many([text for _, text in classifiable])
+            
+            for (article, _), (industry, confidence_scores) in zip(classifiable, predictions):
                 try:
-                    # Get article content for classification
-                    summary = article.get(Config.SUMMARY_COLUMN, '')
-                    
-                    # Only use ai_summary for industry classification
-                    text_to_classify = summary
-                    
-                    if not text_to_classify or len(text_to_classify.strip()) < 10:
-                        logging.warning(f"⚠️ No ai_summary available for classification in article {article.get('id')}")
-                        continue
-                    
-                    # Classify industry
-                    industry, confidence_scores = self.industry_classifier.predict(text_to_classify)
-                    
                     # Handle confidence scores safely
                     try:
                         if confidence_scores is not None and len(confidence_scores) > 0:
@@ -81,28 +104,27 @@ class IndustryClassificationPipeline:
                     except (ValueError, TypeError):
                         max_confidence = 0.0
                     
-                    # Update article with industry classification
-                    updates = {
-                        Config.INDUSTRY_COLUMN: industry
-                    }
-                    
-                    success = self.db.update_row(
-                        article['id'], 
-                        updates, 
-                        article['table_name']
+                    # Queue industry classification for the bulk update
+                    pending_updates.setdefault(article['table_name'], []).append(
+                        (article['id'], industry, max_confidence)
                     )
-                    
-                    if success:
-                        processed_count += 1
-                        logging.info(f"✅ Classified article {article['id']}: {industry} (confidence: {max_confidence:.3f})")
-                    else:
-                        logging.error(f"❌ Failed to update article {article['id']}")
                         
                 except Exception as e:
                     logging.error(f"❌ Error processing article {article.get('id', 'unknown')}: {str(e)}")
                     continue
             
-            logging.info(f"📊 Successfully processed {processed_count}/{len(articles)} articles")
+            # Hand classifications to the write-behind buffer, one bulk write per table
+            for table, classified in pending_updates.items():
+                self.db.queue_rows(
+                    table,
+                    [{'id': article_id, Config.INDUSTRY_COLUMN: industry} for article_id, industry, _ in classified]
+                )
+                
+                for article_id, industry, max_confidence in classified:
+                    processed_count += 1
+                    logging.info(f"✅ Classified article {article_id}: {industry} (confidence: {max_confidence:.3f})")
+            
+            logging.info(f"📊 Queued {processed_count}/{len(articles)} classifications for writing")
             return processed_count
             
         except Exception as e:
@@ -174,35 +196,23 @@ class IndustryClassificationPipeline:
         logging.info(f"🎯 Will process in {total_batches} batches of {batch_size} articles each")
         
         results = {'General_News': 0}
+        queued = 0
         batch_number = 1
         
-        while True:
+        # Single keyset-paginated stream: articles that fail are not fetched again
+        for articles in iter_batches(self.db.iter_unprocessed_rows('General_News'), batch_size):
             logging.info(f"\n🔄 Processing Batch {batch_number}/{total_batches}")
             logging.info("-" * 50)
             
-            # Process one batch
-            processed = self.process_specific_table('General_News', batch_size)
-            
-            if processed == 0:
-                logging.info("✅ No more articles to process. All pending classifications completed!")
-                break
-            
-            results['General_News'] += processed
+            queued += self._classify_articles(articles)
             batch_number += 1
-            
-            # Brief pause between batches to avoid overwhelming the system
-            if processed == batch_size:  # Full batch processed
-                logging.info(f"⏸️ Brief pause before next batch...")
-                time.sleep(2)
-            
-            # Safety check to prevent infinite loops
-            if batch_number > total_batches + 5:  # Allow some buffer
-                logging.warning("⚠️ Maximum batch limit reached. Stopping to prevent infinite loop.")
-                break
+        
+        results['General_News'] = self.db.flush_writes()
+        logging.info("✅ No more articles to process. All pending classifications completed!")
         
         total_processed = results['General_News']
         logging.info(f"\n🎉 BATCH PROCESSING COMPLETED!")
-        logging.info(f"📊 Total articles processed: {total_processed}")
+        logging.info(f"📊 Total classifications stored: {total_processed}/{queued} queued")
         logging.info(f"🎯 Batches completed: {batch_number - 1}")
         
         return results
@@ -8,7 +8,7 @@ parent_dir = os.path.dirname(os.path.dirname(current_dir))
 sys.path.insert(0, parent_dir)
 
 # Import centralized database system
-from database import SupabaseManager, DatabaseConfig
+from database import SupabaseManager, DatabaseConfig, WriteBehindBuffer
 
 class PostgresConnector:
     """
@@ -20,6 +20,9 @@ class PostgresConnector:
         try:
             self.db_manager = SupabaseManager()
             self.config = DatabaseConfig()
+            # Classifications are written in the background and spooled to disk until stored
+            self.writer = WriteBehindBuffer(self.db_manager, name="industry")
+            self._queued = {}  # table_name -> article ids queued since the last flush_writes
             
             # Test connection
             if self.db_manager.test_connection():
@@ -43,42 +46,22 @@ class PostgresConnector:
             List of articles needing industry classification
         """
         try:
-            all_articles = []
-            # Force only General_News table for industry classification
-            tables_to_query = ['General_News'] if not table_name else [table_name] if table_name == 'General_News' else []
-            
-            if not tables_to_query:
-                logging.warning("⚠️ Industry classification only works on General_News table")
-                return []
-            
-            for table in tables_to_query:
-                logging.debug(f"🔍 Querying table: {table}")
-                
-                # Get articles with ai_summary but without industry classification
-                result = self.db_manager.client.table(table)\
-                    .select("id, title, content, ai_summary")\
-                    .filter("ai_summary", "not.is", "null")\
-                    .neq("ai_summary", "")\
-                    .or_("industry.is.null,industry.eq.")\
-                    .order("id", desc=True)\
-                    .limit(limit)\
-                    .execute()
-                
-                for article in result.data:
-                    # Ensure ai_summary exists and is meaningful
-                    if article.get("ai_summary") and len(article.get("ai_summary", "").strip()) > 10:
-                        article["table_name"] = table
-                        all_articles.append(article)
-                
-                logging.debug(f"Found {len(result.data)} unprocessed articles in {table}")
-            
+            all_articles = self.db_manager.fetch_unclassified_articles(table_name, limit)
             logging.info(f"📊 Total unprocessed articles found: {len(all_articles)}")
-            return all_articles[:limit]
+            return all_articles
             
         except Exception as e:
             logging.error(f"❌ Error fetching unprocessed rows: {str(e)}")
             return []
 
+    def iter_unprocessed_rows(self, table_name=None, page_size=None):
+        """
+        Stream rows where industry classification is missing (only General_News)
+        
+        Pages by id cursor, so each pending article is handed out once per run.
+        """
+        return self.db_manager.iter_unclassified_articles(table_name, page_size)
+
     def update_row(self, article_id, updates, table_name):
         """
         Update article with industry classification
@@ -112,6 +95,49 @@ class PostgresConnector:
             logging.error(f"❌ Error updating article {article_id}: {str(e)}")
             return False
 
+    def update_rows(self, table_name, rows):
+        """
+        Bulk update articles with industry classification
+        
+        Args:
+            table_name: Table containing the articles
+            rows: List of dictionaries with 'id' and the columns to update
+            
+        Returns:
+            Dict mapping article ID to True if updated, False otherwise
+        """
+        try:
+            if not rows or not table_name:
+                return {}
+            
+            return self.db_manager.update_many(table_name, "id", rows)
+                
+        except Exception as e:
+            logging.error(f"❌ Error bulk updating {len(rows)} articles in {table_name}: {str(e)}")
+            return {row.get("id"): False for row in rows}
+
+    def queue_rows(self, table_name, rows):
+        """
+        Queue industry classifications for write-behind
+        
+        Args:
+            table_name: Table containing the articles
+            rows: List of dictionaries with 'id' and the columns to update
+        """
+        self.writer.put_many(table_name, "id", rows)
+        self._queued.setdefault(table_name, []).extend(row["id"] for row in rows)
+
+    def flush_writes(self):
+        """
+        Block until queued classifications are stored
+        
+        Returns:
+            int: Rows queued since the last flush that were stored
+        """
+        self.writer.flush()
+        queued, self._queued = self._queued, {}
+        return sum(self.writer.count_stored(table_name, "id", ids) for table_name, ids in queued.items())
+
     def health_check(self):
         """Check database connection health"""
         try:
@@ -31,7 +31,7 @@ sys.path.insert(0, timeseries_path)
 sys.path.insert(0, industry_path)
 
 # Import database manager
-from database import SupabaseManager, DatabaseConfig
+from database import SupabaseManager, DatabaseConfig, query_metrics, get_inference_cache
 
 # Create logs directory if not exists
 os.makedirs('logs', exist_ok=True)
@@ -92,7 +92,7 @@ class SPAVIPPipeline:
         logger.info("📊 SPA VIP SYSTEM STATUS")
         logger.info("="*80)
         
-        # Database statistics
+        # Database statistics (cached, one aggregate call when stale)
         stats = self.db_manager.get_table_stats()
         
         total_articles = sum(table_stats['total'] for table_stats in stats.values())
@@ -237,6 +237,7 @@ class SPAVIPPipeline:
                 - update_stock: Whether to update stock tables (default: True)
                 - recalculate_all_stock: Whether to recalculate all stock sentiment stats (default: False)
                 - optimized_update: Whether to use optimized update (only affected trading days) (default: False)
+                - workers: Worker processes for sentiment prediction (default: SENTIMENT_WORKERS)
         """
         logger.info("\n🎭 PHASE 3: SENTIMENT ANALYSIS")
         logger.info("="*50)
@@ -249,12 +250,13 @@ class SPAVIPPipeline:
             update_stock = sentiment_options.get('update_stock', True) if sentiment_options else True
             recalculate_all_stock = sentiment_options.get('recalculate_all_stock', False) if sentiment_options else False
             optimized_update = sentiment_options.get('optimized_update', False) if sentiment_options else False
+            workers = sentiment_options.get('workers') if sentiment_options else None
             
             if optimized_update:
                 # Use optimized sentiment update logic
                 logger.info("🚀 Using OPTIMIZED sentiment update mode")
                 from sentiment.optimized_sentiment_update import optimized_process_sentiment_to_stock
-                from sentiment.predict_sentiment_db import get_database_manager, predict_and_update_sentiment
+                from sentiment.predict_sentiment_db import get_database_manager, predict_tables
                 from database import DatabaseConfig
                 
                 if tables is None:
@@ -268,20 +270,13 @@ class SPAVIPPipeline:
                 
                 # Phase 1: Predict sentiment for new records
                 stock_updates = {}
-                for table_name in tables:
-                    logger.info(f"🎯 Processing table: {table_name}")
-                    try:
-                        updated_dates = predict_and_update_sentiment(db_manager, table_name)
-                        total_updated_dates.update(updated_dates)
-                        
-                        # Store updated dates for optimized stock processing
-                        if table_name.endswith("_News") and table_name != "General_News":
-                            stock_code = table_name.replace("_News", "")
-                            stock_updates[stock_code] = updated_dates
-                        
-                        logger.info(f"✅ Completed processing {table_name}")
-                    except Exception as e:
-                        logger.error(f"❌ Error processing {table_name}: {e}")
+                for table_name, updated_dates in predict_tables(db_manager, tables, workers).items():
+                    total_updated_dates.update(updated_dates)
+                    
+                    # Store updated dates for optimized stock processing
+                    if table_name.endswith("_News") and table_name != "General_News":
+                        stock_code = table_name.replace("_News", "")
+                        stock_updates[stock_code] = updated_dates
                 
                 # Phase 2: Optimized stock table updates
                 if update_stock:
@@ -311,11 +306,11 @@ class SPAVIPPipeline:
                 if tables:
                     # Process specific tables
                     logger.info(f"🎯 Processing specific tables: {tables}")
-                    processed_dates = run_sentiment_analysis_pipeline(tables, update_stock, recalculate_all_stock)
+                    processed_dates = run_sentiment_analysis_pipeline(tables, update_stock, recalculate_all_stock, workers)
                 else:
                     # Default: process all tables
                     logger.info("🎯 Processing all news tables")
-                    processed_dates = run_sentiment_analysis_pipeline(None, update_stock, recalculate_all_stock)
+                    processed_dates = run_sentiment_analysis_pipeline(None, update_stock, recalculate_all_stock, workers)
             
             phase_time = time.time() - phase_start
             self.sentiment_results = {
@@ -594,6 +589,16 @@ class SPAVIPPipeline:
         logger.info("\n🎉 PIPELINE EXECUTION COMPLETED!")
         logger.info("="*80)
 
+    def report_query_metrics(self):
+        """Log inference cache hit rates and the costliest database query shapes, export query metrics as JSON"""
+        cache = get_inference_cache()
+        if cache is not None:
+            cache.log_summary()
+        if not DatabaseConfig.QUERY_METRICS:
+            return
+        query_metrics.log_summary()
+        query_metrics.export_json(f"logs/query_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
 def main():
     """Main function with command line interface"""
     parser = argparse.ArgumentParser(
@@ -644,6 +649,8 @@ Examples:
                        help='Recalculate sentiment statistics for all dates in stock tables')
     parser.add_argument('--optimized-update', action='store_true',
                        help='Use optimized sentiment update (only affected trading days)')
+    parser.add_argument('--sent-workers', type=int,
+                       help='Worker processes for sentiment prediction, one table each (default: SENTIMENT_WORKERS)')
     parser.add_argument('--summ-priority', action='store_true',
                        help='Process tables by priority (default)')
     
@@ -698,6 +705,8 @@ Examples:
                 sentiment_options['recalculate_all_stock'] = True
             if args.optimized_update:
                 sentiment_options['optimized_update'] = True
+            if args.sent_workers:
+                sentiment_options['workers'] = args.sent_workers
             pipeline.run_sentiment_phase(sentiment_options)
             
         elif args.timeseries_only:
@@ -751,6 +760,8 @@ Examples:
                 sent_opts['recalculate_all_stock'] = True
             if args.optimized_update:
                 sent_opts['optimized_update'] = True
+            if args.sent_workers:
+                sent_opts['workers'] = args.sent_workers
             if sent_opts:
                 options['sentiment'] = sent_opts
             # Industry options
@@ -814,6 +825,8 @@ Examples:
     except Exception as e:
         logger.error(f"💥 System error: {e}")
         raise
+    finally:
+        pipeline.report_query_metrics()
 
 # CHẠY FULL PIPELINE
 # # Chạy toàn bộ pipeline: Crawl -> Summarization -> Sentiment Analysis
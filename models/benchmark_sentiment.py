@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sentiment Backend Benchmark
+Latency, throughput and fp32 label agreement of each sentiment inference backend
+
+Usage:
+  python models/benchmark_sentiment.py                          # 300 summaries from FPT_News
+  python models/benchmark_sentiment.py --table General_News --limit 500
+  python models/benchmark_sentiment.py --texts-file samples.txt --backends torch int8
+  python models/benchmark_sentiment.py --output logs/sentiment_benchmark.json
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from typing import Dict, List
+
+import numpy as np
+import torch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(current_dir))
+
+from models.model_manager import get_model_manager
+from models.sentiment_backends import BACKENDS, convert_sentiment_model, label_agreement
+from sentiment.inference_engine import BatchedSentimentEngine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def load_texts(args) -> List[str]:
+    """Summaries to benchmark on, from a file (one per line) or a news table"""
+    if args.texts_file:
+        with open(args.texts_file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+        return texts[:args.limit]
+
+    from database import SupabaseManager
+
+    db_manager = SupabaseManager()
+    rows = db_manager.iter_rows(args.table, [("filter", "ai_summary", "not.is", "null")], "ai_summary",
+                                descending=True)
+    texts = []
+    for row in rows:
+        if (row.get("ai_summary") or "").strip():
+            texts.append(row["ai_summary"])
+        if len(texts) >= args.limit:
+            break
+    return texts
+
+
+def benchmark_backend(model, tokenizer, id2label, texts: List[str], batch_size: int,
+                      latency_samples: int) -> Dict:
+    """Single-article latency percentiles and batched throughput"""
+    single = BatchedSentimentEngine(model, tokenizer, id2label, batch_size=1)
+    single.predict(texts[:2])  # Warm-up
+
+    latencies = []
+    for text in texts[:latency_samples]:
+        start = time.perf_counter()
+        single.predict([text])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    batched = BatchedSentimentEngine(model, tokenizer, id2label, batch_size=batch_size)
+    batched.predict(texts)
+    return {
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 1),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)), 1),
+        "articles_per_second": round(batched.last_stats["articles_per_second"], 1),
+        "batch_size": batch_size
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='🔬 SPA VIP sentiment backend benchmark')
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--table', default='FPT_News', help='News table to sample summaries from')
+    parser.add_argument('--texts-file', help='Read texts from this file instead (one per line)')
+    parser.add_argument('--limit', type=int, default=300, help='Number of texts')
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--latency-samples', type=int, default=50, help='Texts timed one at a time')
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    texts = load_texts(args)
+    if not texts:
+        print("❌ No texts to benchmark")
+        return 1
+    print(f"📄 Benchmarking on {len(texts)} texts, {torch.get_num_threads()} CPU threads")
+
+    manager = get_model_manager()
+    fp32_model, tokenizer, id2label = manager.load_sentiment_model(backend="torch")
+    config = manager.MODEL_CONFIGS['sentiment']
+    weights_path = os.path.join(manager.get_model_path('sentiment'), config['model_file'])
+
+    results = {}
+    for backend in args.backends:
+        start = time.perf_counter()
+        model = convert_sentiment_model(fp32_model, tokenizer, id2label, weights_path, backend)
+        if backend != "torch" and model is fp32_model:
+            print(f"⚠️ {backend}: unavailable, skipped")
+            continue
+
+        result = {"load_seconds": round(time.perf_counter() - start, 2)}
+        result.update(benchmark_backend(model, tokenizer, id2label, texts, args.batch_size, args.latency_samples))
+        if backend != "torch":
+            result["agreement"] = round(label_agreement(fp32_model, model, tokenizer, id2label, texts)["agreement"], 4)
+        results[backend] = result
+
+    print("\n" + "=" * 78)
+    print(f"{'Backend':<10} {'Load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'Articles/s':>11} {'Agreement':>10}")
+    print("-" * 78)
+    base = results.get("torch", {}).get("articles_per_second")
+    for backend, r in results.items():
+        speedup = f" ({r['articles_per_second'] / base:.2f}x)" if base else ""
+        agreement = f"{r['agreement']:.2%}" if "agreement" in r else "-"
+        print(f"{backend:<10} {r['load_seconds']:>7.2f} {r['latency_p50_ms']:>8.1f} {r['latency_p95_ms']:>8.1f} "
+              f"{r['articles_per_second']:>11.1f} {agreement:>10}{speedup}")
+    print("=" * 78)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"texts": len(texts), "threads": torch.get_num_threads(), "results": results}, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
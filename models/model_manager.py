@@ -52,6 +52,10 @@ class ModelManager:
         }
     }
     
+    # Output labels of the classifier heads
+    SENTIMENT_ID2LABEL = {0: "Positive", 1: "Negative", 2: "Neutral"}
+    INDUSTRY_LABELS = ["Tài chính - Ngân hàng", "Công nghệ", "Năng lượng", "Sản xuất", "Khác"]
+    
     def __init__(self, cache_dir: Optional[str] = None):
         """
         Initialize ModelManager - HuggingFace only mode
@@ -161,9 +165,32 @@ class ModelManager:
         logger.info(f"Using cached {model_type} model from: {local_dir}")
         return str(local_dir)
     
-    def load_sentiment_model(self):
-        """Load sentiment analysis model"""
+    def model_version(self, model_type: str) -> str:
+        """
+        Version string of a local model, for keying cached outputs
+        
+        Derived from the size and modification time of the weights, so a
+        re-downloaded or retrained model gets a new version.
+        """
+        config = self.MODEL_CONFIGS[model_type]
+        local_dir = self.cache_dir / config['local_dir'].replace('model_AI/', '')
+        weights = local_dir / config['model_file'] if 'model_file' in config else local_dir / 'model.safetensors'
+        try:
+            stat = weights.stat()
+            return f"{model_type}:{weights.name}:{stat.st_size}:{int(stat.st_mtime)}"
+        except OSError:
+            return f"{model_type}:{weights.name}"
+    
+    def load_sentiment_model(self, backend: Optional[str] = None, agreement_texts: Optional[list] = None):
+        """
+        Load sentiment analysis model
+        
+        Args:
+            backend: 'torch', 'int8', 'onnx' or 'onnx-int8' (default: SENTIMENT_BACKEND env)
+            agreement_texts: Held-out texts to check a converted backend against fp32
+        """
         from sentiment.predict_sentiment_db import SentimentClassifier
+        from models.sentiment_backends import convert_sentiment_model
         
         try:
             model_path = self.get_model_path('sentiment')
@@ -177,7 +204,10 @@ class ModelManager:
             
             # Load tokenizer
             tokenizer = AutoTokenizer.from_pretrained(config['base_model'])
-            id2label = {0: "Positive", 1: "Negative", 2: "Neutral"}
+            id2label = dict(self.SENTIMENT_ID2LABEL)
+            
+            # Optional CPU backend (int8 / ONNX Runtime), cached next to the .bin
+            model = convert_sentiment_model(model, tokenizer, id2label, model_file_path, backend, agreement_texts)
             
             logger.info("✅ Sentiment model loaded successfully")
             return model, tokenizer, id2label
@@ -235,7 +265,7 @@ class ModelManager:
             config = self.MODEL_CONFIGS['industry']
             
             # Load model
-            labels = ["Tài chính - Ngân hàng", "Công nghệ", "Năng lượng", "Sản xuất", "Khác"]
+            labels = list(self.INDUSTRY_LABELS)
             model = IndustryClassifier(n_classes=len(labels))
             
             model_file_path = os.path.join(model_path, config['model_file'])
@@ -252,6 +282,24 @@ class ModelManager:
             logger.error(f"❌ Failed to load industry model: {str(e)}")
             raise
     
+    def load_multi_head_model(self, agreement_texts: Optional[list] = None):
+        """
+        Load one PhoBERT encoder serving both the sentiment and industry heads
+        
+        Args:
+            agreement_texts: Held-out texts for the parity check against the separate models
+            
+        Returns:
+            MultiHeadEngine, or None if parity with the separate models is not established
+        """
+        from models.multi_head import load_multi_head_engine
+        
+        try:
+            return load_multi_head_engine(self, agreement_texts)
+        except Exception as e:
+            logger.error(f"❌ Failed to load shared-encoder model: {str(e)}")
+            return None
+    
     def download_all_models(self, force_download: bool = False):
         """Download all models"""
         logger.info("🚀 Starting download of all models...")
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi-Head PhoBERT Inference
+One resident PhoBERT encoder feeding the sentiment and industry heads
+
+SentimentClassifier and IndustryClassifier share the architecture
+(phobert-base encoder -> dropout -> Linear) and read the same ai_summary with
+the same tokenizer, so one encoder pass can serve both heads. The encoder is
+taken from the sentiment checkpoint and each head from its own checkpoint.
+The industry labels only match the separate IndustryClassifier if the two
+checkpoints carry the same encoder weights, so the shared model is used only
+after a parity check against the separate models has passed.
+"""
+
+import gc
+import os
+import json
+import hashlib
+import logging
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import torch
+import torch.nn as nn
+from transformers import AutoModel, AutoTokenizer
+
+from sentiment.inference_engine import BatchedSentimentEngine
+
+logger = logging.getLogger(__name__)
+
+# Use the shared encoder for sentiment + industry (after the parity check passes)
+MULTI_HEAD_INFERENCE = os.getenv("MULTI_HEAD_INFERENCE", "false").lower() in ("1", "true", "yes")
+# Minimum per-head label agreement with the separate models
+MIN_PARITY = float(os.getenv("MULTI_HEAD_MIN_PARITY", 0.99))
+# Held-out texts used for the parity check
+PARITY_SAMPLE_SIZE = int(os.getenv("MULTI_HEAD_PARITY_SAMPLE", 200))
+
+_ENCODER_PREFIX = "bert."
+
+
+class MultiHeadClassifier(nn.Module):
+    """PhoBERT encoder with several Linear heads on the pooled output"""
+
+    def __init__(self, encoder: nn.Module, heads: Dict[str, nn.Linear]):
+        super(MultiHeadClassifier, self).__init__()
+        self.bert = encoder
+        self.heads = nn.ModuleDict(heads)
+
+    def forward(self, input_ids, attention_mask) -> Dict[str, torch.Tensor]:
+        _, pooled_output = self.bert(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            return_dict=False
+        )
+        return {name: head(pooled_output) for name, head in self.heads.items()}
+
+    @classmethod
+    def from_checkpoints(cls, base_model: str, encoder_state: Dict[str, torch.Tensor],
+                         head_states: Dict[str, Dict[str, torch.Tensor]]) -> "MultiHeadClassifier":
+        """
+        Build from classifier state dicts
+
+        Args:
+            base_model: Hugging Face encoder architecture (e.g. vinai/phobert-base)
+            encoder_state: Checkpoint whose bert.* tensors become the shared encoder
+            head_states: Head name -> checkpoint holding its fc.weight / fc.bias
+        """
+        encoder = AutoModel.from_pretrained(base_model)
+        encoder.load_state_dict(encoder_weights(encoder_state))
+
+        heads = {}
+        for name, state in head_states.items():
+            weight, bias = state["fc.weight"], state["fc.bias"]
+            head = nn.Linear(weight.shape[1], weight.shape[0])
+            head.load_state_dict({"weight": weight, "bias": bias})
+            heads[name] = head
+        return cls(encoder, heads).eval()
+
+
+def encoder_weights(state: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
+    """bert.* tensors of a classifier checkpoint, without the prefix"""
+    return {k[len(_ENCODER_PREFIX):]: v for k, v in state.items() if k.startswith(_ENCODER_PREFIX)}
+
+
+def encoder_digest(state: Dict[str, torch.Tensor]) -> str:
+    """Hash of the bert.* tensors, so two checkpoints' encoders compare without both being resident"""
+    digest = hashlib.sha1()
+    for key, tensor in sorted(encoder_weights(state).items()):
+        tensor = tensor.detach().cpu().contiguous()
+        digest.update(f"{key}:{tensor.dtype}:{tuple(tensor.shape)}".encode("utf-8"))
+        digest.update(tensor.view(-1).view(torch.uint8).numpy().tobytes())
+    return digest.hexdigest()
+
+
+class MultiHeadEngine(BatchedSentimentEngine):
+    """
+    BatchedSentimentEngine for MultiHeadClassifier
+
+    Each text is tokenized and encoded once; every head's labels come out of
+    the same pass.
+    """
+
+    def __init__(self, model: MultiHeadClassifier, tokenizer, head_labels: Dict[str, Dict[int, str]],
+                 batch_size: Optional[int] = None, device: Optional[str] = None,
+                 cache_versions: Optional[Dict[str, str]] = None):
+        super().__init__(model, tokenizer, None, batch_size=batch_size, device=device,
+                         cache_versions=cache_versions)
+        self.head_labels = head_labels
+
+    def predict(self, texts: List[str]) -> Dict[str, List[str]]:
+        """
+        Predict every head's label for every text
+
+        Returns:
+            Dict mapping head name -> labels aligned with texts
+        """
+        labels = {name: [None] * len(texts) for name in self.head_labels}
+        if not texts:
+            return labels
+
+        def collect(batch_indices, outputs):
+            for name, logits in outputs.items():
+                id2label = self.head_labels[name]
+                for index, predicted_class in zip(batch_indices, logits.argmax(dim=1).tolist()):
+                    labels[name][index] = id2label[predicted_class]
+
+        self._run(texts, collect)
+        return labels
+
+    def predict_logits(self, texts: List[str]) -> Dict[str, List[List[float]]]:
+        """Raw logits of every head, aligned with texts"""
+        logits_rows = {name: [None] * len(texts) for name in self.head_labels}
+
+        def collect(batch_indices, outputs):
+            for name, logits in outputs.items():
+                for index, row in zip(batch_indices, logits.float().tolist()):
+                    logits_rows[name][index] = row
+
+        if texts:
+            self._run(texts, collect)
+        return logits_rows
+
+
+def check_parity(multi_engine: MultiHeadEngine,
+                 separate_loaders: Dict[str, Callable[[], BatchedSentimentEngine]],
+                 texts: List[str]) -> Dict:
+    """
+    Per-head label agreement of the shared model with the separate models
+
+    Separate engines are built one at a time and freed before the next one
+    is loaded, so at most the shared model and one separate model are resident.
+
+    Args:
+        multi_engine: Shared-encoder engine
+        separate_loaders: Head name -> function building that head's separate engine
+        texts: Held-out texts
+
+    Returns:
+        Dict with sample size, per-head agreement and the pass/fail verdict
+    """
+    shared = multi_engine.predict(texts)
+    heads = {}
+    for name, load in separate_loaders.items():
+        engine = load()
+        expected = engine.predict(texts)
+        del engine
+        gc.collect()
+        heads[name] = sum(a == b for a, b in zip(expected, shared[name])) / len(texts) if texts else 1.0
+    return {
+        "sample_size": len(texts),
+        "heads": heads,
+        "passed": bool(texts) and all(agreement >= MIN_PARITY for agreement in heads.values())
+    }
+
+
+def _load_separate_engine(model_class, weights_path: str, tokenizer,
+                          labels: Dict[int, str]) -> BatchedSentimentEngine:
+    model = model_class(n_classes=len(labels))
+    state = torch.load(weights_path, map_location="cpu")
+    model.load_state_dict(state)
+    del state
+    return BatchedSentimentEngine(model.eval(), tokenizer, labels)
+
+
+def load_multi_head_engine(manager, agreement_texts: Optional[List[str]] = None) -> Optional[MultiHeadEngine]:
+    """
+    Build the shared-encoder engine if it is known to match the separate models
+
+    Parity is proven outright when both checkpoints hold identical encoder
+    tensors; otherwise it is measured on agreement_texts. The verdict is stored
+    in multi_head_parity.json and reused until either checkpoint changes.
+    Checkpoints are read one at a time (only the industry head is kept from
+    its checkpoint), to stay within a small instance's memory.
+
+    Args:
+        manager: ModelManager providing the checkpoints
+        agreement_texts: Held-out summaries for the parity check
+
+    Returns:
+        MultiHeadEngine, or None if parity is not established
+    """
+    from sentiment.predict_sentiment_db import SentimentClassifier
+    from industry.models.phobert_classifier import IndustryClassifier
+
+    paths = {}
+    for name in ("sentiment", "industry"):
+        config = manager.MODEL_CONFIGS[name]
+        paths[name] = os.path.join(manager.get_model_path(name), config["model_file"])
+    base_model = manager.MODEL_CONFIGS["sentiment"]["base_model"]
+
+    report_path = Path(manager.cache_dir) / "multi_head_parity.json"
+    fingerprint = {name: os.path.getmtime(path) for name, path in paths.items()}
+    try:
+        with open(report_path, encoding="utf-8") as f:
+            report = json.load(f)
+        if report.get("checkpoints") != fingerprint:
+            report = {}
+    except (OSError, ValueError):
+        report = {}
+
+    if report and not report.get("passed"):
+        logger.info("ℹ️ Shared encoder failed its parity check earlier, keeping separate models")
+        return None
+
+    # Industry first: only its head (and encoder digest) are kept, then the
+    # sentiment checkpoint supplies the shared encoder
+    head_states, digests = {}, {}
+    model = None
+    for name in ("industry", "sentiment"):
+        state = torch.load(paths[name], map_location="cpu")
+        if not report:
+            digests[name] = encoder_digest(state)
+        head_states[name] = {key: state[key] for key in ("fc.weight", "fc.bias")}
+        if name == "sentiment":
+            model = MultiHeadClassifier.from_checkpoints(
+                base_model, state, {head: head_states[head] for head in ("sentiment", "industry")})
+        del state
+    gc.collect()
+
+    tokenizer = AutoTokenizer.from_pretrained(base_model)
+    head_labels = {
+        "sentiment": dict(manager.SENTIMENT_ID2LABEL),
+        "industry": dict(enumerate(manager.INDUSTRY_LABELS))
+    }
+    # Encoder and sentiment head come from the sentiment checkpoint, the industry
+    # head from the industry one: outputs are cached apart from either separate model
+    version = f"multi-head:{manager.model_version('sentiment')}+{manager.model_version('industry')}"
+    engine = MultiHeadEngine(model, tokenizer, head_labels,
+                             cache_versions={name: version for name in head_labels})
+
+    if not report:
+        if digests["sentiment"] == digests["industry"]:
+            report = {"identical_encoders": True, "passed": True}
+        elif agreement_texts:
+            loaders = {
+                name: partial(_load_separate_engine, model_class, paths[name], tokenizer, head_labels[name])
+                for name, model_class in (("sentiment", SentimentClassifier), ("industry", IndustryClassifier))
+            }
+            report = check_parity(engine, loaders, agreement_texts[:PARITY_SAMPLE_SIZE])
+            report["identical_encoders"] = False
+        else:
+            logger.warning("⚠️ Shared encoder not verified yet (no held-out texts), keeping separate models")
+            return None
+
+        report["checkpoints"] = fingerprint
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"🔬 Shared encoder parity: {report}")
+
+    if not report["passed"]:
+        logger.warning("⚠️ Shared encoder does not match the separate models, keeping separate models")
+        # Free the shared model before the caller loads the separate ones
+        del engine, model
+        gc.collect()
+        return None
+
+    logger.info("✅ Shared PhoBERT encoder loaded for sentiment + industry")
+    return engine
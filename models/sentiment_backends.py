@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sentiment Inference Backends
+CPU alternatives to fp32 eager PyTorch for the PhoBERT sentiment classifier
+
+Backends (SENTIMENT_BACKEND):
+    torch      - fp32 eager PyTorch (default)
+    int8       - PyTorch dynamic int8 quantization of the Linear layers
+    onnx       - ONNX Runtime, fp32 graph exported from the PyTorch model
+    onnx-int8  - ONNX Runtime, dynamically int8-quantized graph
+
+ONNX artifacts are cached next to the .bin weights and rebuilt when the
+weights are newer. int8 is quantized from the loaded fp32 model on every load
+(dynamic quantization takes seconds), so it has no artifact. Each backend has
+a .json sidecar recording its label agreement with the fp32 model; a backend
+that failed the check is not used.
+"""
+
+import os
+import json
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+
+# Inference backend for the sentiment model
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+# Held-out texts used to compare a converted backend with fp32
+AGREEMENT_SAMPLE_SIZE = int(os.getenv("SENTIMENT_AGREEMENT_SAMPLE", 200))
+# Minimum fraction of identical labels for a converted backend to be used
+MIN_AGREEMENT = float(os.getenv("SENTIMENT_MIN_AGREEMENT", 0.98))
+ONNX_OPSET = 17
+
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ort = None
+    ONNX_AVAILABLE = False
+
+
+class OnnxSentimentModel:
+    """
+    ONNX Runtime session with the call signature of SentimentClassifier
+
+    Takes input_ids/attention_mask tensors and returns logits as a tensor, so
+    BatchedSentimentEngine can drive it unchanged.
+    """
+
+    device = torch.device("cpu")
+
+    def __init__(self, onnx_path: str, num_threads: Optional[int] = None):
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.onnx_path = onnx_path
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+
+    def __call__(self, input_ids, attention_mask):
+        logits = self.session.run(["logits"], {
+            "input_ids": input_ids.cpu().numpy().astype(np.int64),
+            "attention_mask": attention_mask.cpu().numpy().astype(np.int64)
+        })[0]
+        return torch.from_numpy(logits)
+
+    def eval(self):
+        return self
+
+
+# ============ ARTIFACTS ============
+
+def artifact_path(weights_path: str, backend: str) -> Optional[Path]:
+    """Cached artifact for a backend, stored next to the .bin weights (int8: only its .json report)"""
+    weights = Path(weights_path)
+    suffix = {"int8": ".int8", "onnx": ".onnx", "onnx-int8": ".int8.onnx"}.get(backend)
+    return weights.with_name(weights.stem + suffix) if suffix else None
+
+
+def _is_fresh(path: Path, weights_path: str) -> bool:
+    return path.exists() and path.stat().st_mtime >= Path(weights_path).stat().st_mtime
+
+
+def _read_report(path: Path) -> Dict:
+    try:
+        with open(f"{path}.json", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_report(path: Path, report: Dict):
+    with open(f"{path}.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def quantize_int8(model: nn.Module) -> nn.Module:
+    """Dynamic int8 quantization of the Linear layers (weights int8, activations quantized on the fly)"""
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8).eval()
+
+
+def export_onnx(model: nn.Module, tokenizer, path: Path) -> Path:
+    """Export the classifier to ONNX with dynamic batch and sequence axes"""
+    sample = tokenizer(["Cổ phiếu tăng mạnh trong phiên hôm nay"], return_tensors="pt")
+    tmp_path = path.with_name(path.name + ".tmp")
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(tmp_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"}
+            },
+            opset_version=ONNX_OPSET
+        )
+    os.replace(tmp_path, path)
+    return path
+
+
+def _build_onnx(model: nn.Module, tokenizer, weights_path: str, backend: str) -> Path:
+    fp32_path = artifact_path(weights_path, "onnx")
+    if not _is_fresh(fp32_path, weights_path):
+        logger.info(f"🔧 Exporting sentiment model to ONNX: {fp32_path}")
+        export_onnx(model, tokenizer, fp32_path)
+    if backend == "onnx":
+        return fp32_path
+
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    int8_path = artifact_path(weights_path, "onnx-int8")
+    logger.info(f"🔧 Quantizing ONNX sentiment model to int8: {int8_path}")
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    return int8_path
+
+
+# ============ AGREEMENT ============
+
+def label_agreement(reference_model, candidate_model, tokenizer, id2label: Dict[int, str],
+                    texts: List[str]) -> Dict:
+    """
+    Compare labels of a candidate backend with the fp32 model
+
+    Returns:
+        Dict with sample size, agreement fraction and per-backend throughput
+    """
+    from sentiment.inference_engine import BatchedSentimentEngine
+
+    reference = BatchedSentimentEngine(reference_model, tokenizer, id2label)
+    candidate = BatchedSentimentEngine(candidate_model, tokenizer, id2label)
+    expected = reference.predict(texts)
+    actual = candidate.predict(texts)
+
+    matches = sum(a == b for a, b in zip(expected, actual))
+    return {
+        "sample_size": len(texts),
+        "agreement": matches / len(texts) if texts else 1.0,
+        "reference_articles_per_second": reference.last_stats.get("articles_per_second", 0.0),
+        "candidate_articles_per_second": candidate.last_stats.get("articles_per_second", 0.0),
+        "checked_at": time.time()
+    }
+
+
+# ============ LOADING ============
+
+def loaded_backend(model) -> str:
+    """Backend a model returned by convert_sentiment_model actually runs on"""
+    return getattr(model, "sentiment_backend", "torch")
+
+
+def convert_sentiment_model(model: nn.Module, tokenizer, id2label: Dict[int, str], weights_path: str,
+                            backend: Optional[str] = None, agreement_texts: Optional[List[str]] = None):
+    """
+    Turn the loaded fp32 classifier into the requested backend
+
+    Args:
+        model: fp32 SentimentClassifier in eval mode
+        tokenizer: PhoBERT tokenizer
+        id2label: Class index to label
+        weights_path: Path of the .bin weights (artifacts and reports are cached beside it)
+        backend: One of BACKENDS (default: SENTIMENT_BACKEND)
+        agreement_texts: Held-out texts for the fp32 agreement check
+
+    Returns:
+        Model usable by BatchedSentimentEngine; the fp32 model if the backend
+        is unavailable or disagrees with fp32 on the held-out sample. See
+        loaded_backend for the backend it ended up on.
+    """
+    backend = backend or SENTIMENT_BACKEND
+    converted = _convert(model, tokenizer, id2label, weights_path, backend, agreement_texts)
+    converted.sentiment_backend = backend if converted is not model else "torch"
+    return converted
+
+
+def _convert(model: nn.Module, tokenizer, id2label: Dict[int, str], weights_path: str,
+             backend: str, agreement_texts: Optional[List[str]]):
+    if backend == "torch":
+        return model
+    if backend not in BACKENDS:
+        logger.warning(f"⚠️ Unknown sentiment backend '{backend}', using torch")
+        return model
+    if backend.startswith("onnx") and not ONNX_AVAILABLE:
+        logger.warning(f"⚠️ onnxruntime not installed, sentiment backend '{backend}' falls back to torch")
+        return model
+
+    path = artifact_path(weights_path, backend)
+    # int8 has no artifact of its own, only the agreement report
+    checked_path = Path(f"{path}.json") if backend == "int8" else path
+    report = _read_report(path) if _is_fresh(checked_path, weights_path) else {}
+    if report.get("agreement") is not None and report["agreement"] < MIN_AGREEMENT:
+        logger.warning(f"⚠️ {backend} agreed on only {report['agreement']:.1%} of labels, using torch")
+        return model
+
+    try:
+        if backend == "int8":
+            candidate = quantize_int8(model)
+        else:
+            if not _is_fresh(path, weights_path):
+                path = _build_onnx(model, tokenizer, weights_path, backend)
+                report = {}
+            candidate = OnnxSentimentModel(str(path), torch.get_num_threads())
+    except Exception as e:
+        logger.error(f"❌ Failed to prepare sentiment backend '{backend}', using torch: {e}")
+        return model
+
+    if not report and agreement_texts:
+        report = label_agreement(model, candidate, tokenizer, id2label, agreement_texts[:AGREEMENT_SAMPLE_SIZE])
+        report["backend"] = backend
+        _write_report(path, report)
+        logger.info(
+            f"🔬 {backend} vs fp32: {report['agreement']:.1%} label agreement on {report['sample_size']} texts, "
+            f"{report['candidate_articles_per_second']:.1f} vs {report['reference_articles_per_second']:.1f} articles/s"
+        )
+        if report["agreement"] < MIN_AGREEMENT:
+            logger.warning(f"⚠️ {backend} below {MIN_AGREEMENT:.0%} agreement, using torch")
+            return model
+    elif not report:
+        logger.warning(f"⚠️ {backend} sentiment backend has not been checked against fp32 yet")
+
+    logger.info(f"✅ Sentiment backend: {backend}")
+    return candidate
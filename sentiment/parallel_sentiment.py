@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parallel Sentiment Workers
+Runs sentiment prediction for several news tables in separate processes
+
+Each worker process loads its own model and handles whole tables, with a
+torch thread budget so that all workers together use the machine's cores
+instead of each one trying to use all of them. Workers return the dates
+they updated; stock-table updates stay in the parent process.
+
+Usage (scaling measurement, inference only - nothing is written):
+  python sentiment/parallel_sentiment.py --workers 1 2 4
+  python sentiment/parallel_sentiment.py --workers 1 2 4 --limit 200 --output logs/sentiment_scaling.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Set
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(current_dir))
+
+# Worker processes for sentiment prediction (1 = sequential in this process)
+SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", 1))
+# Cores shared between the workers (default: all CPUs)
+SENTIMENT_CPU_BUDGET = int(os.getenv("SENTIMENT_CPU_BUDGET", 0)) or os.cpu_count() or 1
+
+
+def thread_budgets(workers: int, cores: Optional[int] = None) -> List[int]:
+    """
+    Split cores into per-worker torch thread counts that add up to cores
+
+    Args:
+        workers: Number of worker processes
+        cores: Cores to share (default: SENTIMENT_CPU_BUDGET)
+
+    Returns:
+        One thread count per worker (at least 1 each)
+    """
+    cores = cores or SENTIMENT_CPU_BUDGET
+    base, extra = divmod(cores, workers)
+    return [max(1, base + (1 if i < extra else 0)) for i in range(workers)]
+
+
+def _init_worker(budgets, preload: bool = False):
+    """Take one thread budget from the shared queue and apply it to torch"""
+    import torch
+
+    threads = budgets.get()
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already set in this process
+    print(f"🧵 Sentiment worker {os.getpid()}: {threads} torch threads")
+    if preload:
+        from sentiment.predict_sentiment_db import get_sentiment_engine
+        get_sentiment_engine()
+
+
+def _predict_table(table_name: str):
+    """Worker task: predict and store sentiment for one table"""
+    import torch
+    from sentiment.predict_sentiment_db import get_database_manager, predict_and_update_sentiment
+
+    start = time.time()
+    db_manager = get_database_manager()
+    try:
+        updated_dates = predict_and_update_sentiment(db_manager, table_name)
+    finally:
+        db_manager.close_connections()
+    return table_name, updated_dates, time.time() - start, torch.get_num_threads()
+
+
+def _make_pool(workers: int, cores: Optional[int] = None, preload: bool = False) -> ProcessPoolExecutor:
+    # spawn: forking a process that already holds torch/OpenMP state can deadlock
+    context = multiprocessing.get_context("spawn")
+    budgets = context.Queue()
+    for threads in thread_budgets(workers, cores):
+        budgets.put(threads)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                               initializer=_init_worker, initargs=(budgets, preload))
+
+
+def predict_tables_parallel(table_names: List[str], workers: Optional[int] = None,
+                            cores: Optional[int] = None) -> Dict[str, Set[str]]:
+    """
+    Predict sentiment for each table in a pool of worker processes
+
+    Tables are handed out one at a time, so a free worker picks up the next
+    table while a larger one is still running. A failed table is logged and
+    reported with no updated dates, like in the sequential pipeline.
+
+    Args:
+        table_names: News tables to process
+        workers: Worker processes (default: SENTIMENT_WORKERS, capped at the table and core counts)
+        cores: Cores shared between the workers (default: SENTIMENT_CPU_BUDGET)
+
+    Returns:
+        Dict mapping table name -> set of updated dates
+    """
+    workers = max(1, min(workers or SENTIMENT_WORKERS, len(table_names), cores or SENTIMENT_CPU_BUDGET))
+    print(f"🚀 Sentiment worker pool: {workers} processes, thread budgets {thread_budgets(workers, cores)}")
+
+    results = {table_name: set() for table_name in table_names}
+    with _make_pool(workers, cores) as pool:
+        futures = {pool.submit(_predict_table, table_name): table_name for table_name in table_names}
+        for future in as_completed(futures):
+            table_name = futures[future]
+            try:
+                _, updated_dates, seconds, threads = future.result()
+                results[table_name] = updated_dates
+                print(f"✅ Completed processing {table_name} in {seconds:.1f}s "
+                      f"({len(updated_dates)} dates, {threads} threads)")
+            except Exception as e:
+                print(f"❌ Error processing {table_name}: {e}")
+    return results
+
+
+# ============ SCALING MEASUREMENT ============
+
+def _infer_texts(table_name: str, texts: List[str]):
+    """Worker task for the scaling measurement: inference only, no cache, no writes"""
+    import torch
+    from sentiment.predict_sentiment_db import get_sentiment_engine
+
+    engine = get_sentiment_engine()
+    start = time.time()
+    engine.predict(texts)
+    return table_name, len(texts), time.time() - start, torch.get_num_threads()
+
+
+def _wait(barrier):
+    barrier.wait()
+
+
+def measure_scaling(texts_by_table: Dict[str, List[str]], worker_counts: List[int],
+                    cores: Optional[int] = None) -> Dict[int, Dict]:
+    """
+    Wall-clock throughput of the per-table partitioning at each worker count
+
+    Every worker loads the model in its initializer; timing starts once all
+    workers have passed a barrier task, so model loading is not counted.
+
+    Returns:
+        Dict mapping worker count -> seconds, articles/s and speedup vs the first count
+    """
+    total = sum(len(texts) for texts in texts_by_table.values())
+    results = {}
+    for workers in worker_counts:
+        with _make_pool(workers, cores, preload=True) as pool, \
+                multiprocessing.get_context("spawn").Manager() as manager:
+            # One barrier task per worker: returns once every worker is up with its model loaded
+            barrier = manager.Barrier(workers)
+            list(pool.map(_wait, [barrier] * workers))
+
+            start = time.time()
+            futures = [pool.submit(_infer_texts, table_name, texts) for table_name, texts in texts_by_table.items()]
+            for future in as_completed(futures):
+                future.result()
+            seconds = time.time() - start
+
+        results[workers] = {
+            "seconds": round(seconds, 2),
+            "articles_per_second": round(total / seconds, 1) if seconds else 0.0,
+            "thread_budgets": thread_budgets(workers, cores)
+        }
+        print(f"⏱️ {workers} workers: {total} articles in {seconds:.1f}s "
+              f"({results[workers]['articles_per_second']:.1f} articles/s)")
+
+    base = results[worker_counts[0]]["articles_per_second"]
+    for result in results.values():
+        result["speedup"] = round(result["articles_per_second"] / base, 2) if base else 0.0
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='🧵 SPA VIP sentiment worker scaling')
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4], help='Worker counts to measure')
+    parser.add_argument('--tables', nargs='+',
+                        default=['FPT_News', 'GAS_News', 'IMP_News', 'VCB_News', 'General_News'])
+    parser.add_argument('--limit', type=int, default=200, help='Summaries per table')
+    parser.add_argument('--cores', type=int, help='Cores shared by the workers (default: all)')
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    from database import SupabaseManager
+
+    db_manager = SupabaseManager()
+    texts_by_table = {}
+    for table_name in args.tables:
+        texts = []
+        for row in db_manager.iter_rows(table_name, [("filter", "ai_summary", "not.is", "null")], "ai_summary",
+                                        descending=True):
+            if (row.get("ai_summary") or "").strip():
+                texts.append(row["ai_summary"])
+            if len(texts) >= args.limit:
+                break
+        texts_by_table[table_name] = texts
+    db_manager.close_connections()
+
+    if not any(texts_by_table.values()):
+        print("❌ No summaries to measure on")
+        return 1
+
+    results = measure_scaling(texts_by_table, args.workers, args.cores)
+    print("\n" + "=" * 60)
+    print(f"{'Workers':>8} {'Seconds':>9} {'Articles/s':>11} {'Speedup':>8}  Threads")
+    print("-" * 60)
+    for workers, r in results.items():
+        print(f"{workers:>8} {r['seconds']:>9.1f} {r['articles_per_second']:>11.1f} {r['speedup']:>7.2f}x  "
+              f"{r['thread_budgets']}")
+    print("=" * 60)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"articles": {t: len(v) for t, v in texts_by_table.items()}, "results": results}, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
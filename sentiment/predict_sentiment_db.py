@@ -1,9 +1,6 @@
 import torch
 import torch.nn as nn
-import pandas as pd
 from transformers import AutoModel, AutoTokenizer
-from tqdm import tqdm
-import time
 import sys
 import os
 
@@ -13,7 +10,9 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
 # Import centralized database system
-from database import SupabaseManager, DatabaseConfig
+from database import SupabaseManager, DatabaseConfig, get_inference_cache
+from sentiment.inference_engine import BatchedSentimentEngine
+from sentiment.stock_sentiment_writer import refresh_stock_sentiment, recompute_stock_sentiment
 
 
 # ====================== 1. Định nghĩa model ======================
@@ -36,19 +35,114 @@ class SentimentClassifier(nn.Module):
         return self.fc(output)
 
 # ====================== 2. Load model & tokenizer ======================
-def load_sentiment_model():
+def load_sentiment_model(agreement_texts=None):
     """Load sentiment analysis model and tokenizer - HuggingFace only"""
     try:
         # Use model manager for HuggingFace models
         from models.model_manager import get_model_manager
         manager = get_model_manager()
-        return manager.load_sentiment_model()
+        return manager.load_sentiment_model(agreement_texts=agreement_texts)
     except Exception as e:
         print(f"❌ Failed to load sentiment model from HuggingFace: {str(e)}")
         raise RuntimeError("Unable to load sentiment model. Please ensure HuggingFace models are available.")
 
 # Initialize model globally (will be loaded when needed)
 model, tokenizer, id2label = None, None, None
+multi_head_engine, multi_head_checked = None, False
+
+def get_multi_head_engine(agreement_texts=None):
+    """Shared-encoder sentiment + industry engine, or None if disabled or not verified"""
+    global multi_head_engine, multi_head_checked
+    
+    if not multi_head_checked:
+        from models.multi_head import MULTI_HEAD_INFERENCE
+        multi_head_checked = True
+        if MULTI_HEAD_INFERENCE:
+            from models.model_manager import get_model_manager
+            multi_head_engine = get_model_manager().load_multi_head_model(agreement_texts)
+    return multi_head_engine
+
+def get_sentiment_engine(agreement_texts=None):
+    """Shared-encoder engine when enabled and verified, otherwise the sentiment model engine"""
+    global model, tokenizer, id2label
+    
+    # Pending summaries double as the held-out sample for checking a converted
+    # backend or the shared encoder against the separate fp32 models
+    engine = get_multi_head_engine(agreement_texts)
+    if engine is None:
+        # Load model if not already loaded
+        if model is None:
+            print("🔄 Loading sentiment analysis model...")
+            model, tokenizer, id2label = load_sentiment_model(agreement_texts=agreement_texts)
+            print("✅ Sentiment model loaded successfully")
+        from models.model_manager import get_model_manager
+        from models.sentiment_backends import loaded_backend
+        version = f"{get_model_manager().model_version('sentiment')}:{loaded_backend(model)}"
+        engine = BatchedSentimentEngine(model, tokenizer, id2label, cache_versions={"sentiment": version})
+    return engine
+
+def predict_with_cache(texts, with_industry=False):
+    """
+    Sentiment labels (and industry labels from the shared encoder) for texts
+    
+    Outputs are looked up in the inference cache by text hash first, so an
+    article stored in several tables is inferred once. Entries are keyed by
+    the cache version of the engine that actually runs (backend after any
+    fallback, or the shared encoder), so outputs of different models never
+    mix. Only texts that are not cached yet are run through the model.
+    
+    Returns:
+        (sentiment labels, industry labels or None) aligned with texts
+    """
+    from models.model_manager import get_model_manager
+    
+    manager = get_model_manager()
+    engine = get_sentiment_engine(agreement_texts=texts)
+    # Industry comes from here only with the shared encoder; otherwise the industry stage classifies it
+    versions = {kind: version for kind, version in engine.cache_versions.items()
+                if kind == "sentiment" or (kind == "industry" and with_industry)}
+    
+    # sentiment -> logits, industry -> probabilities
+    outputs = {kind: [None] * len(texts) for kind in versions}
+    cache = get_inference_cache()
+    if cache is not None:
+        for kind, version in versions.items():
+            for index, value in cache.get_many(kind, version, texts).items():
+                outputs[kind][index] = value
+    
+    missing = sorted({i for values in outputs.values() for i, value in enumerate(values) if value is None})
+    
+    cached_count = len(texts) - len(missing)
+    if cached_count:
+        print(f"🗃️ {cached_count}/{len(texts)} predictions served from the inference cache")
+    
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        predicted = engine.predict_logits(missing_texts)
+        if not isinstance(predicted, dict):
+            predicted = {"sentiment": predicted}
+        if "industry" in predicted:
+            predicted["industry"] = torch.softmax(torch.tensor(predicted["industry"]), dim=1).tolist()
+        
+        for kind, values in predicted.items():
+            if kind not in outputs:
+                continue
+            for index, value in zip(missing, values):
+                outputs[kind][index] = value
+            if cache is not None:
+                cache.put_many(kind, versions[kind], missing_texts, values)
+        
+        stats = engine.last_stats
+        if stats:
+            print(f"📊 Performance: {stats['articles']} articles in {stats['seconds']:.2f}s "
+                  f"({stats['articles_per_second']:.1f} articles/s, batch size {engine.batch_size})")
+    
+    def to_labels(rows, labels):
+        return [labels[max(range(len(row)), key=row.__getitem__)] if row else None for row in rows]
+    
+    sentiments = to_labels(outputs["sentiment"], manager.SENTIMENT_ID2LABEL)
+    industries = to_labels(outputs["industry"], manager.INDUSTRY_LABELS) if "industry" in outputs else None
+    return sentiments, industries
 
 # ====================== 3. Database Manager ======================
 def get_database_manager():
@@ -56,167 +150,83 @@ def get_database_manager():
     return SupabaseManager()
 
 # ====================== 4. Hàm update DB ======================
-def update_sentiment_in_db(db_manager, table_name, link, sentiment):
-    """Update sentiment using centralized database manager"""
+def update_sentiments_in_db(db_manager, table_name, rows):
+    """
+    Bulk update sentiment keyed on link
+    
+    Args:
+        rows: List of {"link": ..., "sentiment": ...} dictionaries (optionally with "industry")
+    
+    Returns:
+        Dict mapping link to True if updated
+    """
     try:
-        # Use centralized database update method
-        result = db_manager.client.table(table_name).update({
-            "sentiment": sentiment
-        }).eq("link", link).execute()
-        
-        if result.data:
-            print(f"✅ Updated sentiment={sentiment} for link={link[:50]}...")
-            return True
-        else:
-            print(f"⚠️ No update for link={link[:50]}...")
-            return False
+        results = db_manager.update_many(table_name, "link", rows)
+        print(f"✅ Updated sentiment for {sum(1 for updated in results.values() if updated)}/{len(rows)} rows in {table_name}")
+        return results
     except Exception as e:
-        print(f"❌ Error updating sentiment: {e}")
-        return False
+        print(f"❌ Error bulk updating sentiment: {e}")
+        return {row["link"]: False for row in rows}
 
 # ====================== 5. Đọc dữ liệu từ DB ======================
-def get_data_from_db(db_manager, table_name):
-    """Get data using centralized database manager - only rows without sentiment"""
-    try:
-        # Only get records where sentiment is NULL or empty AND ai_summary is not empty
-        response = db_manager.client.table(table_name).select("link, ai_summary, date, sentiment").neq("ai_summary", "").or_("sentiment.is.null,sentiment.eq.").execute()
-        
-        if response.data:
-            df = pd.DataFrame(response.data)
-            # Filter out records that already have sentiment
-            df = df[(df['sentiment'].isna()) | (df['sentiment'] == '') | (df['sentiment'].isnull())]
-            print(f"📄 Loaded {len(df)} rows from {table_name} (only records without sentiment)")
-            return df
-        else:
-            print(f"⚠️ No data found in {table_name} without sentiment")
-            return pd.DataFrame()
-    except Exception as e:
-        print(f"❌ Error loading data from {table_name}: {e}")
-        return pd.DataFrame()
+def pending_sentiment_query(table_name):
+    """
+    Filters and columns selecting rows that still need a sentiment
+    
+    Returns:
+        (filters for iter_rows, columns)
+    """
+    # Only records where sentiment is NULL or empty AND ai_summary is not empty
+    columns = "id, link, ai_summary, date, sentiment"
+    if table_name == "General_News":
+        columns += ", industry"  # Filled in the same pass by the shared-encoder engine
+    return [("neq", "ai_summary", ""), ("or_", "sentiment.is.null,sentiment.eq.")], columns
 
 # ====================== 6. Dự đoán và cập nhật DB ======================
+def build_sentiment_rows(rows, sentiments, industries=None):
+    """
+    Update rows keyed on link for a chunk of predictions
+    
+    Args:
+        rows: Source rows with link (and industry for General_News)
+        sentiments: Predicted sentiment labels aligned with rows
+        industries: Predicted industry labels aligned with rows, or None
+    """
+    updates = [{"link": row["link"], "sentiment": sentiment} for row, sentiment in zip(rows, sentiments)]
+    if industries is not None:
+        # Only fill industry where the classification pipeline has not set it yet
+        for update, row, industry in zip(updates, rows, industries):
+            current = row.get("industry")
+            if industry and not (isinstance(current, str) and current.strip()):
+                update["industry"] = industry
+    return updates
+
 def predict_and_update_sentiment(db_manager, table_name):
-    """Predict sentiment and update database using centralized system"""
-    global model, tokenizer, id2label
+    """
+    Predict sentiment and update database using centralized system
+    
+    Rows are streamed through reader, inference and writer threads with
+    bounded queues (see StreamingSentimentPipeline), so reads and writes
+    overlap with inference and memory does not grow with the backlog.
+    
+    Returns:
+        Set of news dates whose rows were updated
+    """
+    from sentiment.streaming_sentiment import StreamingSentimentPipeline
     
-    # Load model if not already loaded
-    if model is None:
-        print("🔄 Loading sentiment analysis model...")
-        model, tokenizer, id2label = load_sentiment_model()
-        print("✅ Sentiment model loaded successfully")
+    print(f"🚀 Starting sentiment analysis for {table_name}...")
+    pipeline = StreamingSentimentPipeline(db_manager, table_name)
+    updated_dates = pipeline.run()
     
-    # Get data from database
-    df = get_data_from_db(db_manager, table_name)
-    if df.empty:
+    if not pipeline.stats["read"]:
         print(f"⚠️ No articles to process in {table_name}")
         return set()
-
-    updated_dates = set()
-    count = 0
-    start_time = None
-    successful_updates = 0
-
-    print(f"🚀 Starting sentiment analysis for {len(df)} articles in {table_name}...")
-
-    for i, row in tqdm(df.iterrows(), total=len(df), desc=f"Processing {table_name}"):
-        text = row["ai_summary"] if pd.notna(row["ai_summary"]) else ""
-        if not text.strip():
-            continue
-
-        if count == 0:
-            start_time = time.time()
-
-        # Tokenize and predict
-        inputs = tokenizer(
-            text,
-            return_tensors="pt",
-            padding=True,
-            truncation=True,
-            max_length=256
-        )
-
-        with torch.no_grad():
-            outputs = model(
-                input_ids=inputs["input_ids"],
-                attention_mask=inputs["attention_mask"]
-            )
-            predicted_class = torch.argmax(outputs, dim=1).item()
-
-        sentiment = id2label[predicted_class]
-        
-        # Update database
-        if update_sentiment_in_db(db_manager, table_name, row["link"], sentiment):
-            successful_updates += 1
-            
-            # Track updated dates
-            if "date" in row and pd.notna(row["date"]):
-                updated_dates.add(str(row["date"]))
-
-        count += 1
-        if count == 10:
-            elapsed = time.time() - start_time
-            print(f"📊 Performance: {elapsed:.2f}s for 10 articles ({elapsed/10:.3f}s/article)")
-
+    
     print(f"🎉 Sentiment analysis completed for {table_name}!")
-    print(f"📈 Successfully updated: {successful_updates}/{len(df)} articles")
+    print(f"📈 Successfully updated: {pipeline.stats['updated']}/{pipeline.stats['read']} articles")
     return updated_dates
 
 # ====================== 7. Sentiment Statistics Functions ======================
-def get_sentiment_stats_by_date(db_manager, news_table, dates=None):
-    """
-    Calculate sentiment statistics by date from news table
-    
-    Args:
-        db_manager: Database manager instance
-        news_table: Name of the news table (e.g., 'FPT_News')
-        dates: List of dates to process (if None, process all dates)
-    
-    Returns:
-        DataFrame with columns: date, Positive, Negative, Neutral
-    """
-    try:
-        # Build query - get ALL sentiment data from 2020 onwards only
-        query = db_manager.client.table(news_table).select("date, sentiment").neq("sentiment", "").neq("sentiment", None).gte("date", "2020-01-01")
-        
-        print(f"📅 Processing sentiment data from 2020-01-01 onwards only")
-        
-        # If specific dates provided, only process those dates
-        # If not, process all dates that have sentiment data (from 2020+)
-        if dates:
-            # Filter by specific dates but still maintain 2020+ filter
-            date_list = list(dates) if isinstance(dates, set) else dates
-            # Only include dates from 2020 onwards
-            date_list = [d for d in date_list if d >= "2020-01-01"]
-            if date_list:
-                query = query.in_("date", date_list)
-            else:
-                print(f"⚠️ No dates from 2020+ to process")
-                return pd.DataFrame()
-        
-        response = query.execute()
-        
-        if not response.data:
-            print(f"⚠️ No sentiment data found in {news_table}")
-            return pd.DataFrame()
-        
-        df = pd.DataFrame(response.data)
-        
-        # Group by date and count sentiments
-        sentiment_stats = df.groupby(['date', 'sentiment']).size().unstack(fill_value=0)
-        sentiment_stats = sentiment_stats.reset_index()
-        
-        # Ensure all sentiment columns exist
-        for sentiment in ['Positive', 'Negative', 'Neutral']:
-            if sentiment not in sentiment_stats.columns:
-                sentiment_stats[sentiment] = 0
-        
-        print(f"📊 Calculated sentiment stats for {len(sentiment_stats)} dates in {news_table}")
-        return sentiment_stats[['date', 'Positive', 'Negative', 'Neutral']]
-        
-    except Exception as e:
-        print(f"❌ Error calculating sentiment stats for {news_table}: {e}")
-        return pd.DataFrame()
-
 def ensure_sentiment_columns_not_null(db_manager, stock_table):
     """
     Ensure all sentiment columns are 0 instead of NULL in stock table
@@ -261,216 +271,6 @@ def ensure_all_stock_sentiment_not_null(db_manager):
     
     print(f"✅ All stock sentiment columns check completed")
 
-def update_stock_sentiment_stats(db_manager, stock_table, sentiment_stats_df, reset_before_update=False):
-    """
-    Update stock table with sentiment statistics (CUMULATIVE - adds to existing values)
-    
-    Args:
-        db_manager: Database manager instance
-        stock_table: Name of the stock table (e.g., 'FPT_Stock')
-        sentiment_stats_df: DataFrame with sentiment statistics
-        reset_before_update: If True, reset sentiment columns to 0 before updating (for recalculate mode)
-    """
-    if sentiment_stats_df.empty:
-        print(f"⚠️ No sentiment stats to update in {stock_table}")
-        return 0
-    
-    updated_count = 0
-    
-    if reset_before_update:
-        print(f"🔄 Resetting sentiment stats in {stock_table} before recalculation...")
-        try:
-            # Reset all sentiment columns to 0 for all rows
-            reset_result = db_manager.client.table(stock_table).update({
-                "Positive": 0,
-                "Negative": 0,
-                "Neutral": 0
-            }).neq("id", 0).execute()  # Use id instead of date for non-empty filter
-            print(f"✅ Reset sentiment stats for all dates in {stock_table}")
-        except Exception as e:
-            print(f"❌ Error resetting sentiment stats in {stock_table}: {e}")
-    
-    mode_text = "RESET & RECALCULATE" if reset_before_update else "CUMULATIVE"
-    print(f"🔄 Updating sentiment stats in {stock_table} ({mode_text} mode)...")
-    
-    for _, row in tqdm(sentiment_stats_df.iterrows(), total=len(sentiment_stats_df), desc=f"Updating {stock_table}"):
-        try:
-            if reset_before_update:
-                # In reset mode, directly set the values (no need to read current)
-                result = db_manager.client.table(stock_table).update({
-                    "Positive": int(row["Positive"]),
-                    "Negative": int(row["Negative"]), 
-                    "Neutral": int(row["Neutral"])
-                }).eq("date", row["date"]).execute()
-                
-                if result.data:
-                    updated_count += 1
-                    print(f"✅ Set {row['date']}: P={int(row['Positive'])}, N={int(row['Negative'])}, Neu={int(row['Neutral'])}")
-                else:
-                    print(f"⚠️ No stock data found for date {row['date']} in {stock_table}")
-            else:
-                # Cumulative mode: add to existing values
-                current_response = db_manager.client.table(stock_table).select("Positive, Negative, Neutral").eq("date", row["date"]).execute()
-                
-                if current_response.data and len(current_response.data) > 0:
-                    # Get current values (handle None values)
-                    current_data = current_response.data[0]
-                    current_positive = current_data.get("Positive") or 0
-                    current_negative = current_data.get("Negative") or 0  
-                    current_neutral = current_data.get("Neutral") or 0
-                    
-                    # Calculate new cumulative values
-                    new_positive = current_positive + int(row["Positive"])
-                    new_negative = current_negative + int(row["Negative"])
-                    new_neutral = current_neutral + int(row["Neutral"])
-                    
-                    print(f"📊 {row['date']}: Current P={current_positive}, N={current_negative}, Neu={current_neutral}")
-                    print(f"📈 {row['date']}: Adding P={int(row['Positive'])}, N={int(row['Negative'])}, Neu={int(row['Neutral'])}")
-                    
-                    # Update with cumulative values
-                    result = db_manager.client.table(stock_table).update({
-                        "Positive": new_positive,
-                        "Negative": new_negative, 
-                        "Neutral": new_neutral
-                    }).eq("date", row["date"]).execute()
-                    
-                    if result.data:
-                        updated_count += 1
-                        print(f"✅ Updated {row['date']}: P={new_positive}, N={new_negative}, Neu={new_neutral}")
-                    else:
-                        print(f"❌ Failed to update {row['date']} in {stock_table}")
-                else:
-                    print(f"⚠️ No stock data found for date {row['date']} in {stock_table}")
-                
-        except Exception as e:
-            print(f"❌ Error updating {row['date']} in {stock_table}: {e}")
-    
-    print(f"📈 Updated sentiment stats for {updated_count}/{len(sentiment_stats_df)} dates in {stock_table}")
-    return updated_count
-
-def aggregate_sentiment_for_trading_days(db_manager, stock_table, sentiment_stats_df):
-    """
-    Aggregate sentiment from non-trading days to the next trading day
-    IMPORTANT: Always based on stock table dates for accurate trading day identification
-    
-    Args:
-        db_manager: Database manager instance
-        stock_table: Name of the stock table
-        sentiment_stats_df: DataFrame with sentiment statistics by date
-    
-    Returns:
-        DataFrame with aggregated sentiment stats for trading days only
-    """
-    if sentiment_stats_df.empty:
-        return pd.DataFrame()
-    
-    print(f"🔄 Aggregating sentiment for non-trading days...")
-    
-    # Get all trading days from stock table (days that have stock data) - SORTED BY DATE DESC to get latest first
-    try:
-        # Query latest dates first, then reverse to get chronological order
-        response = db_manager.client.table(stock_table).select("date").order("date", desc=True).execute()
-        if not response.data:
-            print(f"⚠️ No trading days found in {stock_table}")
-            return pd.DataFrame()
-        
-        trading_days_df = pd.DataFrame(response.data)
-        trading_days_df['date'] = pd.to_datetime(trading_days_df['date'])
-        trading_days_df = trading_days_df.sort_values('date')  # Sort chronologically (oldest first)
-        trading_days = set(trading_days_df['date'].dt.strftime('%Y-%m-%d'))
-        trading_days_list = trading_days_df['date'].dt.strftime('%Y-%m-%d').tolist()
-        
-        print(f"📅 Found {len(trading_days)} trading days in {stock_table}")
-        print(f"📅 Trading day range: {trading_days_list[0]} to {trading_days_list[-1]}")
-        
-    except Exception as e:
-        print(f"❌ Error getting trading days from {stock_table}: {e}")
-        return pd.DataFrame()
-    
-    # Convert sentiment dates to datetime for sorting
-    sentiment_stats_df = sentiment_stats_df.copy()
-    sentiment_stats_df['date'] = pd.to_datetime(sentiment_stats_df['date'])
-    sentiment_stats_df = sentiment_stats_df.sort_values('date')
-    
-    aggregated_data = []
-    pending_sentiment = {'Positive': 0, 'Negative': 0, 'Neutral': 0}
-    
-    # Process each sentiment date and find the next available trading day
-    for _, row in sentiment_stats_df.iterrows():
-        date_str = row['date'].strftime('%Y-%m-%d')
-        sentiment_date = row['date']
-        
-        # Add current day sentiment to pending
-        pending_sentiment['Positive'] += int(row['Positive'])
-        pending_sentiment['Negative'] += int(row['Negative']) 
-        pending_sentiment['Neutral'] += int(row['Neutral'])
-        
-        # If this is a trading day, aggregate all pending sentiment
-        if date_str in trading_days:
-            aggregated_data.append({
-                'date': date_str,
-                'Positive': pending_sentiment['Positive'],
-                'Negative': pending_sentiment['Negative'],
-                'Neutral': pending_sentiment['Neutral']
-            })
-            
-            print(f"📈 Aggregated to trading day {date_str}: P={pending_sentiment['Positive']}, N={pending_sentiment['Negative']}, Neu={pending_sentiment['Neutral']}")
-            
-            # Reset pending sentiment
-            pending_sentiment = {'Positive': 0, 'Negative': 0, 'Neutral': 0}
-        else:
-            # Find next trading day after this sentiment date
-            next_trading_day = None
-            for trading_day_str in trading_days_list:
-                trading_day_date = pd.to_datetime(trading_day_str)
-                if trading_day_date > sentiment_date:
-                    next_trading_day = trading_day_str
-                    break
-            
-            if next_trading_day:
-                print(f"📅 Non-trading day {date_str}: P={int(row['Positive'])}, N={int(row['Negative'])}, Neu={int(row['Neutral'])} (pending for {next_trading_day})")
-            else:
-                print(f"📅 Non-trading day {date_str}: P={int(row['Positive'])}, N={int(row['Negative'])}, Neu={int(row['Neutral'])} (no future trading day)")
-    
-    # Handle any remaining pending sentiment for dates beyond the last trading day
-    if any(pending_sentiment.values()):
-        # Find the last trading day to assign remaining sentiment
-        if trading_days_list:
-            last_trading_day = trading_days_list[-1]
-            
-            # Check if we already have data for the last trading day, if so, add to it
-            existing_data = None
-            for i, data in enumerate(aggregated_data):
-                if data['date'] == last_trading_day:
-                    existing_data = i
-                    break
-            
-            if existing_data is not None:
-                # Add to existing last trading day
-                aggregated_data[existing_data]['Positive'] += pending_sentiment['Positive']
-                aggregated_data[existing_data]['Negative'] += pending_sentiment['Negative']
-                aggregated_data[existing_data]['Neutral'] += pending_sentiment['Neutral']
-                print(f"📈 Added remaining sentiment to last trading day {last_trading_day}: P={aggregated_data[existing_data]['Positive']}, N={aggregated_data[existing_data]['Negative']}, Neu={aggregated_data[existing_data]['Neutral']}")
-            else:
-                # Create new entry for last trading day
-                aggregated_data.append({
-                    'date': last_trading_day,
-                    'Positive': pending_sentiment['Positive'],
-                    'Negative': pending_sentiment['Negative'],
-                    'Neutral': pending_sentiment['Neutral']
-                })
-                print(f"📈 Assigned remaining sentiment to last trading day {last_trading_day}: P={pending_sentiment['Positive']}, N={pending_sentiment['Negative']}, Neu={pending_sentiment['Neutral']}")
-        else:
-            print(f"⚠️ Remaining pending sentiment will be discarded (no trading days found)")
-    
-    if not aggregated_data:
-        print(f"⚠️ No sentiment data aligned with trading days")
-        return pd.DataFrame()
-    
-    result_df = pd.DataFrame(aggregated_data)
-    print(f"✅ Aggregated sentiment for {len(result_df)} trading days")
-    return result_df
-
 def process_sentiment_to_stock(db_manager, stock_code, updated_dates=None, recalculate_all=False):
     """
     Process sentiment from news table and update corresponding stock table
@@ -488,40 +288,58 @@ def process_sentiment_to_stock(db_manager, stock_code, updated_dates=None, recal
     print(f"📋 News table: {news_table}")
     print(f"📈 Stock table: {stock_table}")
     
-    # First, ensure all sentiment columns are 0 instead of NULL
-    ensure_sentiment_columns_not_null(db_manager, stock_table)
-    
     # If recalculate_all or no updated_dates, process all dates
     dates_to_process = None if recalculate_all or not updated_dates else updated_dates
     
     if dates_to_process:
         print(f"🎯 Processing specific dates: {len(dates_to_process)} dates")
+        
+        # First, ensure all sentiment columns are 0 instead of NULL
+        ensure_sentiment_columns_not_null(db_manager, stock_table)
+        
+        # Recount the trading-day windows touched by these dates and set them in one bulk write
+        updated_count = refresh_stock_sentiment(db_manager, stock_code, dates_to_process)
     else:
         print(f"🔄 Recalculating sentiment stats for all dates (2020+ only)")
+        
+        # Full recompute in memory; only rows whose counts change (or are NULL) are written
+        updated_count = recompute_stock_sentiment(db_manager, stock_code)
     
-    # Get sentiment statistics by date (2020+ only)
-    sentiment_stats = get_sentiment_stats_by_date(db_manager, news_table, dates_to_process)
-    
-    if sentiment_stats.empty:
-        print(f"⚠️ No sentiment statistics to process for {stock_code}")
-        return 0
+    print(f"✅ Completed sentiment processing for {stock_code}")
+    return updated_count
+
+# ====================== 8. Main Functions ======================
+def predict_tables(db_manager, table_names, workers=None):
+    """
+    Phase 1: predict sentiment for each table, sequentially or in a worker pool
     
-    # Aggregate sentiment for non-trading days to next trading day
-    aggregated_sentiment_stats = aggregate_sentiment_for_trading_days(db_manager, stock_table, sentiment_stats)
+    Args:
+        db_manager: Database manager instance (used in sequential mode)
+        table_names: News tables to process
+        workers: Worker processes (default: SENTIMENT_WORKERS; 1 = sequential in this process)
     
-    if aggregated_sentiment_stats.empty:
-        print(f"⚠️ No aggregated sentiment statistics to update for {stock_code}")
-        return 0
+    Returns:
+        Dict mapping table name -> set of updated dates
+    """
+    from sentiment.parallel_sentiment import SENTIMENT_WORKERS, predict_tables_parallel
     
-    # Update stock table with aggregated sentiment stats
-    reset_mode = recalculate_all  # Reset before update when recalculating all
-    updated_count = update_stock_sentiment_stats(db_manager, stock_table, aggregated_sentiment_stats, reset_mode)
+    workers = workers or SENTIMENT_WORKERS
+    if workers > 1 and len(table_names) > 1:
+        return predict_tables_parallel(table_names, workers)
     
-    print(f"✅ Completed sentiment processing for {stock_code}")
-    return updated_count
+    results = {}
+    for table_name in table_names:
+        print(f"\n📊 Processing table: {table_name}")
+        try:
+            results[table_name] = predict_and_update_sentiment(db_manager, table_name)
+            print(f"✅ Completed processing {table_name}")
+        except Exception as e:
+            print(f"❌ Error processing {table_name}: {e}")
+            results[table_name] = set()
+    return results
 
-# ====================== 8. Main Functions ======================
-def run_sentiment_analysis_pipeline(table_names=None, update_stock_tables=True, recalculate_all_stock=False):
+def run_sentiment_analysis_pipeline(table_names=None, update_stock_tables=True, recalculate_all_stock=False,
+                                    workers=None):
     """
     Run sentiment analysis pipeline for specified tables
     
@@ -529,6 +347,7 @@ def run_sentiment_analysis_pipeline(table_names=None, update_stock_tables=True,
         table_names: List of table names to process. If None, process all news tables.
         update_stock_tables: Whether to update stock tables with sentiment statistics
         recalculate_all_stock: If True, recalculate sentiment stats for all dates in stock tables
+        workers: Worker processes for the prediction phase (default: SENTIMENT_WORKERS)
     """
     if table_names is None:
         # Default: process all stock news tables
@@ -544,20 +363,13 @@ def run_sentiment_analysis_pipeline(table_names=None, update_stock_tables=True,
     stock_updates = {}
     
     # Phase 1: Predict sentiment and update news tables (only for records without sentiment)
-    for table_name in table_names:
-        print(f"\n📊 Processing table: {table_name}")
-        try:
-            updated_dates = predict_and_update_sentiment(db_manager, table_name)
-            total_updated_dates.update(updated_dates)
-            
-            # Store updated dates for stock processing
-            if table_name.endswith("_News") and table_name != "General_News":
-                stock_code = table_name.replace("_News", "")
-                stock_updates[stock_code] = updated_dates
-            
-            print(f"✅ Completed processing {table_name}")
-        except Exception as e:
-            print(f"❌ Error processing {table_name}: {e}")
+    for table_name, updated_dates in predict_tables(db_manager, table_names, workers).items():
+        total_updated_dates.update(updated_dates)
+        
+        # Store updated dates for stock processing
+        if table_name.endswith("_News") and table_name != "General_News":
+            stock_code = table_name.replace("_News", "")
+            stock_updates[stock_code] = updated_dates
     
     # Phase 2: Update stock tables with sentiment statistics
     if update_stock_tables:
@@ -0,0 +1,185 @@
+"""
+Stock Sentiment Writer
+Idempotent per-trading-day sentiment counts for the *_Stock tables
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from sentiment.trading_calendar import TradingCalendar, SENTIMENT_COLUMNS, get_trading_calendar
+
+# News before this date is not counted
+SENTIMENT_START_DATE = "2020-01-01"
+
+
+def count_news_sentiment(db_manager, news_table: str, after: Optional[str] = None,
+                         until: Optional[str] = None) -> pd.DataFrame:
+    """
+    Count sentiment labels per news date in (after, until]
+
+    Args:
+        db_manager: Database manager instance
+        news_table: Name of the news table (e.g., 'FPT_News')
+        after: Exclusive lower date bound (None: from SENTIMENT_START_DATE)
+        until: Inclusive upper date bound (None: no upper bound)
+
+    Returns:
+        DataFrame with columns: date, Positive, Negative, Neutral
+    """
+    filters = [("gte", "date", SENTIMENT_START_DATE), ("in_", "sentiment", SENTIMENT_COLUMNS)]
+    if after:
+        filters.append(("gt", "date", after))
+    if until:
+        filters.append(("lte", "date", until))
+
+    rows = list(db_manager.iter_rows(news_table, filters, "date, sentiment"))
+    if not rows:
+        return pd.DataFrame(columns=["date"] + SENTIMENT_COLUMNS)
+
+    news_df = pd.DataFrame(rows)
+    counts = pd.crosstab(news_df["date"], news_df["sentiment"])
+    counts = counts.reindex(columns=SENTIMENT_COLUMNS, fill_value=0).reset_index()
+    counts.columns.name = None
+    return counts
+
+
+def write_stock_sentiment(db_manager, stock_table: str, stats_df: pd.DataFrame) -> int:
+    """
+    Set sentiment counts of stock rows to the given values, one bulk update keyed on date
+
+    The values are written as they are (not added), so repeating a write is harmless.
+
+    Returns:
+        Number of stock rows updated
+    """
+    if stats_df.empty:
+        return 0
+
+    rows = [
+        {"date": str(row["date"]), **{col: int(row[col]) for col in SENTIMENT_COLUMNS}}
+        for row in stats_df.to_dict("records")
+    ]
+    results = db_manager.update_many(stock_table, "date", rows)
+
+    missing = [key for key, updated in results.items() if not updated]
+    if missing:
+        print(f"⚠️ No stock row for {len(missing)} dates in {stock_table}: {', '.join(sorted(missing)[:5])}")
+    return len(results) - len(missing)
+
+
+def refresh_stock_sentiment(db_manager, stock_code: str, news_dates: Optional[Iterable[str]] = None,
+                            calendar: Optional[TradingCalendar] = None) -> int:
+    """
+    Recompute and write sentiment counts of the trading days touched by news_dates
+
+    A trading day holds the news dated after the previous trading day up to and
+    including itself; the last trading day also holds everything after it. The
+    affected windows are counted again from the news table and written as
+    absolute values, so a retried or repeated run gives the same result.
+
+    Args:
+        db_manager: Database manager instance
+        stock_code: Stock code (e.g., 'FPT')
+        news_dates: News dates ('YYYY-MM-DD') that changed; None recomputes every trading day
+        calendar: Trading calendar of the stock table (default: the shared cached one)
+
+    Returns:
+        Number of stock rows updated
+    """
+    news_table = f"{stock_code}_News"
+    stock_table = f"{stock_code}_Stock"
+
+    try:
+        calendar = calendar or get_trading_calendar(db_manager, stock_table, refresh=True)
+        if not len(calendar):
+            print(f"⚠️ No trading days found in {stock_table}")
+            return 0
+
+        if news_dates is None:
+            affected = calendar.days
+        else:
+            news_dates = [d for d in set(news_dates) if d]
+            if not news_dates:
+                return 0
+            affected = np.unique(calendar.next_trading_day(news_dates))
+
+        # Read only the news inside the affected windows
+        first_index = np.searchsorted(calendar.days, affected[0])
+        after = str(calendar.days[first_index - 1]) if first_index > 0 else None
+        until = None if affected[-1] == calendar.days[-1] else str(affected[-1])
+        print(f"🎯 Recomputing sentiment for {len(affected)} trading days in {stock_table} "
+              f"(news {after or 'start'} → {until or 'latest'})")
+
+        news_stats = count_news_sentiment(db_manager, news_table, after, until)
+        stats = calendar.aggregate(news_stats, SENTIMENT_COLUMNS)
+
+        # Affected days without any news are written as 0
+        affected_days = [str(day) for day in affected]
+        stats = (stats.set_index("date")
+                      .reindex(affected_days, fill_value=0)
+                      .rename_axis("date")
+                      .reset_index())
+
+        updated_count = write_stock_sentiment(db_manager, stock_table, stats)
+        print(f"📈 Set sentiment stats for {updated_count}/{len(stats)} trading days in {stock_table}")
+        return updated_count
+
+    except Exception as e:
+        print(f"❌ Error refreshing sentiment stats for {stock_table}: {e}")
+        return 0
+
+
+def recompute_stock_sentiment(db_manager, stock_code: str) -> int:
+    """
+    Recompute the sentiment counts of every trading day and write only the rows that change
+
+    Reads the stock dates with their current counts and the (date, sentiment)
+    pairs of the news table once each, aggregates every trading-day window in
+    memory and compares with the stored counts. NULL counts always count as
+    changed, so no separate reset is needed.
+
+    Args:
+        db_manager: Database manager instance
+        stock_code: Stock code (e.g., 'FPT')
+
+    Returns:
+        Number of stock rows updated
+    """
+    news_table = f"{stock_code}_News"
+    stock_table = f"{stock_code}_Stock"
+
+    try:
+        stock_rows = list(db_manager.iter_rows(stock_table, None, ", ".join(["date"] + SENTIMENT_COLUMNS)))
+        if not stock_rows:
+            print(f"⚠️ No trading days found in {stock_table}")
+            return 0
+
+        current = pd.DataFrame(stock_rows).drop(columns="id", errors="ignore")
+        current["date"] = pd.to_datetime(current["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+        current = current.dropna(subset=["date"]).drop_duplicates("date").set_index("date")
+        # NULL (or unreadable) counts never match a computed count
+        current = current.reindex(columns=SENTIMENT_COLUMNS).apply(pd.to_numeric, errors="coerce").fillna(-1)
+
+        calendar = TradingCalendar(current.index)
+        news_stats = count_news_sentiment(db_manager, news_table)
+        stats = (calendar.aggregate(news_stats, SENTIMENT_COLUMNS)
+                         .set_index("date")
+                         .reindex(calendar.day_strings(), fill_value=0))
+
+        changed = (stats[SENTIMENT_COLUMNS].values != current.loc[stats.index, SENTIMENT_COLUMNS].values).any(axis=1)
+        print(f"🧮 Recomputed {len(stats)} trading days of {stock_table} from "
+              f"{int(news_stats[SENTIMENT_COLUMNS].values.sum()) if not news_stats.empty else 0} articles: "
+              f"{int(changed.sum())} rows changed")
+
+        if not changed.any():
+            return 0
+        updated_count = write_stock_sentiment(db_manager, stock_table,
+                                              stats[changed].rename_axis("date").reset_index())
+        print(f"📈 Set sentiment stats for {updated_count}/{int(changed.sum())} changed trading days in {stock_table}")
+        return updated_count
+
+    except Exception as e:
+        print(f"❌ Error recomputing sentiment stats for {stock_table}: {e}")
+        return 0
@@ -0,0 +1,183 @@
+"""
+Streaming Sentiment Pipeline
+Reader, inference and writer stages connected by bounded queues
+
+    reader thread     iter_rows pages -> chunks of rows without sentiment
+    inference thread  predict_with_cache per chunk
+    writer thread     update_many per chunk, collecting the updated dates
+
+Each stage runs on its own thread, so database round trips of the reader and
+writer overlap with model compute (torch releases the GIL). The queues hold at
+most DatabaseConfig.STREAM_QUEUE_SIZE chunks, so memory stays bounded by a few
+chunks whatever the backlog size. The reader pages by id, so rows updated
+behind its cursor do not shift later pages.
+"""
+
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Set
+
+from database import DatabaseConfig
+
+_DONE = object()
+
+
+class _StageFailed(Exception):
+    """Raised in a stage when another stage has failed"""
+
+
+class StreamingSentimentPipeline:
+    """Predict and store sentiment for one news table, chunk by chunk"""
+
+    def __init__(self, db_manager, table_name: str, chunk_size: Optional[int] = None,
+                 queue_size: Optional[int] = None):
+        """
+        Args:
+            db_manager: SupabaseManager used by the reader and writer
+            table_name: News table to process
+            chunk_size: Rows per chunk (default: DatabaseConfig.UPDATE_CHUNK_SIZE)
+            queue_size: Chunks buffered between stages (default: DatabaseConfig.STREAM_QUEUE_SIZE)
+        """
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.chunk_size = chunk_size or DatabaseConfig.UPDATE_CHUNK_SIZE
+        queue_size = queue_size or DatabaseConfig.STREAM_QUEUE_SIZE
+        self._rows_queue = queue.Queue(maxsize=queue_size)
+        self._updates_queue = queue.Queue(maxsize=queue_size)
+        self._failed = threading.Event()
+        self._errors = []
+
+        self.updated_dates: Set[str] = set()
+        self.stats = {"read": 0, "predicted": 0, "updated": 0,
+                      "read_seconds": 0.0, "inference_seconds": 0.0, "write_seconds": 0.0}
+
+    # ============ STAGES ============
+
+    def _put(self, target: queue.Queue, item):
+        """Blocking put that gives up once another stage has failed"""
+        while True:
+            if self._failed.is_set():
+                raise _StageFailed()
+            try:
+                target.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, source: queue.Queue):
+        while True:
+            if self._failed.is_set():
+                raise _StageFailed()
+            try:
+                return source.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def _read_chunks(self) -> Iterator[List[Dict]]:
+        from sentiment.predict_sentiment_db import pending_sentiment_query
+
+        filters, columns = pending_sentiment_query(self.table_name)
+        chunk = []
+        for row in self.db_manager.iter_rows(self.table_name, filters, columns):
+            if row.get("sentiment") or not str(row.get("ai_summary") or "").strip():
+                continue
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _reader(self):
+        start = time.time()
+        for chunk in self._read_chunks():
+            self.stats["read"] += len(chunk)
+            self.stats["read_seconds"] += time.time() - start
+            self._put(self._rows_queue, chunk)
+            start = time.time()
+        self.stats["read_seconds"] += time.time() - start
+
+    def _inference(self):
+        from sentiment.predict_sentiment_db import predict_with_cache, build_sentiment_rows
+
+        while True:
+            chunk = self._get(self._rows_queue)
+            if chunk is _DONE:
+                break
+            start = time.time()
+            texts = [row["ai_summary"] for row in chunk]
+            sentiments, industries = predict_with_cache(texts, with_industry="industry" in chunk[0])
+            updates = build_sentiment_rows(chunk, sentiments, industries)
+            self.stats["predicted"] += len(chunk)
+            self.stats["inference_seconds"] += time.time() - start
+            self._put(self._updates_queue, (chunk, updates))
+
+    def _writer(self):
+        from sentiment.predict_sentiment_db import update_sentiments_in_db
+
+        while True:
+            item = self._get(self._updates_queue)
+            if item is _DONE:
+                break
+            chunk, updates = item
+            start = time.time()
+            results = update_sentiments_in_db(self.db_manager, self.table_name, updates)
+            row_dates = {row["link"]: str(row["date"]) for row in chunk if row.get("date")}
+            for link, updated in results.items():
+                if updated:
+                    self.stats["updated"] += 1
+                    if link in row_dates:
+                        self.updated_dates.add(row_dates[link])
+            self.stats["write_seconds"] += time.time() - start
+
+    def _stage(self, target, downstream: Optional[queue.Queue]):
+        """Run a stage, then signal the next stage; any error stops every stage"""
+        def run():
+            try:
+                target()
+            except _StageFailed:
+                return
+            except Exception as e:
+                self._errors.append(e)
+                self._failed.set()
+                return
+            if downstream is not None:
+                try:
+                    self._put(downstream, _DONE)
+                except _StageFailed:
+                    pass
+        return threading.Thread(target=run, name=f"sentiment-{target.__name__.strip('_')}", daemon=True)
+
+    # ============ RUN ============
+
+    def run(self) -> Set[str]:
+        """
+        Stream the table through the three stages
+
+        Returns:
+            Set of news dates whose rows were updated
+
+        Raises:
+            The first exception raised by any stage
+        """
+        start = time.time()
+        threads = [
+            self._stage(self._reader, self._rows_queue),
+            self._stage(self._inference, self._updates_queue),
+            self._stage(self._writer, None)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self._errors:
+            raise self._errors[0]
+
+        elapsed = time.time() - start
+        stats = self.stats
+        if stats["read"]:
+            print(f"📊 Streamed {stats['read']} articles of {self.table_name} in {elapsed:.1f}s "
+                  f"({stats['read'] / elapsed:.1f} articles/s): read {stats['read_seconds']:.1f}s, "
+                  f"inference {stats['inference_seconds']:.1f}s, write {stats['write_seconds']:.1f}s")
+        return self.updated_dates
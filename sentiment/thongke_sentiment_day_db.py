@@ -1,7 +1,12 @@
+import os
+import sys
 import pandas as pd
 import psycopg2
 from sqlalchemy import create_engine
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sentiment.trading_calendar import TradingCalendar
+
 # ====================== KẾT NỐI DB ======================
 def get_engine():
     user = "postgres"
@@ -78,33 +83,17 @@ def get_stock_data_by_dates(engine, stock_table, dates):
 # ====================== XỬ LÝ MERGE & CỘNG DỒN ======================
 def merge_sentiment_with_stock(news_df, stock_df):
     merged = stock_df.copy()
-    merged["Positive"] = 0
-    merged["Neutral"] = 0
-    merged["Negative"] = 0
-
-    news_dict = news_df.set_index("date").to_dict(orient="index")
-
-    prev_day = None
-    buffer_pos, buffer_neu, buffer_neg = 0, 0, 0
-
-    for i, row in merged.iterrows():
-        day = row["date"]
-
-        # cộng dồn tất cả tin tức xảy ra **trong khoảng (prev_day, day]**
-        for news_day, values in news_dict.items():
-            if (prev_day is None or news_day > prev_day) and news_day <= day:
-                buffer_pos += values["Positive"]
-                buffer_neu += values["Neutral"]
-                buffer_neg += values["Negative"]
-
-        merged.loc[i, "Positive"] = buffer_pos
-        merged.loc[i, "Neutral"] = buffer_neu
-        merged.loc[i, "Negative"] = buffer_neg
+    columns = ["Positive", "Neutral", "Negative"]
 
-        # reset sau khi gán vào ngày stock
-        buffer_pos, buffer_neu, buffer_neg = 0, 0, 0
-        prev_day = day
+    # cộng dồn tất cả tin tức xảy ra **trong khoảng (prev_day, day]** vào ngày stock "day";
+    # tin tức sau ngày stock cuối cùng bị bỏ qua
+    calendar = TradingCalendar(stock_df["date"])
+    sums = calendar.aggregate(news_df, columns, after_last="drop")
+    sums["date"] = pd.to_datetime(sums["date"]).dt.date
 
+    merged = merged.drop(columns=[c for c in columns if c in merged.columns])
+    merged = merged.merge(sums, on="date", how="left")
+    merged[columns] = merged[columns].fillna(0).astype(int)
     return merged
 
 # ====================== RESET VỀ 0 ======================
@@ -0,0 +1,247 @@
+"""
+Trading Calendar
+Vectorized mapping of news dates to stock trading days
+"""
+
+import os
+import hashlib
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from database import DatabaseConfig
+
+SENTIMENT_COLUMNS = ["Positive", "Negative", "Neutral"]
+
+
+class TradingCalendar:
+    """
+    Sorted array of trading days with binary-search date alignment
+
+    A news date belongs to the first trading day on or after it. Dates after
+    the last trading day go to the last trading day ("last") or are dropped
+    ("drop").
+    """
+
+    def __init__(self, trading_days: Iterable = ()):
+        self.days = np.array([], dtype="datetime64[D]")
+        self.extend(trading_days)
+
+    @classmethod
+    def from_stock_table(cls, db_manager, stock_table: str) -> "TradingCalendar":
+        """Load every date of a stock table with one paged read"""
+        calendar = cls()
+        calendar.refresh(db_manager, stock_table)
+        return calendar
+
+    def extend(self, trading_days: Iterable) -> int:
+        """Add trading days; returns how many were new"""
+        days = pd.to_datetime(pd.Series(list(trading_days), dtype="object"), errors="coerce").dropna()
+        before = len(self.days)
+        self.days = np.union1d(self.days, days.values.astype("datetime64[D]"))
+        return len(self.days) - before
+
+    def refresh(self, db_manager, stock_table: str) -> int:
+        """
+        Read only the stock dates newer than the last known trading day
+
+        Returns:
+            int: Number of trading days added
+        """
+        filters = [("gt", "date", self.last_day)] if len(self.days) else None
+        return self.extend(row["date"] for row in db_manager.iter_rows(stock_table, filters, "date"))
+
+    # ============ PERSISTENCE ============
+
+    def save(self, path: str) -> bool:
+        """Write the trading days to a .npy file"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, self.days)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            print(f"❌ Error saving trading calendar {path}: {e}")
+            return False
+
+    @classmethod
+    def load(cls, path: str) -> Optional["TradingCalendar"]:
+        """Read trading days saved by a previous run, None if unavailable"""
+        if not os.path.exists(path):
+            return None
+        try:
+            calendar = cls()
+            calendar.days = np.unique(np.load(path).astype("datetime64[D]"))
+            return calendar
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable trading calendar {path}: {e}")
+            return None
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def first_day(self) -> str:
+        return str(self.days[0]) if len(self.days) else None
+
+    @property
+    def last_day(self) -> str:
+        return str(self.days[-1]) if len(self.days) else None
+
+    def day_strings(self) -> List[str]:
+        """Trading days as 'YYYY-MM-DD', oldest first"""
+        return [str(day) for day in self.days]
+
+    @staticmethod
+    def _to_days(dates) -> np.ndarray:
+        return pd.to_datetime(pd.Series(list(dates), dtype="object")).values.astype("datetime64[D]")
+
+    def is_trading_day(self, dates) -> np.ndarray:
+        """Boolean array: which dates are trading days"""
+        dates = self._to_days(dates)
+        index = np.searchsorted(self.days, dates, side="left")
+        inside = index < len(self.days)
+        result = np.zeros(len(dates), dtype=bool)
+        result[inside] = self.days[index[inside]] == dates[inside]
+        return result
+
+    def next_trading_day(self, dates, after_last: str = "last") -> np.ndarray:
+        """
+        Map dates to the first trading day on or after each of them
+
+        Args:
+            dates: Date-like values
+            after_last: "last" to map dates beyond the calendar to the last
+                        trading day, "drop" to map them to NaT
+
+        Returns:
+            datetime64[D] array aligned with dates
+        """
+        dates = self._to_days(dates)
+        if not len(self.days):
+            return np.full(len(dates), np.datetime64("NaT"), dtype="datetime64[D]")
+
+        index = np.searchsorted(self.days, dates, side="left")
+        beyond = index >= len(self.days)
+        result = self.days[np.minimum(index, len(self.days) - 1)]
+        if after_last == "drop":
+            result = result.copy()
+            result[beyond] = np.datetime64("NaT")
+        return result
+
+    def aggregate(self, stats_df: pd.DataFrame, value_columns: List[str] = None,
+                  date_column: str = "date", after_last: str = "last") -> pd.DataFrame:
+        """
+        Sum per-date counts onto their trading days
+
+        Args:
+            stats_df: DataFrame with a date column and count columns
+            value_columns: Columns to sum (default: Positive/Negative/Neutral)
+            date_column: Name of the date column
+            after_last: See next_trading_day
+
+        Returns:
+            DataFrame with 'date' as 'YYYY-MM-DD' and summed integer columns, oldest first
+        """
+        value_columns = value_columns or SENTIMENT_COLUMNS
+        if stats_df.empty or not len(self.days):
+            return pd.DataFrame(columns=["date"] + value_columns)
+
+        aligned = pd.DataFrame({
+            "date": self.next_trading_day(stats_df[date_column], after_last),
+            **{col: pd.to_numeric(stats_df[col], errors="coerce").fillna(0).astype(int).values for col in value_columns}
+        }).dropna(subset=["date"])
+
+        result = aligned.groupby("date", sort=True)[value_columns].sum().reset_index()
+        result["date"] = pd.to_datetime(result["date"]).dt.strftime("%Y-%m-%d")
+        return result
+
+    def map_dates(self, dates: Iterable[str], after_last: str = "last") -> Dict[str, List[str]]:
+        """
+        Group dates by the trading day they belong to
+
+        Returns:
+            Dict mapping 'YYYY-MM-DD' trading day -> sorted list of input dates
+        """
+        dates = sorted(set(dates))
+        if not dates:
+            return {}
+
+        mapping = {}
+        for date, trading_day in zip(dates, self.next_trading_day(dates, after_last)):
+            if not np.isnat(trading_day):
+                mapping.setdefault(str(trading_day), []).append(date)
+        return mapping
+
+
+# ============ SHARED CACHE ============
+
+_calendars: Dict[Tuple[str, str], TradingCalendar] = {}
+_calendars_lock = threading.Lock()
+
+
+def database_identity(db_manager) -> str:
+    """Backend and location of the database behind db_manager (SQLite file or Supabase URL)"""
+    config = getattr(db_manager, "config", DatabaseConfig)
+    if config.DATABASE_BACKEND == "sqlite":
+        return f"sqlite:{os.path.abspath(config.LOCAL_DATABASE_PATH)}"
+    return f"supabase:{config.SUPABASE_URL}"
+
+
+def _cache_path(identity: str, stock_table: str) -> Optional[str]:
+    """Disk cache per database, so different backends or projects never share trading days"""
+    cache_dir = DatabaseConfig.TRADING_CALENDAR_DIR
+    if not cache_dir:
+        return None
+    digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{stock_table}.{digest}.npy")
+
+
+def get_trading_calendar(db_manager, stock_table: str, refresh: bool = False,
+                         full_reload: bool = False) -> TradingCalendar:
+    """
+    Shared trading calendar of a stock table
+
+    Calendars are kept per database (backend plus SQLite path or Supabase
+    URL), in memory and on disk. The first call in a process starts from the disk cache (if any) and reads
+    only the stock dates newer than its last day; later calls return the same
+    object without a request unless refresh is set.
+
+    Args:
+        db_manager: Database manager instance
+        stock_table: Name of the stock table (e.g., 'FPT_Stock')
+        refresh: Fetch dates added since the last refresh
+        full_reload: Discard the cache and read every date again
+            (needed only after stock rows were deleted or backdated)
+
+    Returns:
+        TradingCalendar
+    """
+    identity = database_identity(db_manager)
+    with _calendars_lock:
+        calendar = None if full_reload else _calendars.get((identity, stock_table))
+        if calendar is not None and not refresh:
+            return calendar
+
+        path = _cache_path(identity, stock_table)
+        if calendar is None:
+            calendar = (None if full_reload or not path else TradingCalendar.load(path)) or TradingCalendar()
+        cached = len(calendar)
+
+        added = calendar.refresh(db_manager, stock_table)
+        if path and (added or not os.path.exists(path)):
+            calendar.save(path)
+
+        _calendars[(identity, stock_table)] = calendar
+        print(f"📅 Trading calendar {stock_table}: {cached} cached + {added} new days")
+        return calendar
+
+
+def clear_trading_calendars():
+    """Drop in-memory calendars (disk caches are kept)"""
+    with _calendars_lock:
+        _calendars.clear()
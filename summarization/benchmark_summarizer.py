@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Summarizer Benchmark
+Generation modes of NewsSummarizer on a mixed-length Vietnamese corpus
+
+Modes:
+    fixed       batches in input order padded to MAX_INPUT_LENGTH (previous behaviour)
+    dynamic     length-sorted batches padded to their longest member, fixed batch size
+    sequential  one article per generate call (previous CPU fallback)
+    adaptive    length-sorted batches packed under the token budget with the adaptive size cap
+
+Usage:
+  python summarization/benchmark_summarizer.py                         # 40 synthetic articles, all modes
+  python summarization/benchmark_summarizer.py --modes sequential dynamic adaptive --threads 4
+  python summarization/benchmark_summarizer.py --articles 80 --batch-size 8
+  python summarization/benchmark_summarizer.py --modes dynamic adaptive --token-budget 2048 4096 8192
+  python summarization/benchmark_summarizer.py --table FPT_News --articles 60
+  python summarization/benchmark_summarizer.py --texts-file articles.txt --output logs/summarizer_benchmark.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from typing import List
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(current_dir))
+
+# Import the root models package before summarization puts its own models/ on sys.path
+from models.model_manager import get_model_manager
+from summarization.models.summarizer import NewsSummarizer, Config
+
+import torch
+
+SENTENCES = [
+    "Cổ phiếu FPT tăng 2,3% trong phiên sáng nay nhờ dòng tiền khối ngoại quay trở lại.",
+    "Ngân hàng Nhà nước giữ nguyên lãi suất điều hành trong bối cảnh lạm phát được kiểm soát.",
+    "Doanh thu quý III của doanh nghiệp đạt 12.500 tỷ đồng, tăng 18% so với cùng kỳ năm trước.",
+    "Giá khí tự nhiên thế giới giảm mạnh khiến biên lợi nhuận của PV GAS chịu áp lực.",
+    "VN-Index đóng cửa ở mức 1.265 điểm với thanh khoản đạt hơn 20.000 tỷ đồng.",
+    "Vietcombank công bố kế hoạch tăng vốn điều lệ thông qua chia cổ tức bằng cổ phiếu.",
+    "Imexpharm mở rộng nhà máy mới đạt chuẩn EU-GMP nhằm tăng năng lực sản xuất thuốc kháng sinh.",
+    "Các chuyên gia nhận định thị trường có thể biến động mạnh trước kỳ đáo hạn phái sinh.",
+    "Tỷ giá USD/VND trên thị trường liên ngân hàng tăng nhẹ trong tuần qua.",
+    "Nhà đầu tư nước ngoài bán ròng hơn 500 tỷ đồng trên sàn HOSE trong phiên hôm nay.",
+    "Lợi nhuận sau thuế lũy kế chín tháng hoàn thành 78% kế hoạch năm mà đại hội cổ đông đề ra.",
+    "Chính phủ đẩy mạnh giải ngân vốn đầu tư công để hỗ trợ tăng trưởng kinh tế cuối năm.",
+]
+
+
+def synthetic_corpus(count: int, seed: int = 0) -> List[str]:
+    """Vietnamese financial articles from 2 to 80 sentences (roughly 60 to 2500 tokens)"""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 80))) for _ in range(count)]
+
+
+def load_corpus(args) -> List[str]:
+    """Article contents from a file (one per line), a news table or the synthetic generator"""
+    if args.texts_file:
+        with open(args.texts_file, encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()][:args.articles]
+    if args.table:
+        from database import SupabaseManager
+
+        db_manager = SupabaseManager()
+        texts = []
+        for row in db_manager.iter_rows(args.table, [("neq", "content", "")], "content", descending=True):
+            if (row.get("content") or "").strip():
+                texts.append(row["content"])
+            if len(texts) >= args.articles:
+                break
+        return texts
+    return synthetic_corpus(args.articles, args.seed)
+
+
+def summarize_fixed_padding(summarizer: NewsSummarizer, texts: List[str], batch_size: int) -> List[str]:
+    """Previous behaviour: batches in input order, every article padded to MAX_INPUT_LENGTH"""
+    summaries = []
+    for batch_start in range(0, len(texts), batch_size):
+        batch = texts[batch_start:batch_start + batch_size]
+        inputs = summarizer.tokenizer(
+            ["summarize: " + t.strip() for t in batch],
+            max_length=Config.MAX_INPUT_LENGTH,
+            truncation=True,
+            padding="max_length",
+            return_tensors="pt"
+        ).to(summarizer.device)
+        with torch.no_grad():
+            outputs = summarizer.model.generate(**inputs, **Config.get_generation_config())
+        summaries.extend(summarizer._clean_output(output) for output in outputs)
+    return summaries
+
+
+MODES = ("fixed", "dynamic", "sequential", "adaptive")
+
+
+class RssSampler:
+    """Peak resident memory while the block runs, sampled from /proc/self/statm"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_mb = None
+        self._stop = threading.Event()
+
+    def _current_mb(self):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            current = self._current_mb()
+            if current is not None:
+                self.peak_mb = max(self.peak_mb or 0, current)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_mode(summarizer: NewsSummarizer, mode: str, texts: List[str], batch_size: int):
+    """Summaries of one mode with its timing"""
+    start = time.perf_counter()
+    with RssSampler() as rss:
+        if mode == "fixed":
+            summaries = summarize_fixed_padding(summarizer, texts, batch_size)
+        elif mode == "sequential":
+            summaries = [summarizer.summarize(text) for text in texts]
+        else:
+            summaries = summarizer.summarize_sorted(texts, batch_size if mode == "dynamic" else None)
+    seconds = time.perf_counter() - start
+
+    tokens = sum(len(ids) for ids in summarizer.encode(texts))
+    result = {"seconds": round(seconds, 2), "articles_per_second": round(len(texts) / seconds, 3),
+              "tokens_per_second": round(tokens / seconds, 1), "peak_rss_mb": rss.peak_mb and round(rss.peak_mb)}
+    if mode in ("dynamic", "adaptive"):
+        result["padding_ratio"] = round(summarizer.last_stats["padding_ratio"], 2)
+        result["batch_sizes"] = summarizer.last_stats["batch_sizes"]
+    print(f"⏱️ {mode}: {len(texts)} articles in {seconds:.1f}s ({result['articles_per_second']:.3f} articles/s)")
+    return result, summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='🔬 SPA VIP summarizer benchmark')
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=MODES)
+    parser.add_argument('--articles', type=int, default=40, help='Number of articles')
+    parser.add_argument('--batch-size', type=int, default=Config.BATCH_SIZE, help='Batch size of fixed/dynamic')
+    parser.add_argument('--threads', type=int, help='torch intra-op threads (default: SUMMARIZER_THREADS)')
+    parser.add_argument('--token-budget', type=int, nargs='+', default=[Config.TOKEN_BUDGET],
+                        help='Token budgets to run the adaptive mode with')
+    parser.add_argument('--table', help='Sample article contents from this news table')
+    parser.add_argument('--texts-file', help='Read articles from this file instead (one per line)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic corpus')
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    texts = load_corpus(args)
+    if not texts:
+        print("❌ No articles to benchmark")
+        return 1
+
+    model, tokenizer = get_model_manager().load_summarization_model()
+    summarizer = NewsSummarizer(model, tokenizer)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    lengths = sorted(len(ids) for ids in summarizer.encode(texts))
+    print(f"📄 {len(texts)} articles, tokens min {lengths[0]} / median {lengths[len(lengths) // 2]} / "
+          f"max {lengths[-1]} (truncated at {Config.MAX_INPUT_LENGTH}), batch size {args.batch_size}, "
+          f"device {Config.DEVICE}, {torch.get_num_threads()} threads")
+
+    results, outputs = {}, {}
+    for mode in args.modes:
+        if mode != "adaptive":
+            results[mode], outputs[mode] = run_mode(summarizer, mode, texts, args.batch_size)
+            continue
+        for budget in args.token_budget:
+            name = f"adaptive@{budget}" if len(args.token_budget) > 1 else mode
+            summarizer.token_budget = budget
+            summarizer.batch_control.size = Config.BATCH_SIZE
+            results[name], outputs[name] = run_mode(summarizer, mode, texts, args.batch_size)
+    if "fixed" in results:
+        results["fixed"]["padding_ratio"] = round(len(texts) * Config.MAX_INPUT_LENGTH / sum(lengths), 2)
+
+    base_mode = next(iter(results))
+    base = results[base_mode]["articles_per_second"]
+    print("\n" + "=" * 94)
+    print(f"{'Mode':<16} {'Seconds':>9} {'Articles/s':>11} {'Tokens/s':>9} {'Speedup':>8} {'Padding':>8} "
+          f"{'RSS MB':>7} {'Same as ' + base_mode:>20}")
+    print("-" * 94)
+    for mode, r in results.items():
+        r["speedup"] = round(r["articles_per_second"] / base, 2) if base else 0.0
+        r["identical_summaries"] = round(sum(a == b for a, b in zip(outputs[base_mode], outputs[mode])) / len(texts), 4)
+        padding = f"{r['padding_ratio']:.2f}x" if "padding_ratio" in r else "-"
+        print(f"{mode:<16} {r['seconds']:>9.1f} {r['articles_per_second']:>11.3f} {r['tokens_per_second']:>9.1f} "
+              f"{r['speedup']:>7.2f}x {padding:>8} {r['peak_rss_mb'] or '-':>7} {r['identical_summaries']:>20.1%}")
+    print("=" * 94)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"articles": len(texts), "batch_size": args.batch_size, "device": Config.DEVICE,
+                       "threads": torch.get_num_threads(),
+                       "token_lengths": {"min": lengths[0], "median": lengths[len(lengths) // 2], "max": lengths[-1]},
+                       "results": results}, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,24 +25,26 @@ def cleanup_unprocessable_articles():
     for table_name in tables:
         logger.info(f"Checking {table_name} for unprocessable articles...")
         
-        # Get articles with NULL ai_summary using centralized database manager
-        client = db.get_client()
-        articles = client.table(table_name).select('id, title, content, ai_summary').or_('ai_summary.is.null,ai_summary.eq.').execute()
+        # Stream articles with NULL ai_summary page by page using centralized database manager
+        articles = db.iter_rows(table_name, [('or_', 'ai_summary.is.null,ai_summary.eq.')], 'id, content')
         
-        marked_count = 0
-        for article in articles.data:
+        rows_to_mark = []
+        for article in articles:
             content_length = len(article['content']) if article['content'] else 0
             
             # If content is too short, mark as unprocessable
             if content_length < MIN_CONTENT_LENGTH:
                 logger.info(f"Marking article ID {article['id']} as unprocessable (content length: {content_length})")
-                
-                # Update with a special marker using centralized database manager
-                client.table(table_name).update({
+                rows_to_mark.append({
+                    'id': article['id'],
                     'ai_summary': '[UNPROCESSABLE: Insufficient content]'
-                }).eq('id', article['id']).execute()
-                
-                marked_count += 1
+                })
+        
+        # Update with a special marker in one bulk write
+        marked_count = 0
+        if rows_to_mark:
+            results = db.update_many(table_name, 'id', rows_to_mark)
+            marked_count = sum(1 for updated in results.values() if updated)
         
         logger.info(f"{table_name}: Marked {marked_count} articles as unprocessable")
         total_marked += marked_count
@@ -40,6 +40,13 @@ class Config:
     # Hardware
     DEVICE = os.getenv("DEVICE", "cuda" if torch.cuda.is_available() else "cpu")
     BATCH_SIZE = int(os.getenv("BATCH_SIZE", 5 if DEVICE == "cuda" else 2))
+    LENGTH_SORT_WINDOW = int(os.getenv("LENGTH_SORT_WINDOW", 8))  # Batches fetched together and sorted by token length
+    MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 16 if DEVICE == "cuda" else 8))  # Upper bound for adaptive batching
+    TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", 16384 if DEVICE == "cuda" else 4096))  # Padded input tokens x beams per batch
+    TARGET_BATCH_SECONDS = float(os.getenv("TARGET_BATCH_SECONDS", 30))  # Batch latency the batch size adapts to
+    MIN_FREE_MEMORY_FRACTION = float(os.getenv("MIN_FREE_MEMORY_FRACTION", 0.15))  # Batches shrink below this share of memory free
+    CPU_THREADS = int(os.getenv("SUMMARIZER_THREADS", 0))  # torch intra-op threads on CPU (0 = all cores)
+    PIPELINE_DEPTH = int(os.getenv("PIPELINE_DEPTH", 2))  # Batches fetched ahead / left unwritten while generating
     
     # Supabase - sử dụng config từ crawl folder
     SUPABASE_URL = os.getenv("SUPABASE_URL", DEFAULT_SUPABASE_URL)
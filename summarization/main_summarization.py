@@ -1,26 +1,59 @@
 import time
 import sys
 import os
+import json
 import importlib.util
 from typing import List, Dict
 from tqdm import tqdm
 
 # Import centralized database system
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import SupabaseManager, DatabaseConfig
+from database import SupabaseManager, DatabaseConfig, WriteBehindBuffer, iter_batches, prefetch, get_inference_cache
 
 # Wrapper class for backward compatibility
 class SupabaseHandler:
     def __init__(self):
         self.db_manager = SupabaseManager()
         self.config = DatabaseConfig()
+        # Summaries are written in the background and spooled to disk until stored
+        self.writer = WriteBehindBuffer(self.db_manager, name="summarization")
+        self._queued = {}  # table_name -> article ids queued since the last flush_writes
     
     def fetch_unsummarized_articles(self, limit=100, table_name=None):
         return self.db_manager.fetch_unsummarized_articles(table_name, limit)
     
+    def iter_unsummarized_batches(self, batch_size, table_name=None, depth=0):
+        """Stream pending articles in batches - each row is handed out once per run
+        
+        With depth > 0 the next batches are fetched on a background thread
+        while the current one is being summarized.
+        """
+        batches = iter_batches(self.db_manager.iter_unsummarized_articles(table_name), batch_size)
+        return prefetch(batches, depth) if depth > 0 else batches
+    
     def update_summary(self, article_id, summary, table_name):
         return self.db_manager.update_article_summary(article_id, summary, table_name)
     
+    def update_summaries(self, articles, summaries):
+        """Queue summaries for write-behind - returns rows queued"""
+        queued = 0
+        for article, summary in zip(articles, summaries):
+            if summary:
+                self.writer.put(article["table_name"], "id", article["id"], {"ai_summary": summary})
+                self._queued.setdefault(article["table_name"], []).append(article["id"])
+                queued += 1
+        return queued
+    
+    def wait_for_writes(self, max_rows):
+        """Backpressure: block while more than max_rows summaries are waiting to be stored"""
+        return self.writer.wait_for_capacity(max_rows)
+    
+    def flush_writes(self):
+        """Block until queued summaries are stored - returns how many queued since the last flush were stored"""
+        self.writer.flush()
+        queued, self._queued = self._queued, {}
+        return sum(self.writer.count_stored(table_name, "id", ids) for table_name, ids in queued.items())
+    
     def get_table_stats(self):
         return self.db_manager.get_table_stats()
 
@@ -36,6 +69,7 @@ Config = config_module.Config
 
 from utils.logger import logger
 from utils.helpers import measure_performance
+from utils.dedup import group_by_content
 
 # Import table names from centralized config
 TABLE_NAMES = DatabaseConfig().get_all_news_tables()
@@ -46,9 +80,11 @@ class SummarizationPipeline:
     def __init__(self):
         self.db = SupabaseHandler()
         self.summarizer = None  # Lazy loading để tiết kiệm memory
+        self._summary_version = None
         self.start_time = None
         self.processed_count = 0
         self.error_count = 0
+        self.dedup_stats = {"articles": 0, "duplicates": 0, "cached": 0, "generated": 0}
         
         logger.info("Enhanced Summarization Pipeline initialized")
         
@@ -63,7 +99,8 @@ class SummarizationPipeline:
             try:
                 from models.model_manager import get_model_manager
                 manager = get_model_manager()
-                self.summarizer = manager.load_summarization_model()
+                model, tokenizer = manager.load_summarization_model()
+                self.summarizer = NewsSummarizer(model, tokenizer)
                 logger.info("✅ Model loaded via ModelManager")
             except Exception as e:
                 logger.error(f"❌ Failed to load model via ModelManager: {e}")
@@ -71,6 +108,66 @@ class SummarizationPipeline:
                 self.summarizer = NewsSummarizer()
                 logger.info("Model loaded via fallback")
     
+    def summary_version(self) -> str:
+        """Cache version of generated summaries: model weights + generation settings"""
+        if self._summary_version is None:
+            from models.model_manager import get_model_manager
+            settings = json.dumps({"max_input_length": Config.MAX_INPUT_LENGTH, **Config.get_generation_config()},
+                                  sort_keys=True)
+            self._summary_version = f"{get_model_manager().model_version('summarization')}:{settings}"
+        return self._summary_version
+    
+    def _summarize(self, contents: List[str]) -> List[str]:
+        """
+        Summarize contents, generating one summary per distinct content
+        
+        Copies that normalize to the same text (syndicated articles) are
+        grouped and share one summary, which is also looked up in and stored
+        to the inference cache under the normalized text, so copies in other
+        tables or later runs reuse it.
+        """
+        keys, representatives, groups = group_by_content(contents)
+        group_summaries = [None] * len(keys)
+        
+        cache = get_inference_cache()
+        if cache is not None:
+            version = self.summary_version()
+            for group, summary in cache.get_many("summary", version, keys).items():
+                group_summaries[group] = summary
+        missing = [group for group, summary in enumerate(group_summaries) if not summary]
+        
+        if missing:
+            self._load_model()
+            generated = self.summarizer.summarize_batch([representatives[group] for group in missing])
+            for group, summary in zip(missing, generated):
+                group_summaries[group] = summary
+            if cache is not None:
+                # Empty outputs are not cached so they are retried next time
+                cache.put_many("summary", version, [keys[group] for group in missing],
+                               [summary or None for summary in generated])
+        
+        stats = self.dedup_stats
+        stats["articles"] += len(contents)
+        stats["duplicates"] += len(contents) - len(keys)
+        stats["cached"] += len(keys) - len(missing)
+        stats["generated"] += len(missing)
+        if len(missing) < len(contents):
+            logger.info(f"🗃️ Generated {len(missing)} summaries for {len(contents)} articles "
+                        f"({len(contents) - len(keys)} duplicate contents, {len(keys) - len(missing)} from cache)")
+        
+        # Fan each group's summary out to every article in it
+        return [group_summaries[group] for group in groups]
+    
+    def log_dedup_summary(self):
+        """Log how much generation content dedup and the inference cache saved"""
+        stats = self.dedup_stats
+        if not stats["articles"]:
+            return
+        saved = stats["articles"] - stats["generated"]
+        logger.info(f"DEDUP: {stats['generated']} summaries generated for {stats['articles']} articles | "
+                    f"{stats['duplicates']} duplicate contents, {stats['cached']} from cache | "
+                    f"saved {saved / stats['articles']:.1%} of generation")
+    
     def log_table_stats(self):
         """Log statistics for all news tables với priority analysis"""
         logger.info("DATABASE STATISTICS")
@@ -127,11 +224,12 @@ class SummarizationPipeline:
     @measure_performance
     def process_batch(self, batch_size: int = 20, table_name: str = None) -> int:
         """Process a batch of articles with improved logging"""
-        total_success = 0
+        total_queued = 0
+        batches = self.db.iter_unsummarized_batches(batch_size, table_name=table_name, depth=Config.PIPELINE_DEPTH)
         while True:
-            articles = self.db.fetch_unsummarized_articles(limit=batch_size, table_name=table_name)
+            articles = next(batches, [])
             if not articles:
-                if total_success == 0:
+                if total_queued == 0:
                     logger.info(f"No articles to process in {table_name or 'all tables'}")
                 break
             
@@ -139,30 +237,28 @@ class SummarizationPipeline:
             contents = [article["content"] for article in articles]
             
             try:
-                summaries = self.summarizer.summarize_batch(contents)
-                success_count = 0
-                
-                for article, summary in zip(articles, summaries):
-                    if summary and self.db.update_summary(
-                        article["id"], 
-                        summary, 
-                        article["table_name"]
-                    ):
-                        success_count += 1
+                summaries = self._summarize(contents)
+                queued_count = self.db.update_summaries(articles, summaries)
+                self.db.wait_for_writes(Config.PIPELINE_DEPTH * batch_size)
                         
-                logger.info(f"Successfully processed {success_count}/{len(articles)} articles")
-                total_success += success_count
+                logger.info(f"Queued {queued_count}/{len(articles)} summaries for writing")
+                total_queued += queued_count
                 
             except Exception as e:
                 logger.error(f"Batch processing failed: {str(e)}")
                 break
-                
+        
+        total_success = self.db.flush_writes()
+        if total_queued:
+            logger.info(f"Successfully stored {total_success}/{total_queued} summaries")
+        self.log_dedup_summary()
         return total_success
 
     def process_all_articles(self):
         """Process ALL unsummarized articles until completion"""
         total_processed = 0
-        batch_size = Config.BATCH_SIZE
+        # Several generate batches per fetch, so articles can be grouped by length
+        batch_size = Config.MAX_BATCH_SIZE * Config.LENGTH_SORT_WINDOW
         
         # Get list of news tables
         news_tables = Config.NEWS_TABLES
@@ -170,32 +266,24 @@ class SummarizationPipeline:
         logger.info(f"Processing articles from tables: {news_tables}")
         
         with tqdm(desc="Processing ALL articles") as pbar:
-            while True:
-                articles = self.db.fetch_unsummarized_articles(limit=batch_size)
+            # Batch N+1 is fetched and batch N-1 written while batch N is generating
+            for articles in self.db.iter_unsummarized_batches(batch_size, depth=Config.PIPELINE_DEPTH):
                 if not articles:
                     break
                     
                 contents = [article["content"] for article in articles]
-                summaries = self.summarizer.summarize_batch(contents)
-                
-                batch_processed = 0
-                for article, summary in zip(articles, summaries):
-                    if summary and self.db.update_summary(
-                        article["id"], 
-                        summary, 
-                        article["table_name"]
-                    ):
-                        batch_processed += 1
+                summaries = self._summarize(contents)
+                batch_processed = self.db.update_summaries(articles, summaries)
+                self.db.wait_for_writes(Config.PIPELINE_DEPTH * batch_size)
                 
                 total_processed += batch_processed
                 pbar.update(batch_processed)
-                pbar.set_postfix({"Processed": total_processed})
-                
-                if Config.DEVICE == "cpu":
-                    time.sleep(1)
+                pbar.set_postfix({"Queued": total_processed})
         
-        logger.info(f"FINISHED! Total articles processed: {total_processed}")
-        return total_processed
+        stored = self.db.flush_writes()
+        self.log_dedup_summary()
+        logger.info(f"FINISHED! Total summaries stored: {stored}/{total_processed} queued")
+        return stored
 
     def process_specific_table(self, table_name: str):
         """Process articles from a specific table with enhanced progress tracking"""
@@ -213,10 +301,12 @@ class SummarizationPipeline:
             return 0
         
         total_processed = 0
-        batch_size = Config.BATCH_SIZE
+        # Several generate batches per fetch, so articles can be grouped by length
+        batch_size = Config.MAX_BATCH_SIZE * Config.LENGTH_SORT_WINDOW
         batch_count = 0
         
-        logger.info(f"Configuration: Batch size {batch_size} | Device: {Config.DEVICE}")
+        logger.info(f"Configuration: {batch_size} articles per fetch, adaptive batch size "
+                    f"from {Config.BATCH_SIZE} (max {Config.MAX_BATCH_SIZE}) | Device: {Config.DEVICE}")
         logger.info(f"Target: {total_to_process} articles | ETA: {total_to_process * 11 / 60:.1f} minutes")
         logger.info("Starting processing...")
         logger.info("=" * 60)
@@ -226,8 +316,11 @@ class SummarizationPipeline:
         with tqdm(total=total_to_process, desc=f"Processing {table_name}", 
                  bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]") as pbar:
             
+            # Batch N+1 is fetched and batch N-1 written while batch N is generating
+            batches = self.db.iter_unsummarized_batches(batch_size, table_name=table_name,
+                                                        depth=Config.PIPELINE_DEPTH)
             while True:
-                articles = self.db.fetch_unsummarized_articles(limit=batch_size, table_name=table_name)
+                articles = next(batches, [])
                 if not articles:
                     logger.info(f"✅ No more articles to process in {table_name}")
                     break
@@ -243,18 +336,13 @@ class SummarizationPipeline:
                 try:
                     # AI processing
                     logger.info("AI summarizing...")
-                    summaries = self.summarizer.summarize_batch(contents)
+                    summaries = self._summarize(contents)
                     
-                    # Database updates
-                    logger.info("Saving to database...")
-                    batch_processed = 0
-                    for article, summary in zip(articles, summaries):
-                        if summary and self.db.update_summary(
-                            article["id"], 
-                            summary, 
-                            article["table_name"]
-                        ):
-                            batch_processed += 1
+                    # Database updates (write-behind, never blocks on the network)
+                    logger.info("Queueing for database...")
+                    batch_processed = self.db.update_summaries(articles, summaries)
+                    # Backpressure: at most PIPELINE_DEPTH batches waiting to be written
+                    self.db.wait_for_writes(Config.PIPELINE_DEPTH * batch_size)
                     
                     # Update counters
                     total_processed += batch_processed
@@ -264,7 +352,7 @@ class SummarizationPipeline:
                     batch_time = time.time() - batch_start
                     avg_time = batch_time / len(articles)
                     
-                    logger.info(f"BATCH {batch_count} COMPLETE: {batch_processed}/{len(articles)} articles | {batch_time:.1f}s | {avg_time:.1f}s/article")
+                    logger.info(f"BATCH {batch_count} COMPLETE: {batch_processed}/{len(articles)} articles queued | {batch_time:.1f}s | {avg_time:.1f}s/article")
                     
                     # Progress summary
                     completion_rate = (total_processed / total_to_process) * 100
@@ -273,15 +361,17 @@ class SummarizationPipeline:
                     
                     logger.info(f"PROGRESS: {total_processed}/{total_to_process} ({completion_rate:.1f}%) | ETA: {estimated_remaining_time:.1f}min")
                     logger.info("-" * 60)
-                    
-                    if Config.DEVICE == "cpu":
-                        time.sleep(1)  # Brief pause cho CPU
                 
                 except Exception as e:
                     logger.error(f"BATCH {batch_count} ERROR: {str(e)}")
                     logger.info("Continuing to next batch...")
                     continue
         
+        # Make sure every queued summary is stored before reporting
+        queued = total_processed
+        total_processed = self.db.flush_writes()
+        self.log_dedup_summary()
+        
         # Final summary
         total_time = time.time() - start_time
         avg_speed = total_processed / total_time if total_time > 0 else 0
@@ -290,7 +380,7 @@ class SummarizationPipeline:
         logger.info("=" * 60)
         logger.info(f"{table_name} PROCESSING COMPLETED!")
         logger.info(f"RESULTS:")
-        logger.info(f"   Articles processed: {total_processed}/{total_to_process}")
+        logger.info(f"   Articles processed: {total_processed}/{total_to_process} ({queued} queued)")
         logger.info(f"   Total time: {total_time/60:.1f} minutes")
         logger.info(f"   Speed: {avg_speed:.2f} articles/second")
         logger.info(f"   Success rate: {success_rate:.1f}%")
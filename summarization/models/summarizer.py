@@ -1,6 +1,7 @@
 import torch
 import sys
 import os
+import time
 import importlib.util
 from transformers import T5ForConditionalGeneration, T5Tokenizer
 from pathlib import Path
@@ -16,21 +17,100 @@ Config = config_module.Config
 # Import logger với absolute import
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.logger import logger
-from typing import List
+from utils.batch_planner import take_batch
+from utils.memory import cpu_memory_mb
+from typing import List, Optional
 from tqdm import tqdm
 
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, None where unavailable"""
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except (ImportError, OSError):
+        return None
+
+
+def memory_headroom_mb(device: torch.device):
+    """(free, total) memory on the device in MB, (None, None) if it cannot be measured"""
+    try:
+        if device.type == "cuda":
+            free, total = torch.cuda.mem_get_info(device)
+            return free / 2**20, total / 2**20
+    except RuntimeError:
+        return None, None
+    return cpu_memory_mb() or (None, None)
+
+
+class AdaptiveBatchSize:
+    """
+    Batch size that follows measured batch latency and memory headroom
+
+    Grows by one while full batches finish well under the target latency and
+    memory allows, shrinks by one when a batch overshoots the target or free
+    memory falls below min_free_fraction of the total, and halves after a
+    failed batch.
+    """
+
+    def __init__(self, initial: int, max_size: int, target_seconds: float, min_free_fraction: float):
+        self.size = max(1, min(initial, max_size))
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.min_free_fraction = min_free_fraction
+
+    def update(self, batch_articles: int, seconds: float, free_mb=None, total_mb=None) -> int:
+        """Record one finished batch and return the next batch size"""
+        low_memory = free_mb is not None and bool(total_mb) and free_mb < total_mb * self.min_free_fraction
+        if low_memory or seconds > self.target_seconds * 1.25:
+            self.size = max(1, self.size - 1)
+        elif batch_articles >= self.size and seconds < self.target_seconds * 0.75:
+            self.size = min(self.max_size, self.size + 1)
+        return self.size
+
+    def shrink(self, batch_articles: int = None) -> int:
+        """Halve after a failed batch (of batch_articles articles, default: the current size)"""
+        self.size = max(1, (batch_articles or self.size) // 2)
+        return self.size
+
+
 class NewsSummarizer:
-    """Optimized summarizer with batch processing"""
+    """
+    Optimized summarizer with batch processing
+
+    Articles are tokenized once without padding and sorted by token length;
+    each micro-batch is padded only to its own longest article, so short
+    articles do not pay for MAX_INPUT_LENGTH. Summaries are returned in the
+    original order.
+    """
     
-    def __init__(self):
+    def __init__(self, model=None, tokenizer=None, warmup: bool = True):
+        """
+        Args:
+            model: Loaded T5ForConditionalGeneration (default: load via ModelManager)
+            tokenizer: Matching T5Tokenizer
+            warmup: Run one short generation to trigger lazy initialization
+        """
         self.device = torch.device(Config.DEVICE)
-        self._validate_model_path()
-        self._load_model()
-        self._warmup_model()
+        self.last_stats = {}
+        self.token_budget = Config.TOKEN_BUDGET
+        self.batch_control = AdaptiveBatchSize(Config.BATCH_SIZE, Config.MAX_BATCH_SIZE,
+                                               Config.TARGET_BATCH_SECONDS, Config.MIN_FREE_MEMORY_FRACTION)
+        if self.device.type == "cpu":
+            torch.set_num_threads(Config.CPU_THREADS or os.cpu_count() or 1)
+            logger.info(f"CPU generation with {torch.get_num_threads()} threads")
+        if model is None or tokenizer is None:
+            self._validate_model_path()
+            self._load_model()
+        else:
+            self.model, self.tokenizer = model.to(self.device), tokenizer
+            self.model.eval()
+        if warmup:
+            self._warmup_model()
     
     def _validate_model_path(self):
         """Verify model files exist"""
-        self.model_path = Path(Config.MODEL_PATH)
+        from models.model_manager import get_model_manager
+        self.model_path = Path(get_model_manager().get_model_path('summarization'))
         required_files = ['config.json', 'model.safetensors', 
                          'tokenizer_config.json', 'spiece.model']
         
@@ -38,33 +118,6 @@ class NewsSummarizer:
         if missing:
             raise FileNotFoundError(f"Missing model files: {missing}")
 
-    def summarize_batch(self, texts: List[str]) -> List[str]:
-        """Optimized batch processing with fallback"""
-        if not texts:
-            return []
-            
-        try:
-            inputs = self.tokenizer(
-                ["summarize: " + t for t in texts],
-                max_length=Config.MAX_INPUT_LENGTH,
-                truncation=True,
-                padding="max_length",
-                return_tensors="pt"
-            ).to(self.device)
-            
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    **inputs,
-                    **Config.get_generation_config()
-                )
-            
-            return [self.tokenizer.decode(o, skip_special_tokens=True).strip() 
-                   for o in outputs]
-            
-        except Exception as e:
-            logger.warning(f"Batch failed: {str(e)}")
-            return [self.summarize(text) for text in texts]
-
     def _load_model(self):
         """Safely load tokenizer and model"""
         try:
@@ -103,8 +156,7 @@ class NewsSummarizer:
                 input_text,
                 return_tensors="pt",
                 max_length=Config.MAX_INPUT_LENGTH,
-                truncation=True,
-                padding="max_length"
+                truncation=True
             ).to(self.device)
             
             with torch.no_grad():
@@ -123,37 +175,114 @@ class NewsSummarizer:
             logger.error(f"Error: {str(e)}")
             raise RuntimeError("Summarization failed") from e
 
-    def summarize_batch(self, texts: List[str]) -> List[str]:
-        """Batch processing with automatic fallback"""
+    def encode(self, texts: List[str]) -> List[List[int]]:
+        """Token ids of each article (with the task prefix), truncated but not padded"""
+        return self.tokenizer(
+            ["summarize: " + t.strip() for t in texts],
+            max_length=Config.MAX_INPUT_LENGTH,
+            truncation=True,
+            padding=False
+        )["input_ids"]
+    
+    def summarize_batch(self, texts: List[str], batch_size: int = None) -> List[str]:
+        """
+        Summarize articles in length-sorted, dynamically padded micro-batches
+        
+        Args:
+            texts: Article contents
+            batch_size: Fixed articles per generate call (default: token budget with an adaptive cap)
+        
+        Returns:
+            Summaries aligned with texts
+        """
         if not texts:
             return []
+        if len(texts) == 1:
+            return [self.summarize(texts[0])]
+        return self.summarize_sorted(texts, batch_size)
+    
+    def summarize_sorted(self, texts: List[str], batch_size: int = None) -> List[Optional[str]]:
+        """
+        Batched generation over length-sorted articles, each batch padded to its longest member
+        
+        Without batch_size, batches are packed under the token budget
+        (padded input tokens x beams, see utils.batch_planner) and capped by
+        the adaptive batch size. A failed batch is retried at half the size;
+        only a single article that still fails is summarized on its own, and
+        if that fails too its summary is None.
+        """
+        start = time.time()
+        encoded = self.encode(texts)
+        lengths = [len(ids) for ids in encoded]
+        num_beams = Config.get_generation_config().get("num_beams", 1)
+        # Longest first: an out-of-memory batch shows up at the start of the run
+        order = sorted(range(len(texts)), key=lambda i: lengths[i], reverse=True)
+        summaries = [None] * len(texts)
+        padded_tokens = 0
+        batch_sizes = []
+        max_items = None
+        
+        position = 0
+        while position < len(order):
+            if batch_size:
+                count = min(max_items or batch_size, len(order) - position)
+            else:
+                count = take_batch(order, lengths, position, self.token_budget, num_beams,
+                                   min(max_items or self.batch_control.size, self.batch_control.size))
+            batch_indices = order[position:position + count]
+            batch_start = time.time()
+            try:
+                inputs = self.tokenizer.pad(
+                    {"input_ids": [encoded[i] for i in batch_indices]},
+                    padding="longest",
+                    return_tensors="pt"
+                ).to(self.device)
+                
+                with torch.no_grad():
+                    outputs = self.model.generate(
+                        **inputs,
+                        **Config.get_generation_config()
+                    )
+                
+                for index, output in zip(batch_indices, outputs):
+                    summaries[index] = self._clean_output(output)
+                padded_tokens += inputs["input_ids"].numel()
+                
+            except RuntimeError as e:
+                if self.device.type == "cuda":
+                    torch.cuda.empty_cache()
+                if len(batch_indices) > 1:
+                    # Retry the same articles in smaller batches
+                    max_items = max(1, len(batch_indices) // 2)
+                    if not batch_size:
+                        self.batch_control.shrink(len(batch_indices))
+                    logger.warning(f"Batch of {len(batch_indices)} failed, retrying at {max_items}: {str(e)}")
+                    continue
+                logger.warning(f"Batch failed (falling back to sequential): {str(e)}")
+                try:
+                    summaries[batch_indices[0]] = self.summarize(texts[batch_indices[0]])
+                except (RuntimeError, ValueError):
+                    # Keep the rest of the window; this article stays unsummarized and is retried next run
+                    logger.error(f"Skipping article that failed on its own: {texts[batch_indices[0]][:50]}...")
             
-        # Automatic fallback to sequential on CPU or small batches
-        if Config.DEVICE == "cpu" or len(texts) <= 2:
-            return [self.summarize(text) for text in texts]
-            
-        try:
-            input_texts = ["summarize: " + t.strip() for t in texts]
-            
-            inputs = self.tokenizer(
-                input_texts,
-                return_tensors="pt",
-                max_length=Config.MAX_INPUT_LENGTH,
-                truncation=True,
-                padding="max_length"
-            ).to(self.device)
-            
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    **inputs,
-                    **Config.get_generation_config()
-                )
-            
-            return [self._clean_output(output) for output in outputs]
-            
-        except RuntimeError as e:
-            logger.warning(f"Batch failed (falling back to sequential): {str(e)}")
-            return [self.summarize(text) for text in texts]
+            position += len(batch_indices)
+            batch_sizes.append(len(batch_indices))
+            max_items = None
+            if not batch_size:
+                self.batch_control.update(len(batch_indices), time.time() - batch_start, *memory_headroom_mb(self.device))
+        
+        elapsed = time.time() - start
+        real_tokens = sum(lengths)
+        self.last_stats = {
+            "articles": len(texts),
+            "seconds": elapsed,
+            "articles_per_second": len(texts) / elapsed if elapsed > 0 else 0.0,
+            "tokens_per_second": real_tokens / elapsed if elapsed > 0 else 0.0,
+            "padding_ratio": padded_tokens / real_tokens if real_tokens else 1.0,
+            "batch_sizes": batch_sizes,
+            "peak_rss_mb": peak_rss_mb()
+        }
+        return summaries
 
     def _clean_output(self, output_tensor: torch.Tensor) -> str:
         """Clean and format model output"""
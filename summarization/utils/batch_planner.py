@@ -0,0 +1,36 @@
+"""
+Token-budget batch planning for summarization
+
+The cost of a generate batch grows with its padded input size times the
+beam count (encoder activations and the cross-attention cache are kept per
+beam), so batches are cut by that product instead of by article count.
+"""
+
+from typing import Optional, Sequence
+
+
+def take_batch(order: Sequence[int], lengths: Sequence[int], start: int, token_budget: int,
+               num_beams: int = 1, max_items: Optional[int] = None) -> int:
+    """
+    Number of articles from order[start:] that fit in the next batch
+
+    order must be sorted by length, longest first, so the first article of
+    a batch sets its padded length. An article over the budget on its own
+    still gets a batch of one.
+
+    Args:
+        order: Article indices, longest first
+        lengths: Token length of each article
+        start: Position in order where the batch begins
+        token_budget: Maximum padded input tokens x beams
+        num_beams: Beams per article in generate
+        max_items: Articles per batch cap (None = only the budget limits)
+    """
+    remaining = len(order) - start
+    if remaining <= 0:
+        return 0
+    longest = max(1, lengths[order[start]])
+    count = max(1, token_budget // (longest * num_beams))
+    if max_items:
+        count = min(count, max_items)
+    return min(count, remaining)
@@ -0,0 +1,45 @@
+"""
+Content-level deduplication of pending articles
+
+Syndicated CafeF/FireAnt copies of one story land in several news tables
+with the same text up to case, punctuation and spacing. Such copies get one
+normalized form, so they can share a single generated summary.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Tuple
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_content(text: str) -> str:
+    """Lowercased NFC text with punctuation and whitespace runs reduced to single spaces"""
+    text = unicodedata.normalize("NFC", text or "").lower()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def group_by_content(contents: List[str]) -> Tuple[List[str], List[str], List[int]]:
+    """
+    Group contents that normalize to the same text
+
+    Args:
+        contents: Article contents
+
+    Returns:
+        (normalized form per group, representative content per group (the
+        longest copy), group index of every content)
+    """
+    group_of_key: Dict[str, int] = {}
+    keys, representatives, groups = [], [], []
+    for content in contents:
+        key = normalize_content(content)
+        group = group_of_key.get(key)
+        if group is None:
+            group = group_of_key[key] = len(keys)
+            keys.append(key)
+            representatives.append(content)
+        elif len(content) > len(representatives[group]):
+            representatives[group] = content
+        groups.append(group)
+    return keys, representatives, groups
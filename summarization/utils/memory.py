@@ -0,0 +1,71 @@
+"""
+Memory headroom for adaptive batch sizing on CPU
+
+Inside a container /proc/meminfo reports the host, so the cgroup limit is
+read first. Cgroup usage counts page cache (e.g. the mmapped model weights),
+and the inactive part of it is reclaimable, so it is not counted as used.
+"""
+
+from typing import Optional, Tuple
+
+# (limit, usage, stat, reclaimable stat key) of the memory cgroup, v2 first then v1
+CGROUP_MEMORY_FILES = [
+    ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current",
+     "/sys/fs/cgroup/memory.stat", "inactive_file"),
+    ("/sys/fs/cgroup/memory/memory.limit_in_bytes", "/sys/fs/cgroup/memory/memory.usage_in_bytes",
+     "/sys/fs/cgroup/memory/memory.stat", "total_inactive_file"),
+]
+MEMINFO_FILE = "/proc/meminfo"
+
+
+def _read_stat(path: str, key: str) -> int:
+    """Value of key in a memory.stat file, 0 if it cannot be read"""
+    try:
+        with open(path) as f:
+            for line in f:
+                name, _, value = line.partition(" ")
+                if name == key:
+                    return int(value)
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def cgroup_memory_mb() -> Optional[Tuple[float, float]]:
+    """(available, limit) under the container's cgroup limit in MB, None if no limit is set"""
+    for limit_file, usage_file, stat_file, inactive_key in CGROUP_MEMORY_FILES:
+        try:
+            with open(limit_file) as f:
+                limit = f.read().strip()
+            with open(usage_file) as f:
+                usage = int(f.read().strip())
+        except (OSError, ValueError):
+            continue
+        # "max" (v2) or a near-2**63 value (v1) means unlimited
+        if limit == "max" or int(limit) >= 2**60:
+            return None
+        limit = int(limit)
+        used = max(0, usage - _read_stat(stat_file, inactive_key))
+        return max(0, limit - used) / 2**20, limit / 2**20
+    return None
+
+
+def host_memory_mb() -> Optional[Tuple[float, float]]:
+    """(MemAvailable, MemTotal) of the host in MB, None where unavailable"""
+    values = {}
+    try:
+        with open(MEMINFO_FILE) as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in ("MemAvailable", "MemTotal"):
+                    values[name] = int(value.split()[0]) / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    if len(values) < 2:
+        return None
+    return values["MemAvailable"], values["MemTotal"]
+
+
+def cpu_memory_mb() -> Optional[Tuple[float, float]]:
+    """(available, total) memory in MB for this process, cgroup limit first"""
+    return cgroup_memory_mb() or host_memory_mb()
@@ -0,0 +1,64 @@
+"""
+Memory headroom tests
+Fake cgroup files with a large page-cache component
+"""
+
+import os
+import sys
+
+# Add summarization path to import utils the way the summarizer does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import memory
+
+MB = 2**20
+
+
+def write_cgroup(tmp_path, limit, usage, stat):
+    """Write limit/usage/stat files and return their paths"""
+    files = []
+    for name, content in (("limit", limit), ("usage", usage), ("stat", stat)):
+        path = tmp_path / name
+        path.write_text(content)
+        files.append(str(path))
+    return files
+
+
+def test_v2_inactive_file_cache_counts_as_free(tmp_path, monkeypatch):
+    # 2 GB limit, 1.8 GB charged of which 1.2 GB is inactive file cache (model weights)
+    limit, usage, stat = write_cgroup(
+        tmp_path, f"{2048 * MB}\n", f"{1800 * MB}\n",
+        f"anon {600 * MB}\nfile {1200 * MB}\ninactive_file {1200 * MB}\nactive_file 0\n"
+    )
+    monkeypatch.setattr(memory, "CGROUP_MEMORY_FILES", [(limit, usage, stat, "inactive_file")])
+
+    assert memory.cgroup_memory_mb() == (1448, 2048)
+
+
+def test_v1_total_inactive_file(tmp_path, monkeypatch):
+    limit, usage, stat = write_cgroup(
+        tmp_path, f"{1024 * MB}\n", f"{900 * MB}\n",
+        f"inactive_file {100 * MB}\ntotal_inactive_file {500 * MB}\n"
+    )
+    monkeypatch.setattr(memory, "CGROUP_MEMORY_FILES", [(limit, usage, stat, "total_inactive_file")])
+
+    assert memory.cgroup_memory_mb() == (624, 1024)
+
+
+def test_missing_stat_falls_back_to_raw_usage(tmp_path, monkeypatch):
+    limit, usage, _ = write_cgroup(tmp_path, f"{2048 * MB}\n", f"{1800 * MB}\n", "")
+    monkeypatch.setattr(memory, "CGROUP_MEMORY_FILES",
+                        [(limit, usage, str(tmp_path / "missing"), "inactive_file")])
+
+    assert memory.cgroup_memory_mb() == (248, 2048)
+
+
+def test_unlimited_cgroup_uses_meminfo(tmp_path, monkeypatch):
+    limit, usage, stat = write_cgroup(tmp_path, "max\n", f"{1800 * MB}\n", "")
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text("MemTotal:        8388608 kB\nMemFree:  1 kB\nMemAvailable:    4194304 kB\n")
+    monkeypatch.setattr(memory, "CGROUP_MEMORY_FILES", [(limit, usage, stat, "inactive_file")])
+    monkeypatch.setattr(memory, "MEMINFO_FILE", str(meminfo))
+
+    assert memory.cgroup_memory_mb() is None
+    assert memory.cpu_memory_mb() == (4096, 8192)
@@ -20,7 +20,7 @@ except ImportError:
 
 # Try to import centralized database (optional for backwards compatibility)
 try:
-    from database import SupabaseManager, DatabaseConfig
+    from database import SupabaseManager, DatabaseConfig, get_shared_client
     CENTRALIZED_DB_AVAILABLE = True
 except ImportError:
     CENTRALIZED_DB_AVAILABLE = False
@@ -56,9 +56,15 @@ class StockPredictor:
     def _setup_direct_connection(self, supabase_config):
         """Setup direct supabase connection as fallback"""
         if SUPABASE_AVAILABLE:
-            self.supabase: Client = create_client(
-                supabase_config["url"], supabase_config["key"]
-            )
+            if CENTRALIZED_DB_AVAILABLE:
+                # Reuse the pooled client for this project instead of opening a new session
+                self.supabase: Client = get_shared_client(
+                    supabase_config["url"], supabase_config["key"]
+                )
+            else:
+                self.supabase: Client = create_client(
+                    supabase_config["url"], supabase_config["key"]
+                )
             self.table_name = supabase_config["table_name"]
             print(f"⚠️ Using direct connection for table: {self.table_name}")
         else: